@@ -10,15 +10,13 @@ from .varga_calculator import get_varga_chart
 # CONFIGURATION
 # ---------------------------------------------------------------------
 
-# Set ephemeris path
-ephe_path = os.path.join(os.path.dirname(__file__), 'ephemeris_data')
-import os
-ephe_path = os.getenv(
+# Ephemeris path, applied on first use by init_ephemeris()
+EPHE_PATH = os.getenv(
     "SWISSEPH_PATH",
     os.path.join(os.path.dirname(__file__), "ephemeris_data")
 )
 
-swe.set_ephe_path(ephe_path)
+_initialized = False
 
 SIGNS = [
     'Aries', 'Taurus', 'Gemini', 'Cancer', 'Leo', 'Virgo',
@@ -40,11 +38,20 @@ PLANETS = {
 # CORE COMPUTATION
 # ---------------------------------------------------------------------
 
+def init_ephemeris():
+    """Point Swiss Ephemeris at EPHE_PATH, once per process."""
+    global _initialized
+    if not _initialized:
+        swe.set_ephe_path(EPHE_PATH)
+        _initialized = True
+
+
 def get_planet_positions(dt: datetime):
     """
     Compute raw planetary longitudes for all grahas (planets).
     Returns a dict of planet data: { 'Sun': {'longitude': .., 'sign': .., 'degree': ..}, ... }
     """
+    init_ephemeris()
     jd = swe.julday(
         dt.year,
         dt.month,
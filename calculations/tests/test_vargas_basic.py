@@ -26,7 +26,8 @@ def test_varga_registry_contains_expected():
     """Ensure all required Vargas are registered."""
     expected = {
         "D2","D3","D4","D7","D9","D10","D12",
-        "D16","D20","D24","D27","D30"
+        "D16","D20","D24","D27","D30",
+        "D40","D45","D60"
     }
     missing = expected - set(VARGA_MAP.keys())
     assert not missing, f"Missing vargas: {missing}"
@@ -100,4 +101,32 @@ def test_navamsa_diff(diff_reporter):
     print("\nD1 → D9 transitions:\n", diff)
     # Basic sanity checks
     assert isinstance(diff, str)
-    assert diff.strip(), "Expected non-empty diff output"
\ No newline at end of file
+    assert diff.strip(), "Expected non-empty diff output"
+
+def test_sign_matrix_matches_single_charts(base_chart):
+    """One matrix pass gives the same signs as per-varga dispatch."""
+    from calculations.varga_calculator import varga_sign_matrix, get_varga_charts
+
+    vargas = list(VARGA_MAP.keys())
+    longitudes = [p["longitude"] for p in base_chart["positions"].values()]
+    matrix = varga_sign_matrix(longitudes, vargas)
+    assert matrix.shape == (len(vargas), len(longitudes))
+
+    charts = get_varga_charts(base_chart, vargas)
+    for row, varga in zip(matrix.tolist(), vargas):
+        single = get_varga_chart(base_chart, varga)
+        assert charts[varga] == single
+        assert [p["sign_index"] for p in single["planets"].values()] == row
+
+
+@pytest.mark.parametrize("varga, expected", [
+    ("D4", [6, 4]),     # from the sign, then its 4th, 7th, 10th
+    ("D10", [5, 1]),    # odd from the sign, even from its 9th
+    ("D12", [6, 5]),    # from the sign itself
+    ("D24", [4, 0]),    # odd from Leo, even from Cancer
+])
+def test_sign_specific_starts(varga, expected):
+    """15.5° Aries (odd) and 12° Taurus (even) start where the rule says."""
+    from calculations.varga_calculator import varga_sign_matrix
+
+    assert varga_sign_matrix([15.5, 42.0], [varga]).tolist() == [expected]
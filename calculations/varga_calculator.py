@@ -8,13 +8,18 @@ Each varga divides the 30° span of a zodiac sign into 'n' equal parts,
 then maps planetary longitudes into new sign positions according to
 classical Parashari rules.
 
+All requested vargas are computed together from the D1 longitudes as a
+`(n_vargas, n_planets)` integer sign matrix. Every varga rule is
+precomputed into a (sign, part) lookup table, so the matrix is a single
+array index operation; chart dicts are only built when a caller asks
+for them.
+
 References:
 - Brihat Parashara Hora Shastra (BPHS)
 - Sanjay Rath, "Crux of Vedic Astrology"
 """
 
-import math
-import uuid
+import numpy as np
 
 # If these are defined elsewhere, you can import instead:
 SIGNS = [
@@ -23,182 +28,190 @@ SIGNS = [
 ]
 
 # ---------------------------------------------------------------------
-# GENERIC UTILITIES
+# VARGA RULES
 # ---------------------------------------------------------------------
+# Each rule maps (D1 sign index, part index within the sign) to the varga
+# sign. They only run at import time, to fill the lookup tables below.
 
-def _basic_varga_sign(planet_long: float, n: int) -> int:
+def _parashari(n: int):
     """
-    Generic Parashari varga division formula.
-    Works for most Vargas (D4, D7, D9, D10, etc.)
+    Continuous Parashari division: n parts per sign counted on from Aries.
+    Used for D7, D9, D16, D20 and D27, whose starting signs it reproduces.
     """
-    sign_num = int(planet_long / 30)
-    within_sign = planet_long % 30
-    division = int(within_sign * n / 30)
-    varga_sign = (sign_num * n + division) % 12
-    return varga_sign
+    return lambda sign, part: (sign * n + part) % 12
 
 
-def _chart_template(varga_type: str) -> dict:
-    """Return base structure for varga chart JSON."""
-    return {"chart_id": str(uuid.uuid4()), "varga": varga_type, "planets": {}}
+def _hora(sign: int, part: int) -> int:
+    """D2 Hora — odd signs: Sun hora (Leo) then Moon hora (Cancer); even signs reversed."""
+    odd_sign = sign % 2 == 0  # 0 = Aries
+    return 4 if odd_sign == (part == 0) else 3
 
 
-# ---------------------------------------------------------------------
-# INDIVIDUAL VARGA CALCULATIONS
-# ---------------------------------------------------------------------
+def _drekkana(sign: int, part: int) -> int:
+    """D3 Drekkana — counted forward in odd signs, backward in even signs."""
+    if sign % 2 == 0:
+        return (sign + part) % 12
+    return (sign + 2 - part) % 12
 
-def calculate_d9(base_chart: dict) -> dict:
-    """D9 Navamsa chart — Dharma / relationships."""
-    result = _chart_template("D9")
-    for planet, pdata in base_chart["positions"].items():
-        longi = pdata["longitude"]
-        varga_sign = _basic_varga_sign(longi, 9)
-        result["planets"][planet] = {
-            "sign_index": varga_sign,
-            "sign_name": SIGNS[varga_sign],
-            "longitude": longi
-        }
-    return result
-
-
-def calculate_d2(base_chart: dict) -> dict:
-    """D2 Hora chart — Wealth (special odd/even rule)."""
-    result = _chart_template("D2")
-    for planet, pdata in base_chart["positions"].items():
-        longi = pdata["longitude"]
-        sign_num = int(longi / 30)
-        within = longi % 30
-
-        # Odd signs → 0–15° Sun Hora (Leo), 15–30° Moon Hora (Cancer)
-        # Even signs → reversed
-        if sign_num % 2 == 0:  # odd sign numbers = even signs (0=Aries)
-            if within < 15:
-                varga_sign = 4  # Leo
-            else:
-                varga_sign = 3  # Cancer
-        else:
-            if within < 15:
-                varga_sign = 3
-            else:
-                varga_sign = 4
-
-        result["planets"][planet] = {
-            "sign_index": varga_sign,
-            "sign_name": SIGNS[varga_sign],
-            "longitude": longi
-        }
-    return result
-
-
-def calculate_d3(base_chart: dict) -> dict:
-    """D3 Drekkana chart — Siblings."""
-    result = _chart_template("D3")
-    for planet, pdata in base_chart["positions"].items():
-        longi = pdata["longitude"]
-        sign_num = int(longi / 30)
-        within = longi % 30
-        drekkana_num = int(within / 10)
-        if sign_num % 2 == 0:
-            varga_sign = (sign_num + drekkana_num) % 12
-        else:
-            varga_sign = (sign_num + (2 - drekkana_num)) % 12
-
-        result["planets"][planet] = {
-            "sign_index": varga_sign,
-            "sign_name": SIGNS[varga_sign],
-            "longitude": longi
-        }
-    return result
-
-
-def calculate_regular_varga(base_chart: dict, n: int, label: str) -> dict:
-    """For standard even-divided Vargas: D4, D7, D10, D12, D16, D20, D24, D27."""
-    result = _chart_template(label)
-    for planet, pdata in base_chart["positions"].items():
-        longi = pdata["longitude"]
-        varga_sign = _basic_varga_sign(longi, n)
-        result["planets"][planet] = {
-            "sign_index": varga_sign,
-            "sign_name": SIGNS[varga_sign],
-            "longitude": longi
-        }
-    return result
-
-
-def calculate_d30(base_chart: dict) -> dict:
-    """D30 Trimsamsa chart — Misfortunes (irregular divisions)."""
-    result = _chart_template("D30")
-    for planet, pdata in base_chart["positions"].items():
-        longi = pdata["longitude"]
-        sign_num = int(longi / 30)
-        within = longi % 30
-
-        # Trimsamsa divisions depend on odd/even sign
-        # Odd signs: 0–5° Mars, 5–10° Saturn, 10–18° Jupiter, 18–25° Mercury, 25–30° Venus
-        # Even signs reversed order
-        if sign_num % 2 == 0:  # odd signs
-            if within < 5:
-                varga_sign = 0  # Aries (Mars)
-            elif within < 10:
-                varga_sign = 10  # Aquarius (Saturn)
-            elif within < 18:
-                varga_sign = 8   # Sagittarius (Jupiter)
-            elif within < 25:
-                varga_sign = 2   # Gemini (Mercury)
-            else:
-                varga_sign = 1   # Taurus (Venus)
-        else:
-            if within < 5:
-                varga_sign = 1
-            elif within < 10:
-                varga_sign = 2
-            elif within < 18:
-                varga_sign = 8
-            elif within < 25:
-                varga_sign = 10
-            else:
-                varga_sign = 0
-
-        result["planets"][planet] = {
-            "sign_index": varga_sign,
-            "sign_name": SIGNS[varga_sign],
-            "longitude": longi
-        }
-    return result
+
+def _chaturthamsa(sign: int, part: int) -> int:
+    """D4 Chaturthamsa — the sign itself, then its 4th, 7th and 10th."""
+    return (sign + 3 * part) % 12
+
+
+def _dasamsa(sign: int, part: int) -> int:
+    """D10 Dasamsa — from the sign in odd signs, from its 9th in even signs."""
+    return (sign + (0 if sign % 2 == 0 else 8) + part) % 12
+
+
+def _dwadasamsa(sign: int, part: int) -> int:
+    """D12 Dwadasamsa — counted from the sign itself."""
+    return (sign + part) % 12
+
+
+def _chaturvimsamsa(sign: int, part: int) -> int:
+    """D24 Chaturvimsamsa — from Leo in odd signs, from Cancer in even signs."""
+    return ((4 if sign % 2 == 0 else 3) + part) % 12
+
+
+# Trimsamsa boundaries (degrees) and the sign ruling each portion
+_D30_BOUNDS = [5, 10, 18, 25]
+_D30_ODD = [0, 10, 8, 2, 1]   # Mars, Saturn, Jupiter, Mercury, Venus
+_D30_EVEN = [1, 2, 8, 10, 0]
+
+
+def _trimsamsa(sign: int, degree: int) -> int:
+    """D30 Trimsamsa — unequal portions, order depends on odd/even sign."""
+    portion = sum(degree >= bound for bound in _D30_BOUNDS)
+    return (_D30_ODD if sign % 2 == 0 else _D30_EVEN)[portion]
+
+
+def _khavedamsa(sign: int, part: int) -> int:
+    """D40 Khavedamsa — from Aries in odd signs, from Libra in even signs."""
+    return ((0 if sign % 2 == 0 else 6) + part) % 12
+
+
+def _akshavedamsa(sign: int, part: int) -> int:
+    """D45 Akshavedamsa — from Aries, Leo, Sagittarius for movable, fixed, dual signs."""
+    return ((0, 4, 8)[sign % 3] + part) % 12
+
+
+def _shashtiamsa(sign: int, part: int) -> int:
+    """D60 Shashtiamsa — half-degree parts counted from the sign itself."""
+    return (sign + part) % 12
 
 
 # ---------------------------------------------------------------------
 # DISPATCH MAP
 # ---------------------------------------------------------------------
+# varga -> (parts per sign, rule). D30 uses 1° parts so its unequal
+# portions fit the same table layout. The MCP server's
+# jyotish-mcp-complete/calculations/varga_calculator.py carries the same
+# rules (its tests check that both build the same tables).
 
 VARGA_MAP = {
-    "D2": calculate_d2,
-    "D3": calculate_d3,
-    "D4": lambda c: calculate_regular_varga(c, 4, "D4"),
-    "D7": lambda c: calculate_regular_varga(c, 7, "D7"),
-    "D9": calculate_d9,
-    "D10": lambda c: calculate_regular_varga(c, 10, "D10"),
-    "D12": lambda c: calculate_regular_varga(c, 12, "D12"),
-    "D16": lambda c: calculate_regular_varga(c, 16, "D16"),
-    "D20": lambda c: calculate_regular_varga(c, 20, "D20"),
-    "D24": lambda c: calculate_regular_varga(c, 24, "D24"),
-    "D27": lambda c: calculate_regular_varga(c, 27, "D27"),
-    "D30": calculate_d30,
-    # You can later add D40, D45, D60 etc.
+    "D1": (1, lambda sign, part: sign),
+    "D2": (2, _hora),
+    "D3": (3, _drekkana),
+    "D4": (4, _chaturthamsa),
+    "D7": (7, _parashari(7)),
+    "D9": (9, _parashari(9)),
+    "D10": (10, _dasamsa),
+    "D12": (12, _dwadasamsa),
+    "D16": (16, _parashari(16)),
+    "D20": (20, _parashari(20)),
+    "D24": (24, _chaturvimsamsa),
+    "D27": (27, _parashari(27)),
+    "D30": (30, _trimsamsa),
+    "D40": (40, _khavedamsa),
+    "D45": (45, _akshavedamsa),
+    "D60": (60, _shashtiamsa),
 }
 
 
+def _build_tables() -> np.ndarray:
+    """(n_vargas, 12 signs, max parts) array of varga signs."""
+    width = max(parts for parts, _ in VARGA_MAP.values())
+    tables = np.zeros((len(VARGA_MAP), 12, width), dtype=np.int8)
+    for row, (parts, rule) in enumerate(VARGA_MAP.values()):
+        for sign in range(12):
+            for part in range(parts):
+                tables[row, sign, part] = rule(sign, part)
+    return tables
+
+
+VARGA_INDEX = {label: row for row, label in enumerate(VARGA_MAP)}
+VARGA_PARTS = np.array([parts for parts, _ in VARGA_MAP.values()])
+VARGA_TABLES = _build_tables()
+
+
+# ---------------------------------------------------------------------
+# SIGN MATRIX
+# ---------------------------------------------------------------------
+
+def _normalize_vargas(varga_types):
+    """Upper-cased varga labels, validated against VARGA_MAP."""
+    labels = [v.upper() for v in varga_types]
+    unknown = [v for v in labels if v not in VARGA_MAP]
+    if unknown:
+        raise ValueError(f"Unsupported varga type: {', '.join(unknown)}")
+    return labels
+
+
+def varga_sign_matrix(longitudes, varga_types) -> np.ndarray:
+    """
+    Varga sign indices for many planets and vargas in one pass.
+
+    longitudes: sidereal D1 longitudes (degrees), one per planet
+    varga_types: e.g. ["D9", "D10"]
+    Returns an int8 array of shape (len(varga_types), len(longitudes)).
+    """
+    labels = _normalize_vargas(varga_types)
+    rows = np.array([VARGA_INDEX[label] for label in labels], dtype=np.int64)
+    longitudes = np.asarray(longitudes, dtype=float) % 360
+    sign = (longitudes // 30).astype(np.int64)
+    within = longitudes % 30
+
+    parts = VARGA_PARTS[rows][:, None]
+    part = np.minimum((within * parts / 30).astype(np.int64), parts - 1)
+    return VARGA_TABLES[rows[:, None], sign, part]
+
+
 # ---------------------------------------------------------------------
 # MAIN DISPATCHER
 # ---------------------------------------------------------------------
 
+def get_varga_charts(base_chart: dict, varga_types) -> dict:
+    """
+    Several divisional charts from one sign matrix.
+    Returns {varga_type: chart dict} in the order requested.
+    """
+    labels = _normalize_vargas(varga_types)
+    planets = list(base_chart["positions"])
+    longitudes = [base_chart["positions"][p]["longitude"] for p in planets]
+    matrix = varga_sign_matrix(longitudes, labels)
+
+    charts = {}
+    for label, row in zip(labels, matrix.tolist()):
+        charts[label] = {
+            "chart_id": base_chart.get("chart_id"),
+            "varga": label,
+            "planets": {
+                planet: {
+                    "sign_index": sign,
+                    "sign_name": SIGNS[sign],
+                    "longitude": longi
+                }
+                for planet, longi, sign in zip(planets, longitudes, row)
+            }
+        }
+    return charts
+
+
 def get_varga_chart(base_chart: dict, varga_type: str) -> dict:
     """
     Dispatcher for all divisional charts.
     base_chart: output from chart_calculator.calculate_chart()
     varga_type: e.g. "D9"
     """
-    varga_type = varga_type.upper()
-    if varga_type not in VARGA_MAP:
-        raise ValueError(f"Unsupported varga type: {varga_type}")
-    return VARGA_MAP[varga_type](base_chart)
\ No newline at end of file
+    return get_varga_charts(base_chart, [varga_type])[varga_type.upper()]
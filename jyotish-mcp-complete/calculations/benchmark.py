@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Timings of the calculation engine, compared with a baseline
+
+Covers chart calculation, every divisional chart in VARGA_MAP, dasha
+periods and the current dasha, transits, chart store reads and listings
+at several store sizes, and end-to-end CLI / worker invocations. Everything
+runs offline against a temporary chart store; nothing is written to the
+real .charts_cache.
+
+Each benchmark times `number` calls per sample over `repeat` samples and
+reports the median (and minimum) seconds per call. Results are JSON; with
+a baseline, a benchmark whose median is more than --max-regression slower
+than the baseline's fails the run (exit status 1). Baselines are machine
+specific: record one on the machine that runs the comparison.
+
+Usage:
+    python benchmark.py [--baseline PATH] [--max-regression 0.5]
+                        [--sizes 1000,10000,100000] [--filter TEXT]
+                        [--repeat 5] [--output PATH] [--update-baseline]
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+try:
+    import chart_calculator
+    import dasha_calculator
+    import transit_calculator
+    import varga_calculator
+    from chart_store import SqliteChartStore
+except ImportError:
+    sys.path.insert(0, os.path.dirname(__file__))
+    import chart_calculator
+    import dasha_calculator
+    import transit_calculator
+    import varga_calculator
+    from chart_store import SqliteChartStore
+
+CALCULATIONS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(CALCULATIONS_DIR, 'benchmark_baseline.json')
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+DEFAULT_REPEAT = 5
+
+# A benchmark fails when its median is this fraction slower than baseline
+DEFAULT_MAX_REGRESSION = 0.5
+
+# Aim for samples of at least this many seconds when choosing `number`
+MIN_SAMPLE_SECONDS = 0.05
+
+# Charts written per put_many call while filling a store
+FILL_BATCH = 5000
+
+BIRTH_DATA = {
+    'name': 'Benchmark',
+    'datetime': '1953-09-27T03:40:00Z',
+    'timezone': 'Asia/Kolkata',
+    'latitude': 9.1,
+    'longitude': 76.5,
+}
+TRANSIT_DATE = '2024-06-01T00:00:00Z'
+
+
+def _modules_with_charts_dir():
+    return [chart_calculator, dasha_calculator, transit_calculator, varga_calculator]
+
+
+def time_call(fn, repeat=DEFAULT_REPEAT, number=None):
+    """
+    Median and minimum seconds per call of `fn`
+
+    `number` (calls per sample) is chosen so a sample takes at least
+    MIN_SAMPLE_SECONDS unless given.
+    """
+    if number is None:
+        fn()  # warm caches and lazy imports before calibrating
+        start = time.perf_counter()
+        fn()
+        once = time.perf_counter() - start
+        number = max(1, int(MIN_SAMPLE_SECONDS / once) if once > 0 else 1000)
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+    return {
+        'median_s': statistics.median(samples),
+        'min_s': min(samples),
+        'repeat': repeat,
+        'number': number
+    }
+
+
+def fill_store(store, template, count):
+    """Write `count` copies of a chart dict under fresh IDs and names"""
+    ids = []
+    for first in range(0, count, FILL_BATCH):
+        batch = []
+        for i in range(first, min(first + FILL_BATCH, count)):
+            chart_id = f'bench-{i:07d}'
+            batch.append({**template, 'chart_id': chart_id, 'name': f'Person {i:07d}',
+                          'julian_day': template['julian_day'] + i * 0.37})
+            ids.append(chart_id)
+        store.put_many(batch)
+    return ids
+
+
+def _cli(*args):
+    """Run a calculator script the way the MCP server's CLI fallback does"""
+    subprocess.run([sys.executable, *args], cwd=CALCULATIONS_DIR, check=True,
+                   capture_output=True)
+
+
+def _worker_ping():
+    subprocess.run([sys.executable, 'engine_worker.py'], input=b'{"id": 1, "op": "ping"}\n',
+                   cwd=CALCULATIONS_DIR, check=True, capture_output=True)
+
+
+def benchmarks(workdir, sizes):
+    """
+    (name, function, number) of every benchmark, in run order
+
+    `number` is None to pick calls per sample automatically. Charts are
+    stored under `workdir`.
+    """
+    charts_dir = os.path.join(workdir, 'charts')
+    for module in _modules_with_charts_dir():
+        module.CHARTS_DIR = charts_dir
+
+    chart = chart_calculator.calculate_chart(BIRTH_DATA)
+    chart_id = chart['chart_id']
+    moon = chart['planets']['Moon']['longitude']
+
+    def create_cached():
+        chart_calculator.calculate_chart(BIRTH_DATA)
+
+    def current_dasha():
+        dasha_calculator.timeline_cache.clear()
+        dasha_calculator.get_current_dasha(chart_id, TRANSIT_DATE, depth=5)
+
+    def transits():
+        transit_calculator.snapshot_cache.clear()
+        transit_calculator.calculate_transits(chart_id, TRANSIT_DATE)
+
+    yield 'chart.compute', lambda: chart_calculator.compute_chart(BIRTH_DATA), None
+    yield 'chart.create_cached', create_cached, None
+    for label in varga_calculator.VARGA_MAP:
+        yield f'varga.{label}', (lambda l=label: varga_calculator.divisional_positions(chart, [l])), None
+    yield 'varga.all', lambda: varga_calculator.divisional_positions(
+        chart, list(varga_calculator.VARGA_MAP)), None
+    yield 'dasha.generate_periods', lambda: dasha_calculator.generate_dasha_periods(
+        BIRTH_DATA['datetime'], moon), None
+    yield 'dasha.current', current_dasha, None
+    yield 'transit.calculate', transits, None
+
+    rng = np.random.default_rng(0)
+    for size in sizes:
+        store = SqliteChartStore(os.path.join(workdir, f'store-{size}', 'charts.db'))
+        ids = fill_store(store, chart, size)
+        picks = iter(rng.choice(ids, 1_000_000).tolist())
+        _, middle_cursor = store.list_page(size // 2 or 1, order_by='name')
+
+        yield f'store.read.{size}', lambda s=store: s.get(next(picks)), None
+        yield f'store.list.{size}', lambda s=store: s.list_page(50, order_by='name'), None
+        yield f'store.list_deep.{size}', (lambda s=store, c=middle_cursor: s.list_page(
+            50, cursor=c, order_by='name')), None
+
+    events = json.dumps({'action': 'events', 'planet': 'Moon', 'start_date': '2024-01-01',
+                         'end_date': '2024-02-01', 'boundary': 'nakshatra'})
+    yield 'cli.transit_events', lambda: _cli('transit_calculator.py', events), 1
+    yield 'cli.worker_ping', _worker_ping, 1
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, repeat=DEFAULT_REPEAT, name_filter=None):
+    """
+    Run the suite in a temporary directory
+
+    Returns:
+        dict with machine metadata and per-benchmark timings
+    """
+    saved = {module: module.CHARTS_DIR for module in _modules_with_charts_dir()}
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            for name, fn, number in benchmarks(workdir, sizes):
+                if name_filter and name_filter not in name:
+                    continue
+                results[name] = time_call(fn, repeat, number)
+    finally:
+        for module, charts_dir in saved.items():
+            module.CHARTS_DIR = charts_dir
+        chart_calculator.chart_cache.clear()
+        dasha_calculator.timeline_cache.clear()
+        transit_calculator.snapshot_cache.clear()
+
+    return {
+        'machine': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'processor': platform.processor() or platform.machine(),
+            'numpy': np.__version__
+        },
+        'created': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'sizes': list(sizes),
+        'results': results
+    }
+
+
+def compare(results, baseline, max_regression=DEFAULT_MAX_REGRESSION):
+    """
+    Benchmarks slower than the baseline by more than `max_regression`
+
+    Only benchmarks present in both runs are compared.
+
+    Returns:
+        list of {name, baseline_s, current_s, change} dicts, worst first
+    """
+    regressions = []
+    for name, current in results['results'].items():
+        previous = baseline['results'].get(name)
+        if previous is None:
+            continue
+        change = current['median_s'] / previous['median_s'] - 1
+        if change > max_regression:
+            regressions.append({'name': name, 'baseline_s': previous['median_s'],
+                                'current_s': current['median_s'], 'change': round(change, 3)})
+    return sorted(regressions, key=lambda r: -r['change'])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the calculation engine')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                        help='baseline results to compare with (skipped if missing)')
+    parser.add_argument('--max-regression', type=float, default=DEFAULT_MAX_REGRESSION,
+                        help='allowed slowdown of a median, as a fraction (0.5 = 50%%)')
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help='chart store sizes, comma separated')
+    parser.add_argument('--filter', help='only run benchmarks whose name contains this')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--output', help='also write the results to this file')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='write the results as the new baseline instead of comparing')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    report = run_benchmarks(sizes, args.repeat, args.filter)
+
+    if args.update_baseline:
+        args.output = args.baseline
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            report['regressions'] = compare(report, json.load(f), args.max_regression)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    print(text)
+    sys.exit(1 if report.get('regressions') else 0)
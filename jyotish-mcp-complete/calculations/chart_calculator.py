@@ -1,51 +1,178 @@
 #!/usr/bin/env python3
 """
 Chart Calculator - Main orchestrator for birth chart calculations
-Handles chart creation, reading, and listing operations
+Handles chart creation (single and batch), reading, and listing operations
 """
 
 import sys
 import json
 import swisseph as swe
-from datetime import datetime
+from datetime import datetime, timezone
 import os
 import uuid
-from pathlib import Path
-
-# Set ephemeris path
-ephe_path = os.path.join(os.path.dirname(__file__), 'ephemeris_data')
-swe.set_ephe_path(ephe_path)
-swe.set_sid_mode(swe.SIDM_LAHIRI)  # Lahiri ayanamsa
+import hashlib
 
 # Import constants
 try:
-    from constants import (
-        RASHIS, 
-        NAKSHATRAS, 
-        get_nakshatra_from_longitude,
-        get_rashi_from_longitude,
-        get_house_from_longitude
-    )
+    from constants import ENGINE_SETTINGS
+    from chart_model import Chart, PlanetPosition
+    from ephemeris import init_ephemeris, julian_day, planet_positions
+    from lru import LRUCache, cache_size_from_env
+    from chart_store import get_store
 except ImportError:
     # Fallback if not imported as module
-    import sys
     sys.path.insert(0, os.path.dirname(__file__))
-    from constants import (
-        RASHIS,
-        NAKSHATRAS,
-        get_nakshatra_from_longitude,
-        get_rashi_from_longitude,
-        get_house_from_longitude
-    )
-
-# Simple file-based storage (will migrate to PostgreSQL later)
+    from constants import ENGINE_SETTINGS
+    from chart_model import Chart, PlanetPosition
+    from ephemeris import init_ephemeris, julian_day, planet_positions
+    from lru import LRUCache, cache_size_from_env
+    from chart_store import get_store
+
+# Chart store location (SQLite database or JSON files, see chart_store);
+# created by the store when it is first opened
 CHARTS_DIR = os.path.join(os.path.dirname(__file__), '.charts_cache')
-os.makedirs(CHARTS_DIR, exist_ok=True)
+
+# Namespace for deterministic chart IDs (uuid5 of the chart key)
+CHART_ID_NAMESPACE = uuid.UUID('8f0b6a8e-2f3c-5d6e-9a4b-7c1d2e3f4a5b')
+
+# chart_list page size (default and upper bound)
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Recently created/read charts as chart_model.Chart, by chart_id (per
+# worker process)
+chart_cache = LRUCache(cache_size_from_env('JYOTISH_CHART_CACHE_SIZE', 1024))
+
+
+def _parse_birth_datetime(value):
+    """
+    Parse an ISO birth datetime, converted to UTC when it has an offset
+
+    A datetime without an offset is taken as UT and returned unchanged.
+    """
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc)
+    return dt
+
+
+def _birth_julian_day(data):
+    """Parse the birth datetime of a record into a Julian day (UT)"""
+    return julian_day(_parse_birth_datetime(data['datetime']))
+
+
+def chart_key(data):
+    """
+    Deterministic key for a chart request
+    
+    Derived from the normalized birth data and ENGINE_SETTINGS, so the same
+    person submitted twice maps to the same key regardless of how the
+    datetime offset or coordinates were written.
+    """
+    dt = _parse_birth_datetime(data['datetime'])
+    
+    normalized = {
+        'name': str(data.get('name', 'Unnamed')).strip(),
+        'datetime': dt.isoformat(),
+        'timezone': data.get('timezone', 'UTC'),
+        'latitude': round(float(data['latitude']), 6),
+        'longitude': round(float(data['longitude']), 6),
+        'engine': ENGINE_SETTINGS,
+    }
+    encoded = json.dumps(normalized, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def chart_id_for(data):
+    """Chart ID (a UUID) that calculate_chart assigns to this birth data"""
+    return str(uuid.uuid5(CHART_ID_NAMESPACE, chart_key(data)))
+
+
+def _build_chart(data, jd, planet_row, chart_id=None):
+    """
+    Assemble a chart from precomputed planet positions
+    
+    Args:
+        data: birth data dict
+        jd: Julian day (UT) of birth
+        planet_row: POSITION_DTYPE row for all of constants.PLANETS at jd
+        chart_id: ID to assign (defaults to chart_id_for(data))
+    
+    Returns:
+        chart_model.Chart
+    """
+    init_ephemeris()
+    
+    # Calculate ascendant
+    lat = data['latitude']
+    lon = data['longitude']
+    
+    # Get houses (returns tuple of cusps and ascmc)
+    houses_result = swe.houses(jd, lat, lon, b'P')  # Placidus for calculation
+    ascendant_tropical = houses_result[1][0]  # Ascendant
+    
+    # Convert to sidereal
+    ayanamsa = swe.get_ayanamsa_ut(jd)
+    ascendant_sidereal = (ascendant_tropical - ayanamsa) % 360
+    
+    positions = tuple(
+        PlanetPosition.at(code, longitude, ascendant_sidereal, speed < 0)
+        for code, (longitude, _, speed) in enumerate(planet_row.tolist()))
+    
+    return Chart(chart_id or chart_id_for(data), data.get('name', 'Unnamed'),
+                 data['datetime'], lat, lon, data.get('timezone', 'UTC'),
+                 ascendant_sidereal, ayanamsa, jd, positions)
+
+
+def compute_chart(data):
+    """
+    Calculate a birth chart without saving it
+    
+    Args:
+        data: dict with datetime, latitude, longitude, timezone, name (optional)
+    
+    Returns:
+        chart_model.Chart with its deterministic chart_id and all planetary
+        positions
+    
+    Raises:
+        KeyError/ValueError on incomplete or malformed birth data
+    """
+    jd = _birth_julian_day(data)
+    return _build_chart(data, jd, planet_positions(jd)[0])
+
+
+def save_charts(charts):
+    """Write computed Charts to the chart store in one operation"""
+    charts = list(charts)
+    if charts:
+        get_store(CHARTS_DIR).put_many([chart.to_dict() for chart in charts])
+    for chart in charts:
+        chart_cache.put(chart.chart_id, chart)
+
+
+def _load_chart(chart_id):
+    """Previously saved Chart by ID (memory cache first), or None"""
+    chart = chart_cache.get(chart_id)
+    if chart is not None:
+        return chart
+    
+    stored = get_store(CHARTS_DIR).get(chart_id)
+    if stored is None:
+        return None
+    chart = Chart.from_dict(stored)
+    chart_cache.put(chart_id, chart)
+    return chart
 
 
 def calculate_chart(data):
     """
-    Calculate complete birth chart
+    Calculate and save a complete birth chart
+    
+    Identical requests (see chart_key) return the already saved chart
+    instead of recalculating it.
     
     Args:
         data: dict with datetime, latitude, longitude, timezone, name (optional)
@@ -54,106 +181,96 @@ def calculate_chart(data):
         dict with chart_id and all planetary positions
     """
     try:
-        # Parse datetime
-        dt_str = data['datetime']
-        if dt_str.endswith('Z'):
-            dt_str = dt_str[:-1] + '+00:00'
-        dt = datetime.fromisoformat(dt_str)
-        
-        # Convert to Julian day (UT)
-        jd = swe.julday(
-            dt.year, dt.month, dt.day,
-            dt.hour + dt.minute/60.0 + dt.second/3600.0
-        )
+        chart_id = chart_id_for(data)
+        existing = _load_chart(chart_id)
+        if existing is not None:
+            return existing.to_dict()
         
-        # Calculate ascendant
-        lat = data['latitude']
-        lon = data['longitude']
+        chart = compute_chart(data)
+        save_charts([chart])
+        return chart.to_dict()
         
-        # Get houses (returns tuple of cusps and ascmc)
-        houses_result = swe.houses(jd, lat, lon, b'P')  # Placidus for calculation
-        ascendant_tropical = houses_result[1][0]  # ARMC
-        
-        # Convert to sidereal
-        ayanamsa = swe.get_ayanamsa_ut(jd)
-        ascendant_sidereal = (ascendant_tropical - ayanamsa) % 360
-        
-        # Calculate planetary positions
-        planets = {
-            'Sun': swe.SUN,
-            'Moon': swe.MOON,
-            'Mars': swe.MARS,
-            'Mercury': swe.MERCURY,
-            'Jupiter': swe.JUPITER,
-            'Venus': swe.VENUS,
-            'Saturn': swe.SATURN,
-            'Rahu': swe.TRUE_NODE,
+    except Exception as e:
+        import traceback
+        return {
+            'error': str(e),
+            'traceback': traceback.format_exc()
         }
+
+
+def calculate_charts_batch(records):
+    """
+    Calculate and save many birth charts in one call
+    
+    Ephemeris setup is shared by the whole batch and all new charts are
+    written in a single store operation at the end. Records matching an
+    already saved chart reuse it. A bad record does not stop the batch; it
+    is reported under 'errors' with its index.
+    
+    Args:
+        records: list of birth data dicts (same fields as calculate_chart)
+    
+    Returns:
+        dict with count, chart summaries (in input order) and errors
+    """
+    try:
+        errors = []
         
-        positions = {}
-        
-        for name, planet_id in planets.items():
-            result = swe.calc_ut(jd, planet_id, swe.FLG_SIDEREAL)
-            longitude = result[0][0]  # First element of position tuple
-            speed = result[0][3]
-            
-            rashi = get_rashi_from_longitude(longitude)
-            nakshatra, pada, nak_lord = get_nakshatra_from_longitude(longitude)
-            house = get_house_from_longitude(longitude, ascendant_sidereal)
-            
-            positions[name] = {
-                'longitude': round(longitude, 6),
-                'rashi': rashi,
-                'degree_in_rashi': round(longitude % 30, 2),
-                'nakshatra': nakshatra,
-                'nakshatra_pada': pada,
-                'nakshatra_lord': nak_lord,
-                'house': house,
-                'is_retrograde': speed < 0
-            }
+        def record_error(index, e):
+            errors.append({'index': index, 'error': f'{type(e).__name__}: {e}'})
         
-        # Calculate Ketu (opposite of Rahu)
-        rahu_long = positions['Rahu']['longitude']
-        ketu_long = (rahu_long + 180) % 360
+        # Resolve chart IDs first: already saved charts (and repeats within
+        # the batch) are reused, the rest are parsed for one array call
+        results = {}
+        parsed = []
+        pending_ids = set()
+        for index, record in enumerate(records):
+            try:
+                chart_id = chart_id_for(record)
+                existing = _load_chart(chart_id)
+                if existing is not None:
+                    results[index] = existing
+                elif chart_id not in pending_ids:
+                    parsed.append((index, record, chart_id, _birth_julian_day(record)))
+                    pending_ids.add(chart_id)
+                else:
+                    results[index] = chart_id  # filled in once computed
+            except Exception as e:
+                record_error(index, e)
         
-        positions['Ketu'] = {
-            'longitude': round(ketu_long, 6),
-            'rashi': get_rashi_from_longitude(ketu_long),
-            'degree_in_rashi': round(ketu_long % 30, 2),
-            'nakshatra': get_nakshatra_from_longitude(ketu_long)[0],
-            'nakshatra_pada': get_nakshatra_from_longitude(ketu_long)[1],
-            'nakshatra_lord': get_nakshatra_from_longitude(ketu_long)[2],
-            'house': get_house_from_longitude(ketu_long, ascendant_sidereal),
-            'is_retrograde': False
-        }
+        rows = planet_positions([jd for _, _, _, jd in parsed])
         
-        # Generate chart ID
-        chart_id = str(uuid.uuid4())
+        computed = {}
+        for (index, record, chart_id, jd), planet_row in zip(parsed, rows):
+            try:
+                computed[chart_id] = results[index] = _build_chart(
+                    record, jd, planet_row, chart_id)
+            except Exception as e:
+                record_error(index, e)
+        errors.sort(key=lambda error: error['index'])
         
-        # Build chart data
-        chart_data = {
-            'chart_id': chart_id,
-            'name': data.get('name', 'Unnamed'),
-            'datetime': data['datetime'],
-            'latitude': lat,
-            'longitude': lon,
-            'timezone': data.get('timezone', 'UTC'),
-            'ascendant': {
-                'longitude': round(ascendant_sidereal, 6),
-                'rashi': get_rashi_from_longitude(ascendant_sidereal),
-                'degree': round(ascendant_sidereal % 30, 2)
-            },
-            'planets': positions,
-            'ayanamsa': round(ayanamsa, 6),
-            'julian_day': jd
-        }
+        save_charts(computed.values())
         
-        # Save to file cache
-        cache_file = os.path.join(CHARTS_DIR, f'{chart_id}.json')
-        with open(cache_file, 'w') as f:
-            json.dump(chart_data, f, indent=2)
+        charts = []
+        for index in sorted(results):
+            chart = results[index]
+            if isinstance(chart, str):
+                chart = computed.get(chart)
+            if chart is not None:
+                charts.append(chart)
         
-        return chart_data
+        return {
+            'count': len(charts),
+            'charts': [
+                {
+                    'chart_id': chart.chart_id,
+                    'name': chart.name,
+                    'datetime': chart.datetime
+                }
+                for chart in charts
+            ],
+            'errors': errors
+        }
         
     except Exception as e:
         import traceback
@@ -163,53 +280,88 @@ def calculate_chart(data):
         }
 
 
+def load_batch_records(path):
+    """Read birth records from a JSON array or newline-delimited JSON file"""
+    with open(path, 'r') as f:
+        text = f.read()
+    if text.lstrip().startswith('['):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
 def read_chart(chart_id):
     """Read a chart from cache by ID"""
     try:
-        cache_file = os.path.join(CHARTS_DIR, f'{chart_id}.json')
-        if not os.path.exists(cache_file):
+        chart = _load_chart(chart_id)
+        if chart is None:
             return {'error': f'Chart {chart_id} not found'}
-        
-        with open(cache_file, 'r') as f:
-            return json.load(f)
+        return chart.to_dict()
     except Exception as e:
         return {'error': str(e)}
 
 
-def list_charts():
-    """List all saved charts"""
+def list_charts(limit=DEFAULT_PAGE_SIZE, cursor=None, name_prefix=None,
+                born_after=None, born_before=None, order_by='created',
+                direction='asc'):
+    """
+    List saved charts one page at a time
+    
+    Args:
+        limit: page size (1 to MAX_PAGE_SIZE)
+        cursor: next_cursor of the previous page; pass the same filters
+        name_prefix: only charts whose name starts with this
+        born_after, born_before: ISO datetimes bounding the birth time
+            (inclusive / exclusive)
+        order_by: 'created', 'name' or 'datetime'
+        direction: 'asc' or 'desc'
+    
+    Returns:
+        dict with chart summaries and next_cursor (None on the last page)
+    """
     try:
-        charts = []
-        for filename in os.listdir(CHARTS_DIR):
-            if filename.endswith('.json'):
-                with open(os.path.join(CHARTS_DIR, filename), 'r') as f:
-                    chart = json.load(f)
-                    charts.append({
-                        'chart_id': chart['chart_id'],
-                        'name': chart['name'],
-                        'datetime': chart['datetime']
-                    })
-        return {'charts': charts}
+        limit = int(limit)
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise ValueError(f'limit must be between 1 and {MAX_PAGE_SIZE}')
+        
+        jd_from = _birth_julian_day({'datetime': born_after}) if born_after else None
+        jd_to = _birth_julian_day({'datetime': born_before}) if born_before else None
+        
+        charts, next_cursor = get_store(CHARTS_DIR).list_page(
+            limit, cursor=cursor, name_prefix=name_prefix, jd_from=jd_from,
+            jd_to=jd_to, order_by=order_by, direction=direction)
+        return {'charts': charts, 'next_cursor': next_cursor}
     except Exception as e:
         return {'error': str(e)}
 
 
+def handle_request(input_data):
+    """Dispatch a CLI/worker request to the matching chart operation"""
+    action = input_data.get('action', 'create')
+    
+    if action == 'create':
+        return calculate_chart(input_data)
+    elif action == 'create_batch':
+        if 'records_file' in input_data:
+            records = load_batch_records(input_data['records_file'])
+        else:
+            records = input_data['records']
+        return calculate_charts_batch(records)
+    elif action == 'read':
+        return read_chart(input_data['chart_id'])
+    elif action == 'list':
+        options = {key: input_data[key] for key in (
+            'limit', 'cursor', 'name_prefix', 'born_after', 'born_before',
+            'order_by', 'direction') if input_data.get(key) is not None}
+        return list_charts(**options)
+    else:
+        return {'error': f'Unknown action: {action}'}
+
+
 if __name__ == '__main__':
     try:
         # Read input from command line
         input_data = json.loads(sys.argv[1])
-        
-        action = input_data.get('action', 'create')
-        
-        if action == 'create':
-            result = calculate_chart(input_data)
-        elif action == 'read':
-            result = read_chart(input_data['chart_id'])
-        elif action == 'list':
-            result = list_charts()
-        else:
-            result = {'error': f'Unknown action: {action}'}
-        
+        result = handle_request(input_data)
         print(json.dumps(result))
         
     except Exception as e:
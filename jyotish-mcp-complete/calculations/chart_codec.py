@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Chart Codec - Versioned compact binary encoding of chart dicts
+
+A chart in the engine's JSON shape (see chart_model.Chart.to_dict) packs
+into a few hundred bytes instead of ~1.7 KB of JSON:
+
+    header   magic b'JYCH', format version, engine settings
+             (ayanamsa, node, houses codes and engine version)
+    fixed    julian_day, latitude, longitude, ayanamsa and ascendant
+             longitude as doubles; ascendant degree (hundredths) and rashi;
+             flags for birth coordinates given as integers
+    strings  chart_id, name, datetime, timezone (length-prefixed UTF-8)
+    planets  per graha in constants.PLANETS order: longitude (double),
+             degree in rashi (hundredths), rashi, nakshatra, pada, house
+             and retrograde flag as small ints
+
+Names (rashi, nakshatra, nakshatra lord) are not stored; decoding looks
+them up from the codes, so decode_chart(encode_chart(chart)) == chart.
+Charts in any other shape are rejected with ValueError, and callers keep
+those as JSON.
+"""
+
+import os
+import struct
+import sys
+
+try:
+    from constants import PLANETS, RASHIS, NAKSHATRAS, RASHI_CODES, NAKSHATRA_CODES, ENGINE_SETTINGS
+except ImportError:
+    sys.path.insert(0, os.path.dirname(__file__))
+    from constants import PLANETS, RASHIS, NAKSHATRAS, RASHI_CODES, NAKSHATRA_CODES, ENGINE_SETTINGS
+
+MAGIC = b'JYCH'
+FORMAT_VERSION = 1
+
+# Engine setting values -> header codes
+AYANAMSA_CODES = {'Lahiri': 0}
+NODE_CODES = {'True': 0, 'Mean': 1}
+HOUSE_CODES = {'Whole Sign': 0}
+
+HEADER = struct.Struct('<4sBBBBH')
+FIXED = struct.Struct('<5dHBB')
+STRING_LENGTH = struct.Struct('<H')
+PLANET = struct.Struct('<dHBBBBB')
+
+CHART_KEYS = {'chart_id', 'name', 'datetime', 'latitude', 'longitude', 'timezone',
+              'ascendant', 'planets', 'ayanamsa', 'julian_day'}
+ASCENDANT_KEYS = {'longitude', 'rashi', 'degree'}
+PLANET_KEYS = {'longitude', 'rashi', 'degree_in_rashi', 'nakshatra', 'nakshatra_pada',
+               'nakshatra_lord', 'house', 'is_retrograde'}
+
+RETROGRADE = 1
+INTEGER_LATITUDE = 1
+INTEGER_LONGITUDE = 2
+
+
+def _check(condition, message):
+    if not condition:
+        raise ValueError(f'Chart cannot be encoded: {message}')
+
+
+def _hundredths(value):
+    """Degree rounded to 0.01 as an integer count of hundredths"""
+    count = int(round(value * 100))
+    _check(round(count / 100, 2) == value, f'degree {value!r} is not in hundredths')
+    return count
+
+
+def _pack_string(value):
+    _check(isinstance(value, str), f'{value!r} is not a string')
+    data = value.encode('utf-8')
+    return STRING_LENGTH.pack(len(data)) + data
+
+
+def _engine_header(engine):
+    return HEADER.pack(MAGIC, FORMAT_VERSION, AYANAMSA_CODES[engine['ayanamsa']],
+                       NODE_CODES[engine['node']], HOUSE_CODES[engine['houses']],
+                       engine['version'])
+
+
+def encode_chart(chart, engine=ENGINE_SETTINGS):
+    """
+    Binary encoding of a chart dict
+
+    Args:
+        chart: chart in the engine's JSON shape
+        engine: engine settings recorded in the header
+
+    Returns:
+        bytes
+
+    Raises:
+        ValueError if the chart is not in the engine's JSON shape
+    """
+    try:
+        return _encode(chart, engine)
+    except (KeyError, TypeError, struct.error) as e:
+        raise ValueError(f'Chart cannot be encoded: {type(e).__name__}: {e}')
+
+
+def _encode(chart, engine):
+    _check(set(chart) == CHART_KEYS, 'unexpected top-level fields')
+    ascendant, planets = chart['ascendant'], chart['planets']
+    _check(set(ascendant) == ASCENDANT_KEYS, 'unexpected ascendant fields')
+    _check(list(planets) == PLANETS, 'planets differ from constants.PLANETS')
+    for name in ('ayanamsa', 'julian_day'):
+        _check(isinstance(chart[name], float), f'{name} is not a float')
+    coordinate_flags = 0
+    for name, flag in (('latitude', INTEGER_LATITUDE), ('longitude', INTEGER_LONGITUDE)):
+        _check(type(chart[name]) in (int, float), f'{name} is not a number')
+        if isinstance(chart[name], int):
+            _check(float(chart[name]) == chart[name], f'{name} does not fit a double')
+            coordinate_flags |= flag
+
+    parts = [
+        _engine_header(engine),
+        FIXED.pack(chart['julian_day'], chart['latitude'], chart['longitude'], chart['ayanamsa'],
+                   ascendant['longitude'], _hundredths(ascendant['degree']),
+                   RASHI_CODES[ascendant['rashi']], coordinate_flags)
+    ]
+    parts += [_pack_string(chart[name]) for name in ('chart_id', 'name', 'datetime', 'timezone')]
+
+    for name in PLANETS:
+        planet = planets[name]
+        _check(set(planet) == PLANET_KEYS, f'unexpected fields for {name}')
+        nakshatra = NAKSHATRA_CODES[planet['nakshatra']]
+        _check(planet['nakshatra_lord'] == NAKSHATRAS[nakshatra]['lord'],
+               f'nakshatra lord of {name}')
+        _check(isinstance(planet['is_retrograde'], bool), f'retrograde flag of {name}')
+        parts.append(PLANET.pack(
+            planet['longitude'], _hundredths(planet['degree_in_rashi']),
+            RASHI_CODES[planet['rashi']], nakshatra, planet['nakshatra_pada'], planet['house'],
+            RETROGRADE if planet['is_retrograde'] else 0))
+
+    return b''.join(parts)
+
+
+def read_header(data):
+    """
+    Format version and engine settings of an encoded chart
+
+    Raises:
+        ValueError if the data is not an encoded chart of a known version
+    """
+    if len(data) < HEADER.size:
+        raise ValueError('Not an encoded chart')
+    magic, version, ayanamsa, node, houses, engine_version = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError('Not an encoded chart')
+    if version != FORMAT_VERSION:
+        raise ValueError(f'Unsupported chart format version: {version}')
+
+    def name(codes, code):
+        return next(key for key, value in codes.items() if value == code)
+
+    return {
+        'format_version': version,
+        'engine': {
+            'ayanamsa': name(AYANAMSA_CODES, ayanamsa),
+            'node': name(NODE_CODES, node),
+            'houses': name(HOUSE_CODES, houses),
+            'version': engine_version
+        }
+    }
+
+
+def decode_chart(data):
+    """
+    Chart dict from its binary encoding
+
+    Raises:
+        ValueError if the data is not an encoded chart of a known version
+    """
+    read_header(data)
+    offset = HEADER.size
+    (julian_day, latitude, longitude, ayanamsa, asc_longitude, asc_degree, asc_rashi,
+     coordinate_flags) = FIXED.unpack_from(data, offset)
+    offset += FIXED.size
+    if coordinate_flags & INTEGER_LATITUDE:
+        latitude = int(latitude)
+    if coordinate_flags & INTEGER_LONGITUDE:
+        longitude = int(longitude)
+
+    strings = []
+    for _ in range(4):
+        (length,) = STRING_LENGTH.unpack_from(data, offset)
+        offset += STRING_LENGTH.size
+        strings.append(data[offset:offset + length].decode('utf-8'))
+        offset += length
+    chart_id, name, birth_datetime, timezone = strings
+
+    planets = {}
+    for planet_name in PLANETS:
+        lon, degree, rashi, nakshatra, pada, house, flags = PLANET.unpack_from(data, offset)
+        offset += PLANET.size
+        planets[planet_name] = {
+            'longitude': lon,
+            'rashi': RASHIS[rashi],
+            'degree_in_rashi': round(degree / 100, 2),
+            'nakshatra': NAKSHATRAS[nakshatra]['name'],
+            'nakshatra_pada': pada,
+            'nakshatra_lord': NAKSHATRAS[nakshatra]['lord'],
+            'house': house,
+            'is_retrograde': bool(flags & RETROGRADE)
+        }
+
+    return {
+        'chart_id': chart_id,
+        'name': name,
+        'datetime': birth_datetime,
+        'latitude': latitude,
+        'longitude': longitude,
+        'timezone': timezone,
+        'ascendant': {
+            'longitude': asc_longitude,
+            'rashi': RASHIS[asc_rashi],
+            'degree': round(asc_degree / 100, 2)
+        },
+        'planets': planets,
+        'ayanamsa': ayanamsa,
+        'julian_day': julian_day
+    }
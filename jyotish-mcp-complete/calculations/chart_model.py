@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Chart Model - Compact in-memory representation of a birth chart
+
+Charts travel as JSON dicts (tool results, the chart store), where every
+graha repeats its rashi, nakshatra and nakshatra lord as strings. Inside
+the engine a chart is a slotted Chart holding one slotted PlanetPosition
+per graha, with planets, rashis and nakshatras as integer codes (indices
+into constants.PLANETS, RASHIS and NAKSHATRAS). Names are produced only by
+to_dict(), at the API boundary.
+"""
+
+import os
+import sys
+
+try:
+    from constants import (
+        PLANETS, RASHIS, NAKSHATRAS, RASHI_CODES, NAKSHATRA_CODES,
+        get_rashi_index, get_nakshatra_index, get_house_from_longitude
+    )
+except ImportError:
+    sys.path.insert(0, os.path.dirname(__file__))
+    from constants import (
+        PLANETS, RASHIS, NAKSHATRAS, RASHI_CODES, NAKSHATRA_CODES,
+        get_rashi_index, get_nakshatra_index, get_house_from_longitude
+    )
+
+
+class PlanetPosition:
+    """Sidereal position of one graha with integer sign and nakshatra codes"""
+
+    __slots__ = ('planet', 'longitude', 'rashi', 'nakshatra', 'pada', 'house', 'retrograde')
+
+    def __init__(self, planet, longitude, rashi, nakshatra, pada, house, retrograde):
+        self.planet = planet
+        self.longitude = longitude
+        self.rashi = rashi
+        self.nakshatra = nakshatra
+        self.pada = pada
+        self.house = house
+        self.retrograde = retrograde
+
+    @classmethod
+    def at(cls, planet, longitude, ascendant, retrograde):
+        """Position of graha code `planet` at a sidereal longitude"""
+        nakshatra, pada = get_nakshatra_index(longitude)
+        return cls(planet, longitude, get_rashi_index(longitude), nakshatra, pada,
+                   get_house_from_longitude(longitude, ascendant), retrograde)
+
+    @classmethod
+    def from_dict(cls, planet, entry):
+        """Position of graha code `planet` from its chart JSON entry"""
+        return cls(planet, entry['longitude'], RASHI_CODES[entry['rashi']],
+                   NAKSHATRA_CODES[entry['nakshatra']], entry['nakshatra_pada'],
+                   entry['house'], entry['is_retrograde'])
+
+    def to_dict(self):
+        """Chart JSON entry of this position"""
+        return {
+            'longitude': round(self.longitude, 6),
+            'rashi': RASHIS[self.rashi],
+            'degree_in_rashi': round(self.longitude % 30, 2),
+            'nakshatra': NAKSHATRAS[self.nakshatra]['name'],
+            'nakshatra_pada': self.pada,
+            'nakshatra_lord': NAKSHATRAS[self.nakshatra]['lord'],
+            'house': self.house,
+            'is_retrograde': self.retrograde
+        }
+
+
+class Chart:
+    """Birth chart: birth data, sidereal ascendant and one position per graha"""
+
+    __slots__ = ('chart_id', 'name', 'datetime', 'latitude', 'longitude', 'timezone',
+                 'ascendant', 'ayanamsa', 'julian_day', 'positions')
+
+    def __init__(self, chart_id, name, datetime, latitude, longitude, timezone,
+                 ascendant, ayanamsa, julian_day, positions):
+        self.chart_id = chart_id
+        self.name = name
+        self.datetime = datetime
+        self.latitude = latitude
+        self.longitude = longitude
+        self.timezone = timezone
+        self.ascendant = ascendant
+        self.ayanamsa = ayanamsa
+        self.julian_day = julian_day
+        # Tuple of PlanetPosition in constants.PLANETS order
+        self.positions = positions
+
+    @classmethod
+    def from_dict(cls, chart):
+        """Chart from its JSON dict (as stored or returned by the tools)"""
+        planets = chart['planets']
+        return cls(chart['chart_id'], chart['name'], chart['datetime'], chart['latitude'],
+                   chart['longitude'], chart['timezone'], chart['ascendant']['longitude'],
+                   chart['ayanamsa'], chart['julian_day'],
+                   tuple(PlanetPosition.from_dict(code, planets[name])
+                         for code, name in enumerate(PLANETS)))
+
+    def to_dict(self):
+        """JSON dict of the chart, in the shape the tools return"""
+        return {
+            'chart_id': self.chart_id,
+            'name': self.name,
+            'datetime': self.datetime,
+            'latitude': self.latitude,
+            'longitude': self.longitude,
+            'timezone': self.timezone,
+            'ascendant': {
+                'longitude': round(self.ascendant, 6),
+                'rashi': RASHIS[get_rashi_index(self.ascendant)],
+                'degree': round(self.ascendant % 30, 2)
+            },
+            'planets': {PLANETS[p.planet]: p.to_dict() for p in self.positions},
+            'ayanamsa': round(self.ayanamsa, 6),
+            'julian_day': self.julian_day
+        }
@@ -0,0 +1,562 @@
+#!/usr/bin/env python3
+"""
+Chart Store - Persistent storage for calculated charts
+
+Two interchangeable backends:
+- SqliteChartStore (default): one embedded SQLite database in WAL mode with
+  indexed summary columns, so lookups and listings do not touch every chart
+- JsonDirChartStore: the original one-JSON-file-per-chart layout, kept for
+  reading old caches and for migration
+
+The backend is chosen with JYOTISH_CHART_STORE ('sqlite' or 'json').
+
+The SQLite store keeps charts in the engine's shape in the compact binary
+format of chart_codec (a few hundred bytes each); anything else, and rows
+written before the codec existed, stay JSON text and are read as before.
+
+The SQLite store also keeps a reverse index of natal placements (sign,
+nakshatra and pada of every graha and the ascendant), so "which charts
+have their Moon in Capricorn" is an index range scan over the matches.
+
+Usage:
+    python chart_store.py migrate [--source DIR] [--target DIR]
+    python chart_store.py reindex [--target DIR]
+"""
+
+import argparse
+import base64
+import json
+import os
+import sqlite3
+import sys
+import time
+
+try:
+    from chart_codec import encode_chart, decode_chart
+except ImportError:
+    sys.path.insert(0, os.path.dirname(__file__))
+    from chart_codec import encode_chart, decode_chart
+
+DEFAULT_BACKEND = 'sqlite'
+SQLITE_FILENAME = 'charts.db'
+
+# Charts written per transaction when migrating
+MIGRATION_BATCH = 500
+
+# list_page sort keys -> summary column
+ORDER_COLUMNS = {
+    'created': 'created_at',
+    'name': 'name',
+    'datetime': 'birth_jd',
+}
+
+
+def encode_cursor(order_by, direction, value, chart_id):
+    """Opaque cursor for the page after the row (value, chart_id)"""
+    raw = json.dumps([order_by, direction, value, chart_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor, order_by, direction):
+    """(value, chart_id) from a cursor made for the same sort order"""
+    try:
+        cursor_order, cursor_direction, value, chart_id = json.loads(
+            base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (ValueError, TypeError):
+        raise ValueError('Invalid cursor')
+    if (cursor_order, cursor_direction) != (order_by, direction):
+        raise ValueError('Cursor was issued for a different sort order')
+    return value, chart_id
+
+
+# Natal placement kinds in the reverse index -> segments of the zodiac
+POSITION_KINDS = {
+    'sign': 12,
+    'nakshatra': 27,
+    'pada': 108,
+}
+
+
+def segment_index(longitude, n_segments):
+    """Index of the 360/n_segments degree segment holding a longitude"""
+    return int(longitude % 360 * n_segments // 360)
+
+
+def natal_positions(chart):
+    """
+    Reverse index rows of a chart: (point, sign, nakshatra, pada)
+
+    Points are the grahas and 'Ascendant'; sign, nakshatra and pada are
+    0-based indices (12, 27 and 108 segments of the zodiac).
+    """
+    points = [(name, planet['longitude']) for name, planet in chart.get('planets', {}).items()]
+    if 'ascendant' in chart:
+        points.append(('Ascendant', chart['ascendant']['longitude']))
+    return [
+        (point,) + tuple(segment_index(longitude, n) for n in POSITION_KINDS.values())
+        for point, longitude in points
+    ]
+
+
+def _check_kind(kind):
+    if kind not in POSITION_KINDS:
+        raise ValueError(f'kind must be one of {list(POSITION_KINDS)}')
+
+
+def _check_order(order_by, direction):
+    if order_by not in ORDER_COLUMNS:
+        raise ValueError(f'order_by must be one of {sorted(ORDER_COLUMNS)}')
+    if direction not in ('asc', 'desc'):
+        raise ValueError("direction must be 'asc' or 'desc'")
+
+
+def _encode_row(chart):
+    """Stored form of a chart: binary when the codec accepts it, else JSON"""
+    try:
+        return encode_chart(chart)
+    except ValueError:
+        return json.dumps(chart, separators=(',', ':'))
+
+
+def _decode_row(data):
+    """Chart dict from its stored form (binary or JSON text)"""
+    if isinstance(data, bytes):
+        return decode_chart(data)
+    return json.loads(data)
+
+
+def _summary(chart):
+    """The fields chart listings return"""
+    return {
+        'chart_id': chart['chart_id'],
+        'name': chart['name'],
+        'datetime': chart['datetime']
+    }
+
+
+class ChartStore:
+    """Interface shared by the storage backends"""
+
+    def get(self, chart_id):
+        """Chart dict by ID, or None if it is not stored"""
+        raise NotImplementedError
+
+    def put_many(self, charts):
+        """Store several charts in one operation"""
+        raise NotImplementedError
+
+    def put(self, chart):
+        self.put_many([chart])
+
+    def iter_charts(self):
+        """Yield every stored chart (streaming, in no particular order)"""
+        raise NotImplementedError
+
+    def iter_placements(self, columns, batch_size=MIGRATION_BATCH):
+        """
+        Reverse index codes of every stored chart, oldest first
+
+        Charts stored together are ordered by chart ID. Charts lacking
+        one of the points are skipped.
+
+        Args:
+            columns: (point, kind) pairs, e.g. [('Moon', 'pada'), ('Mars', 'sign')]
+            batch_size: rows per yielded batch
+
+        Yields:
+            lists of (chart_id, code per column) tuples
+        """
+        raise NotImplementedError
+
+    def list_page(self, limit, cursor=None, name_prefix=None, jd_from=None,
+                  jd_to=None, order_by='created', direction='asc'):
+        """
+        One page of chart summaries
+
+        Args:
+            limit: maximum number of summaries to return
+            cursor: next_cursor from the previous page (same filters and order)
+            name_prefix: only names starting with this string
+            jd_from, jd_to: only births in [jd_from, jd_to) (Julian day, UT)
+            order_by: 'created', 'name' or 'datetime'
+            direction: 'asc' or 'desc'
+
+        Returns:
+            (summaries, next_cursor); next_cursor is None on the last page
+        """
+        raise NotImplementedError
+
+    def count(self):
+        raise NotImplementedError
+
+    def find_by_position(self, point, kind, values, limit, after=None):
+        """
+        IDs of charts with a natal placement in the given segments
+
+        Args:
+            point: graha name or 'Ascendant'
+            kind: 'sign', 'nakshatra' or 'pada'
+            values: segment indices to match (any of them)
+            limit: maximum number of chart IDs to return
+            after: only chart IDs greater than this one (paging)
+
+        Returns:
+            matching chart IDs in ascending order
+        """
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class JsonDirChartStore(ChartStore):
+    """One `<chart_id>.json` file per chart in a directory"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, chart_id):
+        return os.path.join(self.directory, f'{chart_id}.json')
+
+    def get(self, chart_id):
+        path = self._path(chart_id)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    def put_many(self, charts):
+        for chart in charts:
+            with open(self._path(chart['chart_id']), 'w') as f:
+                json.dump(chart, f, separators=(',', ':'))
+
+    def iter_charts(self):
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.endswith('.json') and entry.is_file():
+                    with open(entry.path, 'r') as f:
+                        yield json.load(f)
+
+    def count(self):
+        return sum(1 for name in os.listdir(self.directory) if name.endswith('.json'))
+
+    def find_by_position(self, point, kind, values, limit, after=None):
+        # No index here: every chart is read
+        _check_kind(kind)
+        column = list(POSITION_KINDS).index(kind) + 1
+        values = set(values)
+        matches = sorted(
+            chart['chart_id'] for chart in self.iter_charts()
+            if (after is None or chart['chart_id'] > after)
+            and any(row[0] == point and row[column] in values for row in natal_positions(chart))
+        )
+        return matches[:limit]
+
+    def iter_placements(self, columns, batch_size=MIGRATION_BATCH):
+        # No index here: every chart is read
+        for point, kind in columns:
+            _check_kind(kind)
+        offsets = [list(POSITION_KINDS).index(kind) + 1 for _, kind in columns]
+        rows = []
+        for chart in self.iter_charts():
+            positions = {row[0]: row for row in natal_positions(chart)}
+            if all(point in positions for point, _ in columns):
+                created = os.path.getmtime(self._path(chart['chart_id']))
+                rows.append((created, chart['chart_id'],
+                             tuple(positions[point][offset]
+                                   for (point, _), offset in zip(columns, offsets))))
+        rows.sort(key=lambda row: row[:2])
+        for first in range(0, len(rows), batch_size):
+            yield [(chart_id, *codes) for _, chart_id, codes in rows[first:first + batch_size]]
+
+    def list_page(self, limit, cursor=None, name_prefix=None, jd_from=None,
+                  jd_to=None, order_by='created', direction='asc'):
+        # No index here: every chart is read, as before the SQLite store
+        _check_order(order_by, direction)
+        rows = []
+        for chart in self.iter_charts():
+            if name_prefix is not None and not chart['name'].startswith(name_prefix):
+                continue
+            if jd_from is not None and chart['julian_day'] < jd_from:
+                continue
+            if jd_to is not None and chart['julian_day'] >= jd_to:
+                continue
+            value = {
+                'created': os.path.getmtime(self._path(chart['chart_id'])),
+                'name': chart['name'],
+                'datetime': chart['julian_day'],
+            }[order_by]
+            rows.append(((value, chart['chart_id']), _summary(chart)))
+
+        reverse = direction == 'desc'
+        rows.sort(key=lambda row: row[0], reverse=reverse)
+        if cursor is not None:
+            after = tuple(decode_cursor(cursor, order_by, direction))
+            rows = [row for row in rows if (row[0] < after if reverse else row[0] > after)]
+
+        page = rows[:limit]
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = encode_cursor(order_by, direction, *page[-1][0])
+        return [summary for _, summary in page], next_cursor
+
+
+class SqliteChartStore(ChartStore):
+    """Charts in a single SQLite database with indexed summary columns"""
+
+    # Stored in PRAGMA user_version; 1 adds the chart_positions index
+    SCHEMA_VERSION = 1
+
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS charts (
+            chart_id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            birth_datetime TEXT NOT NULL,
+            birth_jd REAL NOT NULL,
+            created_at REAL NOT NULL,
+            data TEXT NOT NULL  -- chart_codec BLOB or JSON text
+        );
+        CREATE INDEX IF NOT EXISTS idx_charts_name ON charts (name, chart_id);
+        CREATE INDEX IF NOT EXISTS idx_charts_birth_jd ON charts (birth_jd, chart_id);
+        CREATE INDEX IF NOT EXISTS idx_charts_created_at ON charts (created_at, chart_id);
+        CREATE TABLE IF NOT EXISTS chart_positions (
+            chart_id TEXT NOT NULL,
+            point TEXT NOT NULL,
+            sign INTEGER NOT NULL,
+            nakshatra INTEGER NOT NULL,
+            pada INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_positions_sign
+            ON chart_positions (point, sign, chart_id);
+        CREATE INDEX IF NOT EXISTS idx_positions_nakshatra
+            ON chart_positions (point, nakshatra, chart_id);
+        CREATE INDEX IF NOT EXISTS idx_positions_pada
+            ON chart_positions (point, pada, chart_id);
+        CREATE INDEX IF NOT EXISTS idx_positions_chart
+            ON chart_positions (chart_id);
+    '''
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Several engine workers may write at once; wait for the lock
+        self.connection = sqlite3.connect(path, timeout=30)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript(self.SCHEMA)
+        # Databases written before the reverse index existed are indexed once
+        version = self.connection.execute('PRAGMA user_version').fetchone()[0]
+        if version < self.SCHEMA_VERSION:
+            self.reindex()
+            self.connection.execute(f'PRAGMA user_version = {self.SCHEMA_VERSION}')
+
+    def get(self, chart_id):
+        row = self.connection.execute(
+            'SELECT data FROM charts WHERE chart_id = ?', (chart_id,)
+        ).fetchone()
+        return _decode_row(row[0]) if row else None
+
+    def put_many(self, charts):
+        now = time.time()
+        rows = [
+            (chart['chart_id'], chart['name'], chart['datetime'],
+             chart['julian_day'], now, _encode_row(chart))
+            for chart in charts
+        ]
+        with self.connection:
+            # Keep the original created_at when a chart is stored again
+            self.connection.executemany(
+                '''INSERT INTO charts
+                       (chart_id, name, birth_datetime, birth_jd, created_at, data)
+                   VALUES (?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (chart_id) DO UPDATE SET
+                       name = excluded.name,
+                       birth_datetime = excluded.birth_datetime,
+                       birth_jd = excluded.birth_jd,
+                       data = excluded.data''',
+                rows
+            )
+            self._index_positions(charts)
+
+    def _index_positions(self, charts):
+        """Replace the reverse index rows of charts (inside a transaction)"""
+        self.connection.executemany(
+            'DELETE FROM chart_positions WHERE chart_id = ?',
+            [(chart['chart_id'],) for chart in charts]
+        )
+        self.connection.executemany(
+            'INSERT INTO chart_positions (chart_id, point, sign, nakshatra, pada) '
+            'VALUES (?, ?, ?, ?, ?)',
+            [(chart['chart_id'],) + row for chart in charts for row in natal_positions(chart)]
+        )
+
+    def reindex(self, batch_size=MIGRATION_BATCH):
+        """Rebuild the reverse index from the stored charts"""
+        with self.connection:
+            self.connection.execute('DELETE FROM chart_positions')
+        batch = []
+        for chart in self.iter_charts():
+            batch.append(chart)
+            if len(batch) >= batch_size:
+                with self.connection:
+                    self._index_positions(batch)
+                batch = []
+        if batch:
+            with self.connection:
+                self._index_positions(batch)
+
+    def find_by_position(self, point, kind, values, limit, after=None):
+        _check_kind(kind)
+        values = sorted(set(int(v) for v in values))
+        if not values:
+            return []
+        sql = (f'SELECT chart_id FROM chart_positions WHERE point = ? '
+               f'AND {kind} IN ({", ".join("?" * len(values))})')
+        params = [point] + values
+        if after is not None:
+            sql += ' AND chart_id > ?'
+            params.append(after)
+        sql += ' ORDER BY chart_id LIMIT ?'
+        rows = self.connection.execute(sql, params + [limit]).fetchall()
+        return [chart_id for (chart_id,) in rows]
+
+    def iter_placements(self, columns, batch_size=MIGRATION_BATCH):
+        # One join per column against the reverse index; no chart is
+        # decoded. Without INDEXED BY the planner may drive each join from
+        # the (point, ...) indexes, scanning every chart's row per chart.
+        joins, selected, params = [], [], []
+        for i, (point, kind) in enumerate(columns):
+            _check_kind(kind)
+            joins.append(f'JOIN chart_positions p{i} INDEXED BY idx_positions_chart '
+                         f'ON p{i}.chart_id = c.chart_id AND p{i}.point = ?')
+            selected.append(f'p{i}.{kind}')
+            params.append(point)
+        rows = self.connection.execute(
+            f'SELECT c.chart_id, {", ".join(selected)} FROM charts c {" ".join(joins)} '
+            'ORDER BY c.created_at, c.chart_id', params)
+        while True:
+            batch = rows.fetchmany(batch_size)
+            if not batch:
+                break
+            yield batch
+
+    def iter_charts(self):
+        for (data,) in self.connection.execute('SELECT data FROM charts'):
+            yield _decode_row(data)
+
+    def count(self):
+        return self.connection.execute('SELECT COUNT(*) FROM charts').fetchone()[0]
+
+    def list_page(self, limit, cursor=None, name_prefix=None, jd_from=None,
+                  jd_to=None, order_by='created', direction='asc'):
+        # Keyset pagination over (sort column, chart_id): each page is an
+        # index range scan, however deep into the listing it is
+        _check_order(order_by, direction)
+        column = ORDER_COLUMNS[order_by]
+        where, params = [], []
+        if name_prefix:
+            # Range form of a prefix match, so the name index is used
+            where.append('name >= ? AND name < ?')
+            params += [name_prefix, name_prefix + '\U0010ffff']
+        if jd_from is not None:
+            where.append('birth_jd >= ?')
+            params.append(jd_from)
+        if jd_to is not None:
+            where.append('birth_jd < ?')
+            params.append(jd_to)
+        if cursor is not None:
+            value, chart_id = decode_cursor(cursor, order_by, direction)
+            where.append(f'({column}, chart_id) {">" if direction == "asc" else "<"} (?, ?)')
+            params += [value, chart_id]
+
+        sql = f'SELECT chart_id, name, birth_datetime, {column} FROM charts'
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += f' ORDER BY {column} {direction}, chart_id {direction} LIMIT ?'
+        rows = self.connection.execute(sql, params + [limit + 1]).fetchall()
+
+        page = rows[:limit]
+        next_cursor = None
+        if len(rows) > limit:
+            last = page[-1]
+            next_cursor = encode_cursor(order_by, direction, last[3], last[0])
+        summaries = [
+            {'chart_id': chart_id, 'name': name, 'datetime': birth_datetime}
+            for chart_id, name, birth_datetime, _ in page
+        ]
+        return summaries, next_cursor
+
+    def close(self):
+        self.connection.close()
+
+
+def open_store(directory, backend=None):
+    """Open the chart store kept in `directory`"""
+    backend = backend or os.getenv('JYOTISH_CHART_STORE', DEFAULT_BACKEND)
+    if backend == 'sqlite':
+        return SqliteChartStore(os.path.join(directory, SQLITE_FILENAME))
+    if backend == 'json':
+        return JsonDirChartStore(directory)
+    raise ValueError(f'Unknown chart store backend: {backend}')
+
+
+# Open stores by (backend, directory), shared by all calculators in a process
+_stores = {}
+
+
+def get_store(directory, backend=None):
+    """Shared store for `directory`, opened on first use"""
+    backend = backend or os.getenv('JYOTISH_CHART_STORE', DEFAULT_BACKEND)
+    key = (backend, os.path.abspath(directory))
+    if key not in _stores:
+        _stores[key] = open_store(directory, backend)
+    return _stores[key]
+
+
+def migrate_json_dir(source_dir, store, batch_size=MIGRATION_BATCH):
+    """
+    Copy every chart from a JSON-file directory into `store`
+
+    Streams the directory and writes in batches, so memory stays flat no
+    matter how many charts there are. Safe to re-run.
+
+    Returns:
+        number of charts migrated
+    """
+    batch = []
+    migrated = 0
+    for chart in JsonDirChartStore(source_dir).iter_charts():
+        batch.append(chart)
+        if len(batch) >= batch_size:
+            store.put_many(batch)
+            migrated += len(batch)
+            batch = []
+    if batch:
+        store.put_many(batch)
+        migrated += len(batch)
+    return migrated
+
+
+if __name__ == '__main__':
+    default_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.charts_cache')
+
+    parser = argparse.ArgumentParser(description='Chart store maintenance')
+    subcommands = parser.add_subparsers(dest='command', required=True)
+    migrate = subcommands.add_parser('migrate', help='import a JSON chart directory into SQLite')
+    migrate.add_argument('--source', default=default_dir, help='directory of <chart_id>.json files')
+    migrate.add_argument('--target', default=default_dir, help='directory holding charts.db')
+    reindex = subcommands.add_parser('reindex', help='rebuild the natal placement index')
+    reindex.add_argument('--target', default=default_dir, help='directory holding charts.db')
+    args = parser.parse_args()
+
+    target = SqliteChartStore(os.path.join(args.target, SQLITE_FILENAME))
+    if args.command == 'migrate':
+        count = migrate_json_dir(args.source, target)
+        print(json.dumps({'migrated': count, 'total': target.count()}))
+    else:
+        target.reindex()
+        print(json.dumps({'indexed': target.count()}))
+    target.close()
@@ -1,25 +1,390 @@
 #!/usr/bin/env python3
 """
-Compatibility Calculator - Synastry and relationship analysis (STUB)
+Compatibility Calculator - Ashtakoota (Guna Milan) matching
+
+Every koota depends only on the Moon's nakshatra pada of each partner
+(the pada fixes both the nakshatra and the sign, including the half-sign
+Vashya split of Sagittarius and Capricorn). The eight koota scores of all
+108 x 108 (groom pada, bride pada) pairs are therefore computed once, as
+arrays, and scoring any pair is a table lookup. Manglik dosha, which
+depends on Mars, is checked separately.
+
+Tables are indexed [groom pada, bride pada]; chart_id_1 is the groom's
+chart and chart_id_2 the bride's.
+
+One-versus-many matching encodes stored charts in batches as columns of
+Moon pada and Manglik flag, scores the query chart against a whole batch
+with one fancy-indexed lookup, filters, and keeps the best k in a heap.
 """
 
 import sys
 import json
+import os
+import heapq
+
+import numpy as np
+
+try:
+    from constants import (
+        NAKSHATRAS, RASHIS, RASHI_LORDS, PLANET_FRIENDS, PLANET_ENEMIES,
+        KOOTA_MAX_POINTS, VARNAS, RASHI_VARNA, VASHYAS, RASHI_VASHYA,
+        VASHYA_POINTS, INAUSPICIOUS_TARAS, YONIS, NAKSHATRA_YONI, YONI_POINTS,
+        MAITRI_POINTS, GANAS, NAKSHATRA_GANA, GANA_POINTS,
+        BHAKOOT_DOSHA_DISTANCES, NADIS, NAKSHATRA_NADI, MANGLIK_HOUSES
+    )
+    from chart_store import get_store, segment_index
+except ImportError:
+    sys.path.insert(0, os.path.dirname(__file__))
+    from constants import (
+        NAKSHATRAS, RASHIS, RASHI_LORDS, PLANET_FRIENDS, PLANET_ENEMIES,
+        KOOTA_MAX_POINTS, VARNAS, RASHI_VARNA, VASHYAS, RASHI_VASHYA,
+        VASHYA_POINTS, INAUSPICIOUS_TARAS, YONIS, NAKSHATRA_YONI, YONI_POINTS,
+        MAITRI_POINTS, GANAS, NAKSHATRA_GANA, GANA_POINTS,
+        BHAKOOT_DOSHA_DISTANCES, NADIS, NAKSHATRA_NADI, MANGLIK_HOUSES
+    )
+    from chart_store import get_store, segment_index
+
+# Chart cache
+CHARTS_DIR = os.path.join(os.path.dirname(__file__), '.charts_cache')
+
+N_PADAS = 108
+KOOTAS = list(KOOTA_MAX_POINTS)
+MAX_TOTAL = sum(KOOTA_MAX_POINTS.values())
+
+# Per-pada attributes of the Moon
+PADA_NAKSHATRA = np.arange(N_PADAS) // 4
+PADA_SIGN = np.arange(N_PADAS) // 9
+# Padas starting before 15° of their sign take the first-half Vashya
+PADA_SIGN_HALF = ((np.arange(N_PADAS) % 9) * 10 / 3 >= 15).astype(np.int64)
+
+RELATION_CODES = {'friend': 0, 'neutral': 1, 'enemy': 2}
+
+# Charts encoded and scored together by find_matches
+MATCH_BATCH = 4096
+
+# Chart store reverse index columns find_matches reads per candidate
+MATCH_COLUMNS = [('Moon', 'pada'), ('Mars', 'sign'), ('Ascendant', 'sign')]
+
+DEFAULT_TOP_K = 50
+MAX_TOP_K = 1000
+
+ROLES = ('groom', 'bride')
+
+
+def _relation(planet, other):
+    """How `planet` regards `other`: friend, neutral or enemy"""
+    if planet == other or other in PLANET_FRIENDS[planet]:
+        return 'friend'
+    if other in PLANET_ENEMIES[planet]:
+        return 'enemy'
+    return 'neutral'
+
+
+def _pair_table(groom_codes, bride_codes, points):
+    """(108, 108) table of points[groom code, bride code]"""
+    return np.asarray(points, dtype=np.float32)[groom_codes[:, None], bride_codes[None, :]]
+
+
+def _build_koota_tables():
+    """(8 kootas, 108 groom padas, 108 bride padas) points, KOOTAS order"""
+    nakshatra, sign = PADA_NAKSHATRA, PADA_SIGN
+
+    varna = np.array([VARNAS.index(RASHI_VARNA[r]) for r in RASHIS])[sign]
+    varna_points = (varna[:, None] >= varna[None, :]).astype(np.float32)
+
+    vashya = np.array([[VASHYAS.index(v) for v in RASHI_VASHYA[r]] for r in RASHIS])
+    vashya = vashya[sign, PADA_SIGN_HALF]
+    vashya_points = _pair_table(vashya, vashya, VASHYA_POINTS)
 
-def analyze_compatibility(chart_id_1, chart_id_2):
-    """Analyze compatibility between two charts - TO BE IMPLEMENTED"""
+    # Tara counts from each partner's nakshatra to the other's, inclusive
+    counts = (nakshatra[None, :] - nakshatra[:, None]) % 27 + 1
+    bad = np.isin(counts % 9, INAUSPICIOUS_TARAS)
+    bad_reverse = np.isin(counts.T % 9, INAUSPICIOUS_TARAS)
+    tara_points = (1.5 * ~bad + 1.5 * ~bad_reverse).astype(np.float32)
+
+    yoni = np.array([YONIS.index(y) for y in NAKSHATRA_YONI])[nakshatra]
+    yoni_points = _pair_table(yoni, yoni, YONI_POINTS)
+
+    # Graha Maitri between the Moon sign lords, looked up per sign pair
+    lords = [RASHI_LORDS[r] for r in RASHIS]
+    maitri = np.zeros((12, 12), dtype=np.float32)
+    for i, groom_lord in enumerate(lords):
+        for j, bride_lord in enumerate(lords):
+            pair = sorted((_relation(groom_lord, bride_lord), _relation(bride_lord, groom_lord)),
+                          key=RELATION_CODES.get)
+            maitri[i, j] = MAITRI_POINTS[tuple(pair)]
+    maitri_points = _pair_table(sign, sign, maitri)
+
+    gana = np.array([GANAS.index(g) for g in NAKSHATRA_GANA])[nakshatra]
+    gana_points = _pair_table(gana, gana, GANA_POINTS)
+
+    # Bhakoot: distance of the bride's Moon sign from the groom's and back
+    distance = (sign[None, :] - sign[:, None]) % 12 + 1
+    dosha = np.zeros_like(distance, dtype=bool)
+    for a, b in BHAKOOT_DOSHA_DISTANCES:
+        dosha |= (distance == a) | (distance == b)
+    bhakoot_points = np.where(dosha, 0, KOOTA_MAX_POINTS['Bhakoot']).astype(np.float32)
+
+    nadi = np.array([NADIS.index(n) for n in NAKSHATRA_NADI])[nakshatra]
+    nadi_points = np.where(nadi[:, None] == nadi[None, :], 0,
+                           KOOTA_MAX_POINTS['Nadi']).astype(np.float32)
+
+    return np.stack([varna_points, vashya_points, tara_points, yoni_points,
+                     maitri_points, gana_points, bhakoot_points, nadi_points])
+
+
+KOOTA_TABLES = _build_koota_tables()
+TOTAL_POINTS = KOOTA_TABLES.sum(axis=0)
+
+
+def moon_pada(chart):
+    """Index (0-107) of the nakshatra pada holding the chart's Moon"""
+    return segment_index(chart['planets']['Moon']['longitude'], N_PADAS)
+
+
+def manglik_flags(chart):
+    """Whether Mars is in a Manglik house from the lagna and from the Moon"""
+    mars = segment_index(chart['planets']['Mars']['longitude'], 12)
+    lagna = segment_index(chart['ascendant']['longitude'], 12)
+    moon = segment_index(chart['planets']['Moon']['longitude'], 12)
     return {
-        'error': 'Compatibility analysis not yet implemented',
-        'message': 'Synastry and Kuta analysis coming soon'
+        'from_lagna': (mars - lagna) % 12 + 1 in MANGLIK_HOUSES,
+        'from_moon': (mars - moon) % 12 + 1 in MANGLIK_HOUSES
     }
 
-if __name__ == '__main__':
+
+def _house_flags(planet_signs, reference_signs):
+    """Whether each planet sign is a Manglik house from each reference sign"""
+    houses = (planet_signs - reference_signs) % 12 + 1
+    return np.isin(houses, MANGLIK_HOUSES)
+
+
+def encode_placements(rows):
+    """
+    Columnar encoding of chart store placement rows for bulk matching
+
+    Args:
+        rows: (chart_id, Moon pada, Mars sign, Ascendant sign) tuples, as
+            yielded by ChartStore.iter_placements(MATCH_COLUMNS)
+
+    Returns:
+        (Moon padas, Manglik flags) arrays, one entry per row
+    """
+    codes = np.array([row[1:] for row in rows], dtype=np.int64).reshape(-1, len(MATCH_COLUMNS))
+    padas, mars_signs, lagna_signs = codes.T
+    moon_signs = padas // 9
+    manglik = _house_flags(mars_signs, lagna_signs) | _house_flags(mars_signs, moon_signs)
+    return padas, manglik
+
+
+def _moon_summary(pada):
+    nakshatra = NAKSHATRAS[PADA_NAKSHATRA[pada]]
+    return {
+        'rashi': RASHIS[PADA_SIGN[pada]],
+        'nakshatra': nakshatra['name'],
+        'nakshatra_pada': pada % 4 + 1
+    }
+
+
+def score_pair(groom_pada, bride_pada):
+    """
+    Ashtakoota points of one pair of Moon padas
+
+    Returns:
+        dict with the points of every koota, the total and the Nadi and
+        Bhakoot doshas
+    """
+    points = KOOTA_TABLES[:, groom_pada, bride_pada].tolist()
+    return {
+        'kootas': {koota: {'points': p, 'max': KOOTA_MAX_POINTS[koota]}
+                   for koota, p in zip(KOOTAS, points)},
+        'total': float(TOTAL_POINTS[groom_pada, bride_pada]),
+        'max': MAX_TOTAL,
+        'doshas': {
+            'nadi': points[KOOTAS.index('Nadi')] == 0,
+            'bhakoot': points[KOOTAS.index('Bhakoot')] == 0
+        }
+    }
+
+
+def analyze_compatibility(chart_id_1, chart_id_2, manglik=True):
+    """
+    Ashtakoota compatibility of two saved charts
+
+    Args:
+        chart_id_1: groom's birth chart UUID
+        chart_id_2: bride's birth chart UUID
+        manglik: also check Manglik dosha of both charts
+
+    Returns:
+        dict with both Moon placements, koota points out of 36, doshas and
+        (optionally) the Manglik check
+    """
     try:
-        input_data = json.loads(sys.argv[1])
-        result = analyze_compatibility(
+        store = get_store(CHARTS_DIR)
+        groom, bride = store.get(chart_id_1), store.get(chart_id_2)
+        for chart_id, chart in ((chart_id_1, groom), (chart_id_2, bride)):
+            if chart is None:
+                return {'error': f'Chart {chart_id} not found'}
+
+        groom_pada, bride_pada = moon_pada(groom), moon_pada(bride)
+        result = {
+            'chart_id_1': chart_id_1,
+            'chart_id_2': chart_id_2,
+            'moon': {
+                'groom': _moon_summary(groom_pada),
+                'bride': _moon_summary(bride_pada)
+            },
+            **score_pair(groom_pada, bride_pada)
+        }
+
+        if manglik:
+            groom_flags, bride_flags = manglik_flags(groom), manglik_flags(bride)
+            groom_manglik, bride_manglik = any(groom_flags.values()), any(bride_flags.values())
+            result['manglik'] = {
+                'groom': {'manglik': groom_manglik, **groom_flags},
+                'bride': {'manglik': bride_manglik, **bride_flags},
+                # Both partners being Manglik cancels the dosha
+                'dosha': groom_manglik != bride_manglik
+            }
+
+        return result
+
+    except Exception as e:
+        import traceback
+        return {
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        }
+
+
+def find_matches(chart_id, role='groom', top_k=DEFAULT_TOP_K, min_score=0,
+                 exclude_nadi=False, exclude_bhakoot=False, exclude_manglik=False,
+                 batch_size=MATCH_BATCH):
+    """
+    Best Ashtakoota matches for one chart among all stored charts
+
+    Args:
+        chart_id: UUID of the chart to match
+        role: 'groom' or 'bride', the role of that chart; every stored
+            chart is scored in the other role
+        top_k: number of best matches returned
+        min_score: minimum total points (out of 36)
+        exclude_nadi: drop candidates with Nadi dosha
+        exclude_bhakoot: drop candidates with Bhakoot dosha
+        exclude_manglik: drop candidates whose Manglik status does not
+            match the chart's (one Manglik, the other not)
+        batch_size: charts read and scored together
+
+    Returns:
+        dict with the number of charts scanned and passing the filters,
+        and the top matches ordered by total points, earlier stored
+        charts first on equal totals
+    """
+    try:
+        if role not in ROLES:
+            return {'error': f'Unknown role: {role}'}
+
+        store = get_store(CHARTS_DIR)
+        query = store.get(chart_id)
+        if query is None:
+            return {'error': f'Chart {chart_id} not found'}
+
+        query_pada = moon_pada(query)
+        query_manglik = any(manglik_flags(query).values())
+        # Scores of the query against every pada, the query in its role
+        if role == 'groom':
+            totals, kootas = TOTAL_POINTS[query_pada], KOOTA_TABLES[:, query_pada]
+        else:
+            totals, kootas = TOTAL_POINTS[:, query_pada], KOOTA_TABLES[:, :, query_pada]
+
+        allowed = totals >= min_score
+        if exclude_nadi:
+            allowed &= kootas[KOOTAS.index('Nadi')] > 0
+        if exclude_bhakoot:
+            allowed &= kootas[KOOTAS.index('Bhakoot')] > 0
+
+        # Min-heap of (total, -sequence, chart id, pada), sequence being
+        # the store order (oldest first): on equal totals the earlier
+        # stored chart is kept
+        heap = []
+        scanned = 0
+        passed = 0
+
+        # Candidates come from the store's reverse index, so no chart is
+        # decoded
+        for rows in store.iter_placements(MATCH_COLUMNS, batch_size):
+            rows = [row for row in rows if row[0] != chart_id]
+            padas, manglik = encode_placements(rows)
+            keep = allowed[padas]
+            if exclude_manglik:
+                keep &= manglik == query_manglik
+            hits = np.flatnonzero(keep)
+            passed += len(hits)
+            scores = totals[padas[hits]]
+            # Only the batch's own top k can enter the heap; the stable
+            # sort keeps earlier rows first among equal scores
+            if len(hits) > top_k:
+                best = np.argsort(-scores, kind='stable')[:top_k]
+                hits, scores = hits[best], scores[best]
+            for i, score in zip(hits.tolist(), scores.tolist()):
+                entry = (score, -(scanned + i), rows[i][0], int(padas[i]))
+                if len(heap) < top_k:
+                    heapq.heappush(heap, entry)
+                elif entry > heap[0]:
+                    heapq.heapreplace(heap, entry)
+            scanned += len(rows)
+
+        matches = []
+        for _, _, match_id, pada in sorted(heap, reverse=True):
+            groom_pada, bride_pada = (query_pada, pada) if role == 'groom' else (pada, query_pada)
+            matches.append({'chart_id': match_id, 'moon': _moon_summary(pada),
+                            **score_pair(groom_pada, bride_pada)})
+
+        return {
+            'chart_id': chart_id,
+            'role': role,
+            'charts_scanned': scanned,
+            'charts_matched': passed,
+            'matches': matches
+        }
+
+    except Exception as e:
+        import traceback
+        return {
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        }
+
+
+def handle_request(input_data):
+    """Dispatch a CLI/worker request to the compatibility analysis"""
+    action = input_data.get('action', 'analyze')
+
+    if action == 'analyze':
+        return analyze_compatibility(
             input_data['chart_id_1'],
-            input_data['chart_id_2']
+            input_data['chart_id_2'],
+            input_data.get('manglik', True)
+        )
+    elif action == 'matches':
+        return find_matches(
+            input_data['chart_id'],
+            input_data.get('role', 'groom'),
+            min(int(input_data.get('top_k', DEFAULT_TOP_K)), MAX_TOP_K),
+            input_data.get('min_score', 0),
+            input_data.get('exclude_nadi', False),
+            input_data.get('exclude_bhakoot', False),
+            input_data.get('exclude_manglik', False)
         )
+    else:
+        return {'error': f'Unknown action: {action}'}
+
+
+if __name__ == '__main__':
+    try:
+        input_data = json.loads(sys.argv[1])
+        result = handle_request(input_data)
         print(json.dumps(result))
     except Exception as e:
         print(json.dumps({'error': str(e)}), file=sys.stderr)
@@ -5,8 +5,6 @@ All traditional Vedic astrology constants used throughout the calculation engine
 Based on classical Parashari principles.
 """
 
-from typing import Dict, List, Tuple
-
 # === ZODIAC SIGNS (RASHIS) ===
 
 RASHIS = [
@@ -333,33 +331,182 @@ DEBILITATION = {
     "Ketu": {"sign": "Taurus", "degree": None},
 }
 
+# === COMPATIBILITY (ASHTAKOOTA) ===
+
+# Koota -> maximum points (36 in total)
+KOOTA_MAX_POINTS = {
+    "Varna": 1,
+    "Vashya": 2,
+    "Tara": 3,
+    "Yoni": 4,
+    "Graha Maitri": 5,
+    "Gana": 6,
+    "Bhakoot": 7,
+    "Nadi": 8,
+}
+
+# Varna of each Moon sign, ranked Brahmin (3) down to Shudra (0)
+VARNAS = ["Shudra", "Vaishya", "Kshatriya", "Brahmin"]
+RASHI_VARNA = {
+    "Aries": "Kshatriya", "Taurus": "Vaishya", "Gemini": "Shudra",
+    "Cancer": "Brahmin", "Leo": "Kshatriya", "Virgo": "Vaishya",
+    "Libra": "Shudra", "Scorpio": "Brahmin", "Sagittarius": "Kshatriya",
+    "Capricorn": "Vaishya", "Aquarius": "Shudra", "Pisces": "Brahmin",
+}
+
+# Vashya class of each Moon sign as (first half, second half);
+# Sagittarius and Capricorn change class at 15°
+VASHYAS = ["Chatushpada", "Manava", "Jalachara", "Vanachara", "Keeta"]
+RASHI_VASHYA = {
+    "Aries": ("Chatushpada", "Chatushpada"),
+    "Taurus": ("Chatushpada", "Chatushpada"),
+    "Gemini": ("Manava", "Manava"),
+    "Cancer": ("Jalachara", "Jalachara"),
+    "Leo": ("Vanachara", "Vanachara"),
+    "Virgo": ("Manava", "Manava"),
+    "Libra": ("Manava", "Manava"),
+    "Scorpio": ("Keeta", "Keeta"),
+    "Sagittarius": ("Manava", "Chatushpada"),
+    "Capricorn": ("Chatushpada", "Jalachara"),
+    "Aquarius": ("Manava", "Manava"),
+    "Pisces": ("Jalachara", "Jalachara"),
+}
+
+# Vashya points, rows groom's class, columns bride's (VASHYAS order)
+VASHYA_POINTS = [
+    [2, 1, 1, 0.5, 1],
+    [1, 2, 0.5, 0, 1],
+    [1, 0.5, 2, 1, 1],
+    [0.5, 0, 1, 2, 0],
+    [1, 1, 1, 0, 2],
+]
+
+# Taras (count from one nakshatra to the other, mod 9) that score nothing:
+# Vipat, Pratyak and Vadha
+INAUSPICIOUS_TARAS = [3, 5, 7]
+
+# Yoni animal of each nakshatra (NAKSHATRAS order)
+YONIS = ["Horse", "Elephant", "Sheep", "Serpent", "Dog", "Cat", "Rat",
+         "Cow", "Buffalo", "Tiger", "Deer", "Monkey", "Mongoose", "Lion"]
+NAKSHATRA_YONI = [
+    "Horse", "Elephant", "Sheep", "Serpent", "Serpent", "Dog", "Cat",
+    "Sheep", "Cat", "Rat", "Rat", "Cow", "Buffalo", "Tiger", "Buffalo",
+    "Tiger", "Deer", "Deer", "Dog", "Monkey", "Mongoose", "Monkey", "Lion",
+    "Horse", "Lion", "Cow", "Elephant",
+]
+
+# Yoni points between animals (YONIS order); sworn enemies score 0
+YONI_POINTS = [
+    [4, 2, 2, 3, 2, 2, 2, 1, 0, 1, 3, 3, 2, 1],
+    [2, 4, 3, 3, 2, 2, 2, 2, 3, 1, 2, 3, 2, 0],
+    [2, 3, 4, 2, 1, 2, 1, 3, 3, 1, 2, 0, 3, 1],
+    [3, 3, 2, 4, 2, 1, 1, 1, 1, 2, 2, 2, 0, 2],
+    [2, 2, 1, 2, 4, 2, 1, 2, 2, 1, 0, 2, 1, 1],
+    [2, 2, 2, 1, 2, 4, 0, 2, 2, 1, 3, 3, 2, 1],
+    [2, 2, 1, 1, 1, 0, 4, 2, 2, 2, 2, 2, 1, 2],
+    [1, 2, 3, 1, 2, 2, 2, 4, 3, 0, 3, 2, 2, 1],
+    [0, 3, 3, 1, 2, 2, 2, 3, 4, 1, 2, 2, 2, 1],
+    [1, 1, 1, 2, 1, 1, 2, 0, 1, 4, 1, 1, 2, 1],
+    [3, 2, 2, 2, 0, 3, 2, 3, 2, 1, 4, 2, 2, 1],
+    [3, 3, 0, 2, 2, 3, 2, 2, 2, 1, 2, 4, 3, 2],
+    [2, 2, 3, 0, 1, 2, 1, 2, 2, 2, 2, 3, 4, 2],
+    [1, 0, 1, 2, 1, 1, 2, 1, 1, 1, 1, 2, 2, 4],
+]
+
+# Graha Maitri points by how each Moon sign lord regards the other
+# (friend, neutral or enemy); the same lord counts as friends
+MAITRI_POINTS = {
+    ("friend", "friend"): 5,
+    ("friend", "neutral"): 4,
+    ("neutral", "neutral"): 3,
+    ("friend", "enemy"): 1,
+    ("neutral", "enemy"): 0.5,
+    ("enemy", "enemy"): 0,
+}
+
+# Gana of each nakshatra (NAKSHATRAS order)
+GANAS = ["Deva", "Manushya", "Rakshasa"]
+NAKSHATRA_GANA = [
+    "Deva", "Manushya", "Rakshasa", "Manushya", "Deva", "Manushya", "Deva",
+    "Deva", "Rakshasa", "Rakshasa", "Manushya", "Manushya", "Deva",
+    "Rakshasa", "Deva", "Rakshasa", "Deva", "Rakshasa", "Rakshasa",
+    "Manushya", "Manushya", "Deva", "Rakshasa", "Rakshasa", "Manushya",
+    "Manushya", "Deva",
+]
+
+# Gana points, rows groom's gana, columns bride's (GANAS order)
+GANA_POINTS = [
+    [6, 6, 1],
+    [5, 6, 0],
+    [1, 0, 6],
+]
+
+# Moon sign distances (counted both ways) that make Bhakoot dosha
+BHAKOOT_DOSHA_DISTANCES = [(2, 12), (5, 9), (6, 8)]
+
+# Nadi of each nakshatra: Adi, Madhya, Antya, Antya, Madhya, Adi, ...
+NADIS = ["Adi", "Madhya", "Antya"]
+NAKSHATRA_NADI = [["Adi", "Madhya", "Antya", "Antya", "Madhya", "Adi"][i % 6]
+                  for i in range(27)]
+
+# Houses (from the lagna or the Moon) where Mars causes Manglik dosha
+MANGLIK_HOUSES = [1, 2, 4, 7, 8, 12]
+
 # === AYANAMSA ===
 
 AYANAMSA_LAHIRI = "Lahiri"  # Most commonly used
 
+# Everything besides the birth data that changes a computed chart. Bump
+# 'version' whenever calculation output changes so old charts are not reused.
+ENGINE_SETTINGS = {
+    'ayanamsa': AYANAMSA_LAHIRI,
+    'node': 'True',
+    'houses': 'Whole Sign',
+    'version': 1,
+}
+
+# === INTEGER CODES ===
+# Planets, rashis and nakshatras are coded by their index in the lists
+# above; names are only looked up when a chart is turned into JSON.
+
+PLANET_CODES: dict[str, int] = {name: i for i, name in enumerate(PLANETS)}
+RASHI_CODES: dict[str, int] = {name: i for i, name in enumerate(RASHIS)}
+NAKSHATRA_CODES: dict[str, int] = {n["name"]: i for i, n in enumerate(NAKSHATRAS)}
+
 # === UTILITY FUNCTIONS ===
 
-def get_rashi_from_longitude(longitude: float) -> str:
-    """Convert absolute longitude (0-360) to rashi name"""
-    rashi_index = int(longitude / 30)
-    return RASHIS[rashi_index % 12]
+def get_rashi_index(longitude: float) -> int:
+    """Convert absolute longitude (0-360) to rashi index (0 = Aries)"""
+    return int(longitude / 30) % 12
 
-def get_nakshatra_from_longitude(longitude: float) -> Tuple[str, int, str]:
+def get_nakshatra_index(longitude: float) -> tuple[int, int]:
     """
-    Get nakshatra name, pada, and lord from longitude
-    Returns: (nakshatra_name, pada_number, ruling_planet)
+    Get nakshatra index and pada from longitude
+    Returns: (nakshatra_index, pada_number)
     """
     # Normalize to 0-360
     longitude = longitude % 360
     
     # Find nakshatra (each is 13.333... degrees)
     nakshatra_index = int(longitude / NAKSHATRA_SPAN)
-    nakshatra = NAKSHATRAS[nakshatra_index]
     
     # Find pada within nakshatra
-    position_in_nakshatra = longitude - nakshatra["start"]
+    position_in_nakshatra = longitude - NAKSHATRAS[nakshatra_index]["start"]
     pada = int(position_in_nakshatra / PADA_SPAN) + 1
     
+    return (nakshatra_index, pada)
+
+def get_rashi_from_longitude(longitude: float) -> str:
+    """Convert absolute longitude (0-360) to rashi name"""
+    return RASHIS[get_rashi_index(longitude)]
+
+def get_nakshatra_from_longitude(longitude: float) -> tuple[str, int, str]:
+    """
+    Get nakshatra name, pada, and lord from longitude
+    Returns: (nakshatra_name, pada_number, ruling_planet)
+    """
+    nakshatra_index, pada = get_nakshatra_index(longitude)
+    nakshatra = NAKSHATRAS[nakshatra_index]
     return (nakshatra["name"], pada, nakshatra["lord"])
 
 def get_house_from_longitude(longitude: float, ascendant_long: float) -> int:
@@ -6,73 +6,113 @@ Dasha Calculator - Vimshottari Dasha system calculations
 import sys
 import json
 import os
-from datetime import datetime, timedelta
-from pathlib import Path
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
 
 # Import constants
 try:
     from constants import (
         DASHA_PERIODS,
         DASHA_SEQUENCE,
+        DASHA_TOTAL_YEARS,
         NAKSHATRA_DASHA_LORDS,
-        get_nakshatra_from_longitude
+        NAKSHATRA_SPAN
     )
+    from chart_store import get_store
+    from lru import LRUCache, cache_size_from_env
 except ImportError:
     sys.path.insert(0, os.path.dirname(__file__))
     from constants import (
         DASHA_PERIODS,
         DASHA_SEQUENCE,
+        DASHA_TOTAL_YEARS,
         NAKSHATRA_DASHA_LORDS,
-        get_nakshatra_from_longitude
+        NAKSHATRA_SPAN
     )
+    from chart_store import get_store
+    from lru import LRUCache, cache_size_from_env
 
 # Chart cache directory
 CHARTS_DIR = os.path.join(os.path.dirname(__file__), '.charts_cache')
 
+# Julian day of the Unix epoch
+UNIX_EPOCH_JD = 2440587.5
+
+# Days per dasha year: 365.25 (Julian year) by default, 360 for savana years
+DEFAULT_YEAR_DAYS = 365.25
+
+# Dasha years per lord, in DASHA_SEQUENCE order
+DASHA_YEARS = np.array([DASHA_PERIODS[lord] for lord in DASHA_SEQUENCE], dtype=float)
+
+# Position in DASHA_SEQUENCE of each nakshatra's lord
+NAKSHATRA_LORD_INDEX = np.array([DASHA_SEQUENCE.index(lord) for lord in NAKSHATRA_DASHA_LORDS])
+
+# MAHA_OFFSETS[i, k]: years from the start of lord i's Maha Dasha to the
+# start of the k-th Maha Dasha of the cycle (k = 9 is the end of the cycle)
+MAHA_OFFSETS = np.array([
+    np.concatenate([[0.0], np.cumsum(np.roll(DASHA_YEARS, -i))]) for i in range(9)
+])
+
+# Dasha levels, outermost first (response keys)
+DASHA_LEVELS = ['maha_dasha', 'antar_dasha', 'pratyantar_dasha', 'sookshma_dasha', 'prana_dasha']
+
+# Upper bound on periods returned by one 'periods' request
+MAX_PERIODS = 5000
+
+# Upper bound on dates in one 'timeline' request
+MAX_DATES = 20000
+
+# Dasha timelines of recently used charts, by chart_id (per worker process)
+timeline_cache = LRUCache(cache_size_from_env('JYOTISH_DASHA_CACHE_SIZE', 1024))
+
+
+def _parse_datetime(value):
+    """Parse an ISO datetime; a missing offset is taken as UTC"""
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+def _julian_day(dt):
+    """Julian day (UT) of a timezone-aware datetime"""
+    return UNIX_EPOCH_JD + dt.timestamp() / 86400
+
+
+def dasha_balance(moon_longitudes):
+    """
+    Starting Maha Dasha lord and the years of it left at birth
+    
+    Vectorized: accepts one Moon longitude or an array of them.
+    
+    Returns:
+        (lord index into DASHA_SEQUENCE, remaining years) arrays
+    """
+    moon = np.asarray(moon_longitudes, dtype=float) % 360
+    nakshatra = (moon // NAKSHATRA_SPAN).astype(np.int64) % 27
+    lord = NAKSHATRA_LORD_INDEX[nakshatra]
+    traveled = (moon - nakshatra * NAKSHATRA_SPAN) / NAKSHATRA_SPAN
+    return lord, DASHA_YEARS[lord] * (1 - traveled)
+
 
-def calculate_dasha_balance(moon_longitude):
+def calculate_dasha_balance(moon_longitude, year_days=DEFAULT_YEAR_DAYS):
     """
     Calculate the balance of Maha Dasha at birth
     
     Args:
         moon_longitude: Moon's longitude in degrees
+        year_days: days per dasha year
     
     Returns:
-        dict with planet, years, months, days remaining
+        dict with planet, years, months, days remaining (for display; the
+        timeline itself uses the exact balance)
     """
-    # Get nakshatra
-    nakshatra_name, pada, lord = get_nakshatra_from_longitude(moon_longitude)
-    
-    # Find nakshatra index (0-26)
-    nakshatra_index = None
-    for i, nak_data in enumerate(eval(str(NAKSHATRAS)) if isinstance(NAKSHATRAS, str) else NAKSHATRAS):
-        if isinstance(nak_data, dict) and nak_data['name'] == nakshatra_name:
-            nakshatra_index = i
-            break
-    
-    if nakshatra_index is None:
-        # Fallback: calculate from longitude
-        nakshatra_index = int(moon_longitude / (360 / 27))
-    
-    # Get Dasha lord for this nakshatra
-    dasha_lord = NAKSHATRA_DASHA_LORDS[nakshatra_index]
-    
-    # Calculate position within nakshatra (0-13.333 degrees)
-    nakshatra_span = 360 / 27  # 13.333...
-    nakshatra_start = nakshatra_index * nakshatra_span
-    position_in_nak = moon_longitude - nakshatra_start
-    
-    # Calculate proportion traveled
-    proportion_traveled = position_in_nak / nakshatra_span
-    
-    # Total years for this Dasha
-    total_years = DASHA_PERIODS[dasha_lord]
-    
-    # Years elapsed
-    years_elapsed = total_years * proportion_traveled
-    
-    # Balance remaining
-    years_remaining = total_years - years_elapsed
+    lord, years_remaining = dasha_balance(moon_longitude)
+    years_remaining = float(years_remaining)
     
     # Convert to years, months, days
     years = int(years_remaining)
@@ -81,165 +121,444 @@ def calculate_dasha_balance(moon_longitude):
     days = int((fractional_year * 12 - months) * 30)
     
     return {
-        'planet': dasha_lord,
+        'planet': DASHA_SEQUENCE[int(lord)],
         'years': years,
         'months': months,
         'days': days,
-        'total_days': int(years_remaining * 365.25)
+        'total_days': int(years_remaining * year_days)
     }
 
 
-def generate_dasha_periods(birth_datetime, moon_longitude, num_years=120):
+def maha_dasha_bounds(birth_jds, moon_longitudes, year_days=DEFAULT_YEAR_DAYS):
     """
-    Generate complete Vimshottari Dasha periods
+    Maha Dasha boundaries for many charts at once
+    
+    The first Maha Dasha runs from birth for its remaining balance, the
+    other eight for their full length.
     
     Args:
-        birth_datetime: Birth datetime string
-        moon_longitude: Moon's longitude
-        num_years: Number of years to generate (default 120)
+        birth_jds: birth Julian days (UT)
+        moon_longitudes: sidereal Moon longitudes, one per birth
+        year_days: days per dasha year
     
     Returns:
-        list of Maha Dasha periods with Antar Dashas
+        (lord index of each first Maha Dasha, (n, 10) array of the nine
+        Maha Dasha start Julian days followed by the end of the last)
+    """
+    if year_days <= 0:
+        raise ValueError('year_days must be positive')
+    birth_jds = np.atleast_1d(np.asarray(birth_jds, dtype=float))
+    lord, remaining = dasha_balance(np.atleast_1d(moon_longitudes))
+    elapsed = DASHA_YEARS[lord] - remaining
+    offsets = MAHA_OFFSETS[lord] - elapsed[:, None]
+    offsets[:, 0] = 0
+    return lord, birth_jds[:, None] + offsets * year_days
+
+
+def _sub_period_fractions(first):
+    """Cumulative share of a period taken by its sub-periods, starting with lord `first`"""
+    fractions = [0.0]
+    for k in range(9):
+        lord = DASHA_SEQUENCE[(first + k) % 9]
+        fractions.append(fractions[-1] + DASHA_PERIODS[lord] / DASHA_TOTAL_YEARS)
+    fractions[-1] = 1.0
+    return fractions
+
+
+# Indexed by the position of a period's lord in DASHA_SEQUENCE
+SUB_PERIOD_FRACTIONS = [_sub_period_fractions(i) for i in range(9)]
+
+
+def _format_jd(jd):
+    """ISO datetime (UTC, whole seconds) of a Julian day"""
+    seconds = round((jd - UNIX_EPOCH_JD) * 86400)
+    return datetime.fromtimestamp(seconds, timezone.utc).isoformat()
+
+
+class DashaPeriod:
     """
-    # Parse birth datetime
-    if birth_datetime.endswith('Z'):
-        birth_datetime = birth_datetime[:-1] + '+00:00'
-    birth_dt = datetime.fromisoformat(birth_datetime)
+    One period of the dasha tree
     
-    # Get birth balance
-    balance = calculate_dasha_balance(moon_longitude)
+    Sub-periods are not stored; they are derived on demand from this
+    period's span, so only the branches a query touches get computed.
+    """
     
-    # Find starting Dasha lord index
-    start_lord = balance['planet']
-    start_index = DASHA_SEQUENCE.index(start_lord)
+    def __init__(self, lord, level, start_jd, end_jd, path=()):
+        self.lord = lord
+        self.level = level
+        self.start_jd = start_jd
+        self.end_jd = end_jd
+        self.path = path + (lord,)
+        self._sub_bounds = None
     
-    # Start date adjusted for balance already elapsed
-    current_date = birth_dt
+    def sub_bounds(self):
+        """Julian-day boundaries of the nine sub-periods (ten values)"""
+        if self._sub_bounds is None:
+            span = self.end_jd - self.start_jd
+            fractions = SUB_PERIOD_FRACTIONS[DASHA_SEQUENCE.index(self.lord)]
+            bounds = [self.start_jd + f * span for f in fractions]
+            bounds[-1] = self.end_jd
+            self._sub_bounds = bounds
+        return self._sub_bounds
     
-    maha_dashas = []
+    def _sub_period(self, k, bounds):
+        lord = DASHA_SEQUENCE[(DASHA_SEQUENCE.index(self.lord) + k) % 9]
+        return DashaPeriod(lord, self.level + 1, bounds[k], bounds[k + 1], self.path)
     
-    # Generate Maha Dashas
-    for i in range(9):  # 9 planets in Vimshottari
-        lord_index = (start_index + i) % 9
-        lord = DASHA_SEQUENCE[lord_index]
-        period_years = DASHA_PERIODS[lord]
-        
-        # For first Dasha, use remaining balance
-        if i == 0:
-            period_years = balance['years'] + balance['months']/12 + balance['days']/365.25
+    def sub_periods(self):
+        """Yield the nine sub-periods in order"""
+        bounds = self.sub_bounds()
+        for k in range(9):
+            yield self._sub_period(k, bounds)
+    
+    def sub_period_at(self, jd):
+        """Sub-period running at jd, or None if jd falls outside them"""
+        bounds = self.sub_bounds()
+        k = bisect_right(bounds, jd) - 1
+        return self._sub_period(k, bounds) if 0 <= k < 9 else None
+    
+    def to_dict(self, year_days=DEFAULT_YEAR_DAYS):
+        days = self.end_jd - self.start_jd
+        return {
+            'planet': self.lord,
+            'start_date': _format_jd(self.start_jd),
+            'end_date': _format_jd(self.end_jd),
+            'duration_years': round(days / year_days, 4),
+            'duration_days': round(days, 4)
+        }
+
+
+class DashaTimeline:
+    """
+    Vimshottari periods of one chart as Julian-day boundaries
+    
+    maha_bounds holds the start of every Maha Dasha followed by the end of
+    the last one, so the running Maha Dasha is found by bisection; Antar
+    down to Prana periods are derived lazily from it.
+    """
+    
+    def __init__(self, first_lord, maha_bounds, year_days, birth_balance):
+        self.maha_bounds = [float(jd) for jd in maha_bounds]
+        self.year_days = year_days
+        self.birth_balance = birth_balance
+        self.mahas = [
+            DashaPeriod(DASHA_SEQUENCE[(first_lord + i) % 9], 0,
+                        self.maha_bounds[i], self.maha_bounds[i + 1])
+            for i in range(9)
+        ]
+    
+    def path_at(self, jd, depth=3):
+        """
+        Running periods at jd from Maha Dasha down to `depth` levels
         
-        period_days = int(period_years * 365.25)
-        end_date = current_date + timedelta(days=period_days)
+        Only the one branch containing jd is descended. The list is
+        empty if jd falls outside the timeline.
+        """
+        index = bisect_right(self.maha_bounds, jd) - 1
+        if not 0 <= index < 9:
+            return []
+        path = [self.mahas[index]]
+        while len(path) < depth:
+            period = path[-1].sub_period_at(jd)
+            if period is None:
+                break
+            path.append(period)
+        return path
+    
+    def paths_at_sorted(self, jds, depth=3):
+        """
+        Yield path_at(jd, depth) for each of an ascending sequence of jds
         
-        # Generate Antar Dashas
-        antar_dashas = []
-        antar_start = current_date
+        A merge join of the dates against the period boundaries: one cursor
+        per level only ever moves forward, so n dates over m periods cost
+        O(n + m) rather than a fresh descent per date.
+        """
+        cursors = []  # per level: [boundaries, index, period]
+        for jd in jds:
+            path = []
+            bounds = self.maha_bounds
+            for level in range(depth):
+                if level < len(cursors) and cursors[level][0] is bounds:
+                    cursor = cursors[level]
+                else:
+                    del cursors[level:]
+                    cursor = [bounds, 0, None]
+                    cursors.append(cursor)
+                
+                k = cursor[1]
+                last = len(bounds) - 2
+                while k < last and jd >= bounds[k + 1]:
+                    k += 1
+                if not bounds[k] <= jd < bounds[k + 1]:
+                    break
+                if cursor[2] is None or k != cursor[1]:
+                    cursor[1] = k
+                    cursor[2] = self.mahas[k] if level == 0 else path[-1]._sub_period(k, bounds)
+                path.append(cursor[2])
+                bounds = cursor[2].sub_bounds()
+            yield path
+    
+    def iter_periods(self, start_jd, end_jd, depth):
+        """
+        Yield the periods `depth` levels down that overlap [start_jd, end_jd)
         
-        for j in range(9):
-            antar_lord_index = (lord_index + j) % 9
-            antar_lord = DASHA_SEQUENCE[antar_lord_index]
-            
-            # Antar period = (Maha period * Antar lord years) / 120
-            antar_years = (period_years * DASHA_PERIODS[antar_lord]) / 120
-            antar_days = int(antar_years * 365.25)
-            antar_end = antar_start + timedelta(days=antar_days)
-            
-            antar_dashas.append({
-                'planet': antar_lord,
-                'start_date': antar_start.isoformat(),
-                'end_date': antar_end.isoformat(),
-                'duration_years': round(antar_years, 2)
-            })
-            
-            antar_start = antar_end
+        Periods come out in time order; branches outside the window are
+        never expanded.
+        """
+        def walk(period):
+            if period.end_jd <= start_jd or period.start_jd >= end_jd:
+                return
+            if period.level + 1 == depth:
+                yield period
+                return
+            for sub_period in period.sub_periods():
+                yield from walk(sub_period)
         
+        for maha in self.mahas:
+            yield from walk(maha)
+
+
+def build_timelines(births, year_days=DEFAULT_YEAR_DAYS):
+    """
+    DashaTimelines for many births with one vectorized boundary calculation
+    
+    Args:
+        births: list of (birth Julian day, Moon longitude) pairs
+        year_days: days per dasha year
+    """
+    if not births:
+        return []
+    birth_jds, moons = zip(*births)
+    lords, bounds = maha_dasha_bounds(birth_jds, moons, year_days)
+    return [
+        DashaTimeline(int(lord), row, year_days, calculate_dasha_balance(moon, year_days))
+        for lord, row, moon in zip(lords, bounds, moons)
+    ]
+
+
+def generate_dasha_periods(birth_datetime, moon_longitude, num_years=120,
+                           year_days=DEFAULT_YEAR_DAYS):
+    """
+    Generate complete Vimshottari Dasha periods
+    
+    Args:
+        birth_datetime: Birth datetime string
+        moon_longitude: Moon's longitude
+        num_years: Number of years to generate (default 120)
+        year_days: days per dasha year
+    
+    Returns:
+        list of Maha Dasha periods with Antar Dashas
+    """
+    birth_jd = _julian_day(_parse_datetime(birth_datetime))
+    timeline = build_timelines([(birth_jd, moon_longitude)], year_days)[0]
+    
+    maha_dashas = []
+    for maha in timeline.mahas:
+        if maha.start_jd - birth_jd >= num_years * year_days:
+            break
         maha_dashas.append({
-            'planet': lord,
-            'start_date': current_date.isoformat(),
-            'end_date': end_date.isoformat(),
-            'duration_years': round(period_years, 2),
-            'antar_dashas': antar_dashas
+            **maha.to_dict(year_days),
+            'antar_dashas': [antar.to_dict(year_days) for antar in maha.sub_periods()]
         })
-        
-        current_date = end_date
     
     return {
-        'birth_balance': balance,
-        'maha_dashas': maha_dashas[:9]  # All 9 Maha Dashas
+        'birth_balance': timeline.birth_balance,
+        'maha_dashas': maha_dashas
     }
 
 
-def get_current_dasha(chart_id, date=None):
+def get_timeline(chart, year_days=DEFAULT_YEAR_DAYS):
+    """DashaTimeline of a chart, built on first use and then reused"""
+    key = (chart['chart_id'], year_days)
+    timeline = timeline_cache.get(key)
+    if timeline is None:
+        birth_jd = _julian_day(_parse_datetime(chart['datetime']))
+        moon = chart['planets']['Moon']['longitude']
+        timeline = build_timelines([(birth_jd, moon)], year_days)[0]
+        timeline_cache.put(key, timeline)
+    return timeline
+
+
+def _check_depth(depth):
+    depth = int(depth)
+    if not 1 <= depth <= len(DASHA_LEVELS):
+        raise ValueError(f'depth must be between 1 and {len(DASHA_LEVELS)}')
+    return depth
+
+
+def get_current_dasha(chart_id, date=None, depth=3, year_days=DEFAULT_YEAR_DAYS):
     """
     Get current running Dasha periods
     
     Args:
         chart_id: Chart UUID
         date: Optional date (defaults to now)
+        depth: levels to report, 1 (Maha) to 5 (Prana)
+        year_days: days per dasha year (365.25, or 360 for savana years)
     
     Returns:
-        dict with current Maha, Antar, and Pratyantar Dashas
+        dict with current Maha, Antar, and Pratyantar Dashas (and Sookshma
+        and Prana for deeper requests)
     """
     try:
         # Load chart
-        cache_file = os.path.join(CHARTS_DIR, f'{chart_id}.json')
-        if not os.path.exists(cache_file):
+        chart = get_store(CHARTS_DIR).get(chart_id)
+        if chart is None:
             return {'error': f'Chart {chart_id} not found'}
         
-        with open(cache_file, 'r') as f:
-            chart = json.load(f)
-        
-        # Get Moon position
-        moon_long = chart['planets']['Moon']['longitude']
-        birth_datetime = chart['datetime']
-        
-        # Generate Dasha periods
-        dashas = generate_dasha_periods(birth_datetime, moon_long)
+        timeline = get_timeline(chart, year_days)
         
         # Determine current date
         if date:
-            if date.endswith('Z'):
-                date = date[:-1] + '+00:00'
-            current_dt = datetime.fromisoformat(date)
+            current_dt = _parse_datetime(date)
         else:
-            current_dt = datetime.now()
+            current_dt = datetime.now(timezone.utc)
         
-        # Find current Maha Dasha
-        current_maha = None
-        current_antar = None
+        depth = _check_depth(depth)
+        jd = _julian_day(current_dt)
         
-        for maha in dashas['maha_dashas']:
-            maha_start = datetime.fromisoformat(maha['start_date'].replace('Z', '+00:00'))
-            maha_end = datetime.fromisoformat(maha['end_date'].replace('Z', '+00:00'))
-            
-            if maha_start <= current_dt <= maha_end:
-                current_maha = maha
-                
-                # Find current Antar Dasha
-                for antar in maha['antar_dashas']:
-                    antar_start = datetime.fromisoformat(antar['start_date'].replace('Z', '+00:00'))
-                    antar_end = datetime.fromisoformat(antar['end_date'].replace('Z', '+00:00'))
-                    
-                    if antar_start <= current_dt <= antar_end:
-                        current_antar = antar
-                        break
-                
+        # Running periods, derived only along the branch containing jd
+        path = timeline.path_at(jd, depth)
+        if not path:
+            return {'error': 'No current Dasha found for this date'}
+        
+        result = {'current_date': current_dt.isoformat()}
+        for key, period in zip(DASHA_LEVELS, path):
+            result[key] = period.to_dict(year_days)
+        result['birth_balance'] = timeline.birth_balance
+        return result
+        
+    except Exception as e:
+        import traceback
+        return {
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        }
+
+
+def get_dasha_periods(chart_id, start_date, end_date, depth=2, limit=MAX_PERIODS,
+                      year_days=DEFAULT_YEAR_DAYS):
+    """
+    List the dasha periods of one level within a date range
+    
+    Args:
+        chart_id: Chart UUID
+        start_date, end_date: ISO dates bounding the range
+        depth: level to list, 1 (Maha) to 5 (Prana)
+        limit: maximum number of periods returned
+        year_days: days per dasha year
+    
+    Returns:
+        dict with periods (each with its lord path) and a truncated flag
+    """
+    try:
+        chart = get_store(CHARTS_DIR).get(chart_id)
+        if chart is None:
+            return {'error': f'Chart {chart_id} not found'}
+        
+        depth = _check_depth(depth)
+        start_jd = _julian_day(_parse_datetime(start_date))
+        end_jd = _julian_day(_parse_datetime(end_date))
+        
+        periods = []
+        truncated = False
+        for period in get_timeline(chart, year_days).iter_periods(start_jd, end_jd, depth):
+            if len(periods) >= limit:
+                truncated = True
                 break
+            periods.append({**period.to_dict(year_days), 'path': list(period.path)})
         
-        if not current_maha:
-            return {'error': 'No current Dasha found for this date'}
+        return {
+            'level': DASHA_LEVELS[depth - 1],
+            'periods': periods,
+            'truncated': truncated
+        }
         
+    except Exception as e:
+        import traceback
         return {
-            'current_date': current_dt.isoformat(),
-            'maha_dasha': {
-                'planet': current_maha['planet'],
-                'start_date': current_maha['start_date'],
-                'end_date': current_maha['end_date'],
-                'duration_years': current_maha['duration_years']
-            },
-            'antar_dasha': current_antar if current_antar else None,
-            'birth_balance': dashas['birth_balance']
+            'error': str(e),
+            'traceback': traceback.format_exc()
         }
+
+
+def _add_months(dt, months):
+    """Same day-of-month `months` later, clamped to the month's length"""
+    month_index = dt.month - 1 + months
+    year, month = dt.year + month_index // 12, month_index % 12 + 1
+    next_month = datetime(year + month // 12, month % 12 + 1, 1)
+    days_in_month = (next_month - datetime(year, month, 1)).days
+    return dt.replace(year=year, month=month, day=min(dt.day, days_in_month))
+
+
+def date_range(start_date, end_date, step='month'):
+    """
+    ISO datetimes from start_date up to end_date (inclusive)
+    
+    Args:
+        step: 'day', 'week', 'month', 'year' or a number of days
+    """
+    start = _parse_datetime(start_date)
+    end = _parse_datetime(end_date)
+    months = {'month': 1, 'year': 12}.get(step)
+    if months is None:
+        days = {'day': 1, 'week': 7}.get(step, step)
+        delta = timedelta(days=float(days))
+        if delta.total_seconds() <= 0:
+            raise ValueError('step must be positive')
+    
+    dates = []
+    n = 0
+    current = start
+    while current <= end:
+        if len(dates) >= MAX_DATES:
+            raise ValueError(f'Date range has more than {MAX_DATES} dates')
+        dates.append(current.isoformat())
+        n += 1
+        current = _add_months(start, months * n) if months else start + delta * n
+    return dates
+
+
+def get_dasha_timeline(chart_id, dates=None, start_date=None, end_date=None,
+                       step='month', depth=3, year_days=DEFAULT_YEAR_DAYS):
+    """
+    Running dasha lords for many dates of one chart in a single call
+    
+    Args:
+        chart_id: Chart UUID
+        dates: list of ISO dates, or
+        start_date, end_date, step: a regular range (see date_range)
+        depth: levels to report, 1 (Maha) to 5 (Prana)
+        year_days: days per dasha year
+    
+    Returns:
+        dict with one entry per date (input order) naming the lord of each
+        level (None outside the dasha timeline)
+    """
+    try:
+        chart = get_store(CHARTS_DIR).get(chart_id)
+        if chart is None:
+            return {'error': f'Chart {chart_id} not found'}
+        
+        depth = _check_depth(depth)
+        if dates is None:
+            dates = date_range(start_date, end_date, step)
+        if len(dates) > MAX_DATES:
+            raise ValueError(f'At most {MAX_DATES} dates per request')
+        
+        jds = [_julian_day(_parse_datetime(date)) for date in dates]
+        order = sorted(range(len(jds)), key=jds.__getitem__)
+        paths = get_timeline(chart, year_days).paths_at_sorted((jds[i] for i in order), depth)
+        
+        rows = [None] * len(dates)
+        for i, path in zip(order, paths):
+            row = {'date': dates[i]}
+            for level, key in enumerate(DASHA_LEVELS[:depth]):
+                row[key] = path[level].lord if level < len(path) else None
+            rows[i] = row
+        
+        return {'timeline': rows}
         
     except Exception as e:
         import traceback
@@ -249,19 +568,44 @@ def get_current_dasha(chart_id, date=None):
         }
 
 
+def handle_request(input_data):
+    """Dispatch a CLI/worker request to the matching Dasha operation"""
+    action = input_data.get('action', 'current')
+    
+    if action == 'current':
+        return get_current_dasha(
+            input_data['chart_id'],
+            input_data.get('date'),
+            input_data.get('depth', 3),
+            float(input_data.get('year_days', DEFAULT_YEAR_DAYS))
+        )
+    elif action == 'periods':
+        return get_dasha_periods(
+            input_data['chart_id'],
+            input_data['start_date'],
+            input_data['end_date'],
+            input_data.get('depth', 2),
+            min(int(input_data.get('limit', MAX_PERIODS)), MAX_PERIODS),
+            float(input_data.get('year_days', DEFAULT_YEAR_DAYS))
+        )
+    elif action == 'timeline':
+        return get_dasha_timeline(
+            input_data['chart_id'],
+            input_data.get('dates'),
+            input_data.get('start_date'),
+            input_data.get('end_date'),
+            input_data.get('step', 'month'),
+            input_data.get('depth', 3),
+            float(input_data.get('year_days', DEFAULT_YEAR_DAYS))
+        )
+    else:
+        return {'error': f'Unknown action: {action}'}
+
+
 if __name__ == '__main__':
     try:
         input_data = json.loads(sys.argv[1])
-        action = input_data.get('action', 'current')
-        
-        if action == 'current':
-            result = get_current_dasha(
-                input_data['chart_id'],
-                input_data.get('date')
-            )
-        else:
-            result = {'error': f'Unknown action: {action}'}
-        
+        result = handle_request(input_data)
         print(json.dumps(result))
         
     except Exception as e:
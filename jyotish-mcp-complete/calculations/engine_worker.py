@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Engine Worker - Long-lived calculation process for the MCP server
+
+Instead of spawning one interpreter per tool call, the MCP server keeps this
+process running and talks to it with newline-delimited JSON over stdin/stdout.
+Calculators are imported on their first request (or all at once by a
+"warm" op), so a new worker answers as soon as the interpreter is up, and
+Swiss Ephemeris is initialized once, on first use.
+
+Protocol (one JSON object per line):
+    request:  {"id": 1, "script": "chart_calculator", "args": {"action": "create", ...}}
+    response: {"id": 1, "result": {...}}
+    failure:  {"id": 1, "error": "...", "traceback": "..."}
+
+A request with "stream": true is answered incrementally: one {"id", "item"}
+line per result item as it is computed, then {"id", "result": {"items": n}}
+(or an error line, which also ends the stream).
+
+A request with "op": "ping" answers with the worker's pid, resident memory and
+request count; the server's pool uses it for health checks and recycling.
+A request with "op": "warm" imports every calculator and answers with
+their names; the pool sends it right after spawning a worker.
+"""
+
+import sys
+import json
+import os
+import importlib
+import traceback
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# Calculators are imported from this directory, as the MCP server runs them
+CALCULATIONS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Script name (as used by the MCP server) -> request handler function name
+HANDLERS = {
+    'chart_calculator': 'handle_request',
+    'dasha_calculator': 'handle_request',
+    'transit_calculator': 'handle_request',
+    'varga_calculator': 'handle_request',
+    'yoga_identifier': 'handle_request',
+    'compatibility_calculator': 'handle_request',
+}
+
+# Script name -> handler returning an iterator of items, for stream requests
+STREAM_HANDLERS = {
+    'transit_calculator': 'handle_stream',
+}
+
+
+def get_handler(script, handlers=HANDLERS):
+    """Handler function for a script, importing its module on first use"""
+    name = handlers.get(script)
+    if name is None:
+        return None
+    if CALCULATIONS_DIR not in sys.path:
+        sys.path.insert(0, CALCULATIONS_DIR)
+    return getattr(importlib.import_module(script), name)
+
+
+# Requests answered by this process (reported in ping replies)
+requests_served = 0
+
+
+def memory_mb():
+    """Resident memory of this process in megabytes (None if unknown)"""
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+        return round(resident_pages * os.sysconf('SC_PAGE_SIZE') / 2**20, 1)
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    if resource is None:
+        return None
+    # Peak rather than current RSS; reported in KB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (2**20 if sys.platform == 'darwin' else 2**10), 1)
+
+
+def dispatch(request):
+    """
+    Execute a single worker request
+
+    Args:
+        request: decoded request dict with id, script and args (or op)
+
+    Returns:
+        response dict carrying the same id
+    """
+    global requests_served
+
+    request_id = request.get('id')
+    try:
+        if request.get('op') == 'ping':
+            return {'id': request_id, 'result': {
+                'pid': os.getpid(),
+                'memory_mb': memory_mb(),
+                'requests_served': requests_served
+            }}
+        if request.get('op') == 'warm':
+            for script in HANDLERS:
+                get_handler(script)
+            return {'id': request_id, 'result': {'loaded': list(HANDLERS)}}
+
+        requests_served += 1
+
+        script = request.get('script')
+        handler = get_handler(script)
+        if handler is None:
+            return {'id': request_id, 'error': f'Unknown script: {script}'}
+
+        return {'id': request_id, 'result': handler(request.get('args') or {})}
+
+    except Exception as e:
+        return {
+            'id': request_id,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        }
+
+
+def dispatch_stream(request):
+    """
+    Execute a streaming worker request
+
+    Args:
+        request: decoded request dict with id, script and args
+
+    Yields:
+        item responses, then a final result (or error) response, all
+        carrying the request id
+    """
+    global requests_served
+
+    request_id = request.get('id')
+    requests_served += 1
+    try:
+        script = request.get('script')
+        handler = get_handler(script, STREAM_HANDLERS)
+        if handler is None:
+            yield {'id': request_id, 'error': f'Script {script} does not stream'}
+            return
+
+        count = 0
+        for item in handler(request.get('args') or {}):
+            count += 1
+            yield {'id': request_id, 'item': item}
+        yield {'id': request_id, 'result': {'items': count}}
+
+    except Exception as e:
+        yield {
+            'id': request_id,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        }
+
+
+def _encode_response(response):
+    """
+    JSON line of a response, and whether it could be encoded as given
+
+    A result that JSON cannot represent (a numpy scalar, a datetime) is
+    replaced by an error response for the same request id.
+    """
+    try:
+        return json.dumps(response, separators=(',', ':')), True
+    except (TypeError, ValueError) as e:
+        error = {'id': response.get('id'), 'error': f'Unserializable response: {e}'}
+        return json.dumps(error, separators=(',', ':')), False
+
+
+def serve(stdin, stdout):
+    """Answer newline-delimited JSON requests until stdin is closed"""
+    for line in stdin:
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            responses = [{'id': None, 'error': f'Invalid request: {e}'}]
+        else:
+            if not isinstance(request, dict):
+                responses = [{'id': None, 'error': 'Invalid request: not a JSON object'}]
+            elif request.get('stream'):
+                responses = dispatch_stream(request)
+            else:
+                responses = [dispatch(request)]
+
+        for response in responses:
+            text, encoded = _encode_response(response)
+            stdout.write(text + '\n')
+            stdout.flush()
+            if not encoded:
+                # The error line ends the request, a stream included
+                break
+
+
+if __name__ == '__main__':
+    # Keep the protocol stream clean: anything a calculator prints goes to
+    # stderr, only framed responses go to the real stdout.
+    protocol_out = sys.stdout
+    sys.stdout = sys.stderr
+
+    try:
+        serve(sys.stdin, protocol_out)
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Ephemeris - Vectorized planetary positions over arrays of Julian days
+
+Wraps Swiss Ephemeris so callers ask for many instants and planets at once
+and get back a NumPy structured array instead of one dict per planet.
+Sidereal correction and Ketu are applied as array operations.
+
+Importing this module has no side effects; Swiss Ephemeris is pointed at
+the bundled files and switched to Lahiri by init_ephemeris(), which every
+entry point here calls (and callers of swisseph elsewhere call first).
+"""
+
+import os
+import sys
+
+import numpy as np
+import swisseph as swe
+
+# Import constants
+try:
+    from constants import PLANETS, SWISSEPH_PLANETS
+except ImportError:
+    sys.path.insert(0, os.path.dirname(__file__))
+    from constants import PLANETS, SWISSEPH_PLANETS
+
+# One record per (instant, planet); angles in degrees, speed in degrees/day
+POSITION_DTYPE = np.dtype([
+    ('longitude', 'f8'),
+    ('latitude', 'f8'),
+    ('speed', 'f8'),
+])
+
+# Tropical positions with speeds; the sidereal shift is applied afterwards
+CALC_FLAGS = swe.FLG_SWIEPH | swe.FLG_SPEED
+
+EPHE_PATH = os.path.join(os.path.dirname(__file__), 'ephemeris_data')
+
+_initialized = False
+
+
+def init_ephemeris():
+    """Set the ephemeris path and Lahiri ayanamsa, once per process"""
+    global _initialized
+    if not _initialized:
+        swe.set_ephe_path(EPHE_PATH)
+        swe.set_sid_mode(swe.SIDM_LAHIRI)  # Lahiri ayanamsa
+        _initialized = True
+
+
+def julian_day(dt):
+    """Julian day (UT) for a datetime already expressed in UT"""
+    return swe.julday(
+        dt.year, dt.month, dt.day,
+        dt.hour + dt.minute/60.0 + dt.second/3600.0
+    )
+
+
+def ayanamsa(jds):
+    """
+    Lahiri ayanamsa and its daily rate for each Julian day
+
+    Includes nutation, matching what Swiss Ephemeris subtracts when asked
+    for FLG_SIDEREAL positions.
+
+    Returns:
+        (ayanamsa, rate) arrays in degrees and degrees/day
+    """
+    init_ephemeris()
+    jds = np.atleast_1d(np.asarray(jds, dtype=float))
+    values = np.empty((3, jds.size))
+    for i, jd in enumerate(jds.tolist()):
+        values[0, i] = swe.get_ayanamsa_ex_ut(jd, 0)[1]
+        values[1, i] = swe.get_ayanamsa_ex_ut(jd - 0.5, 0)[1]
+        values[2, i] = swe.get_ayanamsa_ex_ut(jd + 0.5, 0)[1]
+    return values[0], values[2] - values[1]
+
+
+def planet_positions(jds, planets=None, sidereal=True):
+    """
+    Positions of several planets at many instants
+
+    Args:
+        jds: Julian day (UT) or array of Julian days
+        planets: planet names to include (defaults to all nine grahas)
+        sidereal: apply the Lahiri ayanamsa (default) or return tropical
+
+    Returns:
+        structured array of shape (n_times, n_planets) with POSITION_DTYPE
+        fields, columns in the order of `planets`
+    """
+    init_ephemeris()
+    jds = np.atleast_1d(np.asarray(jds, dtype=float))
+    planets = list(planets) if planets is not None else list(PLANETS)
+    unknown = [p for p in planets if p not in SWISSEPH_PLANETS]
+    if unknown:
+        raise ValueError(f'Unknown planets: {unknown}')
+
+    # Ketu has no ephemeris of its own: compute Rahu instead and mirror it
+    computed = [p for p in planets if p != 'Ketu']
+    if 'Ketu' in planets and 'Rahu' not in computed:
+        computed.append('Rahu')
+
+    raw = np.empty((jds.size, len(computed), 3))
+    calc_ut = swe.calc_ut
+    jd_list = jds.tolist()
+    for j, name in enumerate(computed):
+        planet_id = SWISSEPH_PLANETS[name]
+        column = raw[:, j]
+        for i, jd in enumerate(jd_list):
+            xx = calc_ut(jd, planet_id, CALC_FLAGS)[0]
+            column[i] = (xx[0], xx[1], xx[3])
+
+    if sidereal:
+        ayan, rate = ayanamsa(jds)
+        raw[:, :, 0] = (raw[:, :, 0] - ayan[:, None]) % 360
+        raw[:, :, 2] -= rate[:, None]
+
+    result = np.empty((jds.size, len(planets)), dtype=POSITION_DTYPE)
+    for j, name in enumerate(planets):
+        if name == 'Ketu':
+            rahu = raw[:, computed.index('Rahu')]
+            result['longitude'][:, j] = (rahu[:, 0] + 180) % 360
+            result['latitude'][:, j] = -rahu[:, 1]
+            result['speed'][:, j] = rahu[:, 2]
+        else:
+            source = raw[:, computed.index(name)]
+            result['longitude'][:, j] = source[:, 0]
+            result['latitude'][:, j] = source[:, 1]
+            result['speed'][:, j] = source[:, 2]
+
+    return result
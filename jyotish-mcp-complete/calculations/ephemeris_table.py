@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Ephemeris Table - Precomputed sidereal positions for fast range queries
+
+A build step samples all grahas (Lahiri, with speeds) at a fixed step and
+writes them to a compact binary file. The reader memory-maps that file and
+answers position queries by cubic Hermite interpolation between samples,
+so scanning years of transits is array slicing rather than millions of
+Swiss Ephemeris calls. Instants outside the table fall back to swe.calc_ut.
+
+File layout (little endian):
+    header   magic, version, sidereal mode, planet count, start JD, step,
+             sample count, max interpolation error (degrees)
+    planets  int32 Swiss Ephemeris id per column
+    samples  (n_samples, n_planets) records of longitude f8, latitude f4,
+             speed f4
+
+Usage:
+    python ephemeris_table.py build [--start-year 1900] [--end-year 2100]
+                                    [--step 1.0] [--output PATH]
+"""
+
+import argparse
+import os
+import struct
+import sys
+
+import numpy as np
+import swisseph as swe
+
+# Import ephemeris engine and constants
+try:
+    from constants import PLANETS, SWISSEPH_PLANETS
+    from ephemeris import POSITION_DTYPE, planet_positions
+except ImportError:
+    sys.path.insert(0, os.path.dirname(__file__))
+    from constants import PLANETS, SWISSEPH_PLANETS
+    from ephemeris import POSITION_DTYPE, planet_positions
+
+MAGIC = b'JYEPHTBL'
+VERSION = 1
+HEADER = struct.Struct('<8sIIIddId')
+
+SAMPLE_DTYPE = np.dtype([
+    ('longitude', '<f8'),
+    ('latitude', '<f4'),
+    ('speed', '<f4'),
+])
+
+# Ketu is mirrored from Rahu on read, so it is not stored
+TABLE_PLANETS = [p for p in PLANETS if p != 'Ketu']
+
+DEFAULT_TABLE_PATH = os.getenv(
+    'JYOTISH_EPHEMERIS_TABLE',
+    os.path.join(os.path.dirname(__file__), 'ephemeris_data', 'sidereal_lahiri.bin')
+)
+
+# Samples computed per planet_positions call while building
+BUILD_CHUNK = 4096
+
+
+def _hermite(t, h, p0, v0, p1, v1):
+    """Cubic Hermite value and derivative at fraction t of an interval of length h"""
+    t2 = t * t
+    t3 = t2 * t
+    value = ((2*t3 - 3*t2 + 1) * p0 + (t3 - 2*t2 + t) * h * v0
+             + (-2*t3 + 3*t2) * p1 + (t3 - t2) * h * v1)
+    slope = ((6*t2 - 6*t) * p0 / h + (3*t2 - 4*t + 1) * v0
+             + (-6*t2 + 6*t) * p1 / h + (3*t2 - 2*t) * v1)
+    return value, slope
+
+
+class EphemerisTable:
+    """Memory-mapped reader for a table written by build_table()"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            header = f.read(HEADER.size)
+            (magic, version, self.sid_mode, n_planets, self.start_jd,
+             self.step, self.n_samples, self.max_error) = HEADER.unpack(header)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f'{path} is not a version {VERSION} ephemeris table')
+            planet_ids = struct.unpack(f'<{n_planets}i', f.read(4 * n_planets))
+
+        names_by_id = {SWISSEPH_PLANETS[p]: p for p in TABLE_PLANETS}
+        self.planets = [names_by_id[pid] for pid in planet_ids]
+        self.end_jd = self.start_jd + self.step * (self.n_samples - 1)
+        self._samples = np.memmap(
+            path, dtype=SAMPLE_DTYPE, mode='r',
+            offset=_data_offset(n_planets),
+            shape=(self.n_samples, n_planets)
+        )
+
+    def covers(self, jds):
+        """Boolean mask of the instants the table can answer"""
+        jds = np.asarray(jds, dtype=float)
+        return (jds >= self.start_jd) & (jds < self.end_jd)
+
+    def positions(self, jds, planets=None):
+        """
+        Interpolated positions, same contract as ephemeris.planet_positions
+
+        Instants outside the table are computed with Swiss Ephemeris.
+        """
+        jds = np.atleast_1d(np.asarray(jds, dtype=float))
+        planets = list(planets) if planets is not None else list(PLANETS)
+        result = np.empty((jds.size, len(planets)), dtype=POSITION_DTYPE)
+
+        inside = self.covers(jds)
+        if not inside.all():
+            result[~inside] = planet_positions(jds[~inside], planets)
+        if not inside.any():
+            return result
+
+        offset = (jds[inside] - self.start_jd) / self.step
+        index = offset.astype(np.int64)
+        t = (offset - index)[:, None]
+        before = self._samples[index]
+        after = self._samples[index + 1]
+
+        p0 = before['longitude']
+        # Unwrap across 0°/360° so the interpolation follows the short arc
+        p1 = p0 + (after['longitude'] - p0 + 180) % 360 - 180
+        longitude, speed = _hermite(
+            t, self.step,
+            p0, before['speed'].astype(float),
+            p1, after['speed'].astype(float)
+        )
+        latitude = (1 - t) * before['latitude'] + t * after['latitude']
+
+        rows = np.empty((index.size, len(planets)), dtype=POSITION_DTYPE)
+        for j, name in enumerate(planets):
+            column = self.planets.index('Rahu' if name == 'Ketu' else name)
+            if name == 'Ketu':
+                rows['longitude'][:, j] = (longitude[:, column] + 180) % 360
+                rows['latitude'][:, j] = -latitude[:, column]
+            else:
+                rows['longitude'][:, j] = longitude[:, column] % 360
+                rows['latitude'][:, j] = latitude[:, column]
+            rows['speed'][:, j] = speed[:, column]
+        result[inside] = rows
+        return result
+
+
+def _data_offset(n_planets):
+    """Byte offset of the sample array, aligned to 16 bytes"""
+    size = HEADER.size + 4 * n_planets
+    return (size + 15) // 16 * 16
+
+
+def _measure_error(table, start_jd, end_jd, samples=2000):
+    """Largest longitude error (degrees) of the table against Swiss Ephemeris"""
+    rng = np.random.default_rng(0)
+    jds = rng.uniform(start_jd, end_jd, samples)
+    expected = planet_positions(jds, TABLE_PLANETS)['longitude']
+    actual = table.positions(jds, TABLE_PLANETS)['longitude']
+    return float(np.abs((actual - expected + 180) % 360 - 180).max())
+
+
+def build_table(path, start_jd, end_jd, step=1.0):
+    """
+    Sample every graha from start_jd to end_jd and write the table to path
+
+    Returns:
+        the EphemerisTable reading the new file, with its measured max_error
+    """
+    n_samples = int(np.ceil((end_jd - start_jd) / step)) + 1
+    planet_ids = [SWISSEPH_PLANETS[p] for p in TABLE_PLANETS]
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    def write_header(f, max_error):
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, swe.SIDM_LAHIRI, len(planet_ids),
+                            start_jd, step, n_samples, max_error))
+        f.write(struct.pack(f'<{len(planet_ids)}i', *planet_ids))
+
+    with open(path, 'wb') as f:
+        write_header(f, float('nan'))
+        f.seek(_data_offset(len(planet_ids)))
+        for first in range(0, n_samples, BUILD_CHUNK):
+            count = min(BUILD_CHUNK, n_samples - first)
+            jds = start_jd + step * np.arange(first, first + count)
+            positions = planet_positions(jds, TABLE_PLANETS)
+            chunk = np.empty(positions.shape, dtype=SAMPLE_DTYPE)
+            for field in SAMPLE_DTYPE.names:
+                chunk[field] = positions[field]
+            f.write(chunk.tobytes())
+
+    # Record the measured accuracy bound in the header
+    max_error = _measure_error(EphemerisTable(path), start_jd, start_jd + step * (n_samples - 1))
+    with open(path, 'r+b') as f:
+        write_header(f, max_error)
+    return EphemerisTable(path)
+
+
+_default_table = None
+
+
+def get_default_table():
+    """The table at DEFAULT_TABLE_PATH, or None if it has not been built"""
+    global _default_table
+    if _default_table is None and os.path.exists(DEFAULT_TABLE_PATH):
+        table = EphemerisTable(DEFAULT_TABLE_PATH)
+        if table.sid_mode == swe.SIDM_LAHIRI:
+            _default_table = table
+    return _default_table
+
+
+def sidereal_positions(jds, planets=None):
+    """
+    Sidereal positions from the precomputed table when available
+
+    Same return value as ephemeris.planet_positions; uses Swiss Ephemeris
+    directly if no table is installed or for instants it does not cover.
+    """
+    table = get_default_table()
+    if table is None:
+        return planet_positions(jds, planets)
+    return table.positions(jds, planets)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build the sidereal ephemeris table')
+    subcommands = parser.add_subparsers(dest='command', required=True)
+    build = subcommands.add_parser('build')
+    build.add_argument('--start-year', type=int, default=1900)
+    build.add_argument('--end-year', type=int, default=2100)
+    build.add_argument('--step', type=float, default=1.0, help='sample spacing in days')
+    build.add_argument('--output', default=DEFAULT_TABLE_PATH)
+    args = parser.parse_args()
+
+    table = build_table(
+        args.output,
+        swe.julday(args.start_year, 1, 1, 0.0),
+        swe.julday(args.end_year + 1, 1, 1, 0.0),
+        args.step
+    )
+    print(f'Wrote {table.n_samples} samples x {len(table.planets)} planets to {args.output}')
+    print(f'Max interpolation error: {table.max_error * 3600:.3f} arcseconds')
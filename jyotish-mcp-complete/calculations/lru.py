@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+LRU - Small size-bounded in-memory cache shared by the calculators
+
+Long-lived engine workers keep recently used charts and derived data here
+so repeated tool calls for the same inputs skip recomputation.
+"""
+
+import os
+from collections import OrderedDict
+
+
+def int_from_env(name, default, minimum=0):
+    """
+    Read an integer setting from the environment
+
+    Unset, malformed or below `minimum`, the setting takes `default`.
+    """
+    try:
+        value = int(os.getenv(name, default))
+    except ValueError:
+        return default
+    return value if value >= minimum else default
+
+
+def cache_size_from_env(name, default):
+    """Read a cache size from the environment (0 disables the cache)"""
+    return int_from_env(name, default)
+
+
+class LRUCache:
+    """Least-recently-used mapping holding at most `maxsize` entries"""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+
+    def get(self, key, default=None):
+        """Return the cached value and mark it most recently used"""
+        try:
+            self._entries.move_to_end(key)
+        except KeyError:
+            return default
+        return self._entries[key]
+
+    def put(self, key, value):
+        """Insert or refresh an entry, evicting the oldest beyond maxsize"""
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
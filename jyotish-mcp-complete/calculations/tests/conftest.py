@@ -0,0 +1,59 @@
+"""
+conftest.py
+-----------
+Shared pytest fixtures for the calculation engine scripts.
+
+The calculators are standalone scripts that import each other as top-level
+modules (the MCP server runs them with `calculations/` as the working
+directory), so the directory is put on sys.path here.
+
+This module provides:
+- `charts_dir`: isolated chart cache directory for a single test
+- `birth_data`: canonical birth record used across tests
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# Every calculator imports swisseph at module level
+pytest.importorskip("swisseph")
+
+
+# ---------------------------------------------------------------------
+# FIXTURES
+# ---------------------------------------------------------------------
+
+@pytest.fixture
+def charts_dir(tmp_path, monkeypatch):
+    """Point every calculator at an empty chart cache for this test."""
+    import chart_calculator
+    import compatibility_calculator
+    import dasha_calculator
+    import transit_calculator
+    import varga_calculator
+    import yoga_identifier
+
+    cache = str(tmp_path / '.charts_cache')
+    os.makedirs(cache)
+    for module in (chart_calculator, compatibility_calculator, dasha_calculator, transit_calculator,
+                   varga_calculator, yoga_identifier):
+        monkeypatch.setattr(module, 'CHARTS_DIR', cache)
+    chart_calculator.chart_cache.clear()
+    dasha_calculator.timeline_cache.clear()
+    return cache
+
+
+@pytest.fixture(scope="session")
+def birth_data():
+    """Canonical birth record: Sep 27, 1953, 9:10 AM IST, Amritapuri."""
+    return {
+        'name': 'Amma',
+        'datetime': '1953-09-27T03:40:00Z',
+        'timezone': 'Asia/Kolkata',
+        'latitude': 9.1,
+        'longitude': 76.5,
+    }
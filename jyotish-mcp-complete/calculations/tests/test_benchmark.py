@@ -0,0 +1,36 @@
+import json
+
+import benchmark
+import chart_calculator
+from varga_calculator import VARGA_MAP
+
+
+def test_filtered_run_reports_timings(charts_dir):
+    report = benchmark.run_benchmarks(sizes=[20], repeat=1, name_filter='.20')
+    assert set(report['results']) == {'store.read.20', 'store.list.20', 'store.list_deep.20'}
+    for timing in report['results'].values():
+        assert timing['median_s'] > 0 and timing['number'] >= 1
+    json.dumps(report)
+    # Module charts directories are restored
+    assert chart_calculator.CHARTS_DIR == str(charts_dir)
+
+
+def test_compare_flags_regressions_over_threshold():
+    def report(**medians):
+        return {'results': {name: {'median_s': s} for name, s in medians.items()}}
+
+    baseline = report(fast=1.0, slow=1.0, gone=1.0)
+    current = report(fast=1.2, slow=2.0, new=5.0)
+    assert [r['name'] for r in benchmark.compare(current, baseline, 0.5)] == ['slow']
+    assert [r['name'] for r in benchmark.compare(current, baseline, 0.1)] == ['slow', 'fast']
+
+
+def test_baseline_covers_the_suite():
+    with open(benchmark.DEFAULT_BASELINE) as f:
+        names = set(json.load(f)['results'])
+    expected = {'chart.compute', 'dasha.generate_periods', 'dasha.current', 'transit.calculate',
+                'cli.transit_events', 'cli.worker_ping'}
+    expected |= {f'varga.{label}' for label in VARGA_MAP}
+    for size in benchmark.DEFAULT_SIZES:
+        expected |= {f'store.read.{size}', f'store.list.{size}'}
+    assert expected <= names
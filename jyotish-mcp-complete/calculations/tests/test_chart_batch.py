@@ -0,0 +1,42 @@
+import json
+
+import chart_calculator
+from chart_store import get_store
+
+
+def _named(birth_data, name):
+    return {**birth_data, 'name': name}
+
+
+def test_batch_matches_single_chart_calculation(charts_dir, birth_data):
+    single = chart_calculator.calculate_chart(birth_data)
+    batch = chart_calculator.calculate_charts_batch(
+        [_named(birth_data, 'A'), _named(birth_data, 'B')])
+
+    assert batch['count'] == 2 and batch['errors'] == []
+    for summary in batch['charts']:
+        chart = chart_calculator.read_chart(summary['chart_id'])
+        assert chart['planets'] == single['planets']
+        assert chart['ascendant'] == single['ascendant']
+
+
+def test_batch_reports_bad_records_and_keeps_going(charts_dir, birth_data):
+    records = [_named(birth_data, 'A'), {'datetime': 'not-a-date', 'latitude': 0, 'longitude': 0},
+               {'name': 'No datetime'}, _named(birth_data, 'B')]
+    result = chart_calculator.calculate_charts_batch(records)
+
+    assert result['count'] == 2
+    assert [e['index'] for e in result['errors']] == [1, 2]
+    assert get_store(charts_dir).count() == 2
+
+
+def test_create_batch_action_reads_ndjson_file(charts_dir, birth_data, tmp_path):
+    records_file = tmp_path / 'records.ndjson'
+    records_file.write_text(
+        '\n'.join(json.dumps(_named(birth_data, str(i))) for i in range(3)) + '\n')
+
+    result = chart_calculator.handle_request(
+        {'action': 'create_batch', 'records_file': str(records_file)})
+
+    assert result['count'] == 3
+    assert [c['name'] for c in result['charts']] == ['0', '1', '2']
@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+import chart_calculator
+import chart_codec
+from chart_store import SqliteChartStore
+
+
+def _engine_chart(latitude=9.1, longitude=76.5):
+    return chart_calculator.compute_chart({
+        'name': 'Codec', 'datetime': '1990-05-17T12:30:00Z', 'timezone': 'UTC',
+        'latitude': latitude, 'longitude': longitude}).to_dict()
+
+
+def test_round_trip_is_exact():
+    for latitude, longitude in ((9.1, 76.5), (-33, 151)):
+        chart = _engine_chart(latitude, longitude)
+        data = chart_codec.encode_chart(chart)
+        assert len(data) < len(json.dumps(chart, separators=(',', ':'))) / 5
+        # Same JSON text, integer coordinates included
+        assert json.dumps(chart_codec.decode_chart(data)) == json.dumps(chart)
+
+    header = chart_codec.read_header(data)
+    assert header == {'format_version': 1, 'engine': chart_calculator.ENGINE_SETTINGS}
+
+
+def test_rejects_other_shapes_and_versions():
+    chart = _engine_chart()
+    with pytest.raises(ValueError):
+        chart_codec.encode_chart({**chart, 'extra': 1})
+    with pytest.raises(ValueError):
+        chart_codec.encode_chart({**chart, 'planets': {'Sun': chart['planets']['Sun']}})
+
+    data = bytearray(chart_codec.encode_chart(chart))
+    data[4] = 99
+    with pytest.raises(ValueError, match='version'):
+        chart_codec.decode_chart(bytes(data))
+    with pytest.raises(ValueError):
+        chart_codec.decode_chart(b'{"chart_id": "a"}')
+
+
+def test_store_keeps_engine_charts_binary_and_others_json(tmp_path):
+    store = SqliteChartStore(str(tmp_path / 'charts.db'))
+    chart = _engine_chart()
+    partial = {'chart_id': 'p', 'name': 'Partial', 'datetime': chart['datetime'],
+               'julian_day': chart['julian_day'], 'planets': {}}
+    store.put_many([chart, partial])
+
+    rows = dict(store.connection.execute('SELECT chart_id, data FROM charts'))
+    assert isinstance(rows[chart['chart_id']], bytes)
+    assert isinstance(rows['p'], str)
+    assert store.get(chart['chart_id']) == chart
+    assert store.get('p') == partial
+
+    # Rows written as JSON before the codec existed still read back
+    with store.connection:
+        store.connection.execute('UPDATE charts SET data = ? WHERE chart_id = ?',
+                                 (json.dumps(chart), chart['chart_id']))
+    assert sorted(c['chart_id'] for c in store.iter_charts()) == sorted([chart['chart_id'], 'p'])
+    assert store.get(chart['chart_id']) == chart
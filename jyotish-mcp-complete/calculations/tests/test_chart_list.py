@@ -0,0 +1,69 @@
+import pytest
+
+import chart_calculator
+from chart_store import JsonDirChartStore, SqliteChartStore
+
+
+def _charts():
+    # Names and birth days in opposite orders so the sort keys differ
+    names = ['Kavya', 'Arjun', 'Kiran', 'Meera', 'Karthik', 'Devi', 'Anil']
+    return [{'chart_id': f'id-{i}', 'name': name, 'datetime': f'19{50 + i}-01-01T00:00:00Z',
+             'julian_day': 2433282.5 + 366 * i}
+            for i, name in enumerate(names)]
+
+
+@pytest.fixture(params=['sqlite', 'json'])
+def store(request, tmp_path):
+    if request.param == 'sqlite':
+        store = SqliteChartStore(str(tmp_path / 'charts.db'))
+    else:
+        store = JsonDirChartStore(str(tmp_path / 'json'))
+    store.put_many(_charts())
+    return store
+
+
+def _all_pages(store, limit, **options):
+    names, cursor = [], None
+    while True:
+        page, cursor = store.list_page(limit, cursor=cursor, **options)
+        names += [summary['name'] for summary in page]
+        if cursor is None:
+            return names
+
+
+def test_pages_cover_every_chart_once_in_order(store):
+    assert _all_pages(store, 3, order_by='name') == sorted(c['name'] for c in _charts())
+    assert _all_pages(store, 2, order_by='name', direction='desc') == sorted(
+        (c['name'] for c in _charts()), reverse=True)
+    assert _all_pages(store, 4, order_by='datetime') == [c['name'] for c in _charts()]
+
+
+def test_name_prefix_and_birth_range_filters(store):
+    assert _all_pages(store, 2, name_prefix='K', order_by='name') == ['Karthik', 'Kavya', 'Kiran']
+    jd_from, jd_to = _charts()[2]['julian_day'], _charts()[5]['julian_day']
+    assert _all_pages(store, 2, jd_from=jd_from, jd_to=jd_to, order_by='datetime') == [
+        'Kiran', 'Meera', 'Karthik']
+
+
+def test_cursor_is_bound_to_its_sort_order(store):
+    _, cursor = store.list_page(2, order_by='name')
+    with pytest.raises(ValueError):
+        store.list_page(2, cursor=cursor, order_by='datetime')
+
+
+def test_list_action_pages_and_filters(charts_dir, birth_data):
+    for name in ('Amma', 'Arun', 'Bala'):
+        chart_calculator.calculate_chart({**birth_data, 'name': name})
+
+    first = chart_calculator.handle_request(
+        {'action': 'list', 'limit': 2, 'order_by': 'name', 'name_prefix': 'A'})
+    assert [c['name'] for c in first['charts']] == ['Amma', 'Arun']
+    assert first['next_cursor'] is None
+
+    after = chart_calculator.list_charts(born_after='1953-09-28T00:00:00Z')
+    assert after == {'charts': [], 'next_cursor': None}
+    # Bounds with an offset are compared in UT: born 03:40Z is 09:10+05:30
+    before = chart_calculator.list_charts(born_before='1953-09-27T09:15:00+05:30')
+    assert len(before['charts']) == 3
+    assert chart_calculator.list_charts(born_before='1953-09-27T09:05:00+05:30')['charts'] == []
+    assert 'error' in chart_calculator.list_charts(limit=0)
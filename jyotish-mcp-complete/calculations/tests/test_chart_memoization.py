@@ -0,0 +1,55 @@
+import chart_calculator
+from chart_store import get_store
+
+
+def test_identical_request_returns_saved_chart(charts_dir, birth_data, monkeypatch):
+    first = chart_calculator.calculate_chart(birth_data)
+
+    def fail(*args):
+        raise AssertionError('chart was recomputed')
+
+    monkeypatch.setattr(chart_calculator, 'compute_chart', fail)
+    second = chart_calculator.calculate_chart(dict(birth_data))
+
+    assert second == first
+    assert [c['chart_id'] for c in chart_calculator.list_charts()['charts']] == [first['chart_id']]
+
+
+def test_chart_key_normalizes_inputs(birth_data):
+    same_instant = {**birth_data, 'datetime': '1953-09-27T09:10:00+05:30',
+                    'latitude': 9.1000000001}
+    assert chart_calculator.chart_key(same_instant) == chart_calculator.chart_key(birth_data)
+
+    moved = {**birth_data, 'longitude': 76.6}
+    assert chart_calculator.chart_key(moved) != chart_calculator.chart_key(birth_data)
+
+
+def test_saved_chart_found_after_memory_cache_is_cleared(charts_dir, birth_data):
+    created = chart_calculator.calculate_chart(birth_data)
+    chart_calculator.chart_cache.clear()
+
+    again = chart_calculator.calculate_chart(birth_data)
+    assert again['chart_id'] == created['chart_id']
+    assert get_store(charts_dir).count() == 1
+
+
+def test_batch_reuses_existing_and_repeated_records(charts_dir, birth_data):
+    existing = chart_calculator.calculate_chart(birth_data)
+    other = {**birth_data, 'name': 'Someone else'}
+
+    result = chart_calculator.calculate_charts_batch([birth_data, other, other])
+
+    ids = [c['chart_id'] for c in result['charts']]
+    assert ids[0] == existing['chart_id']
+    assert ids[1] == ids[2] != ids[0]
+    assert get_store(charts_dir).count() == 2
+
+
+def test_offset_and_utc_forms_give_the_same_chart(charts_dir, birth_data):
+    offset = chart_calculator.compute_chart({**birth_data, 'datetime': '1990-05-20T10:00:00+05:30'})
+    utc = chart_calculator.compute_chart({**birth_data, 'datetime': '1990-05-20T04:30:00Z'})
+
+    assert offset.chart_id == utc.chart_id
+    assert offset.julian_day == utc.julian_day
+    assert offset.ascendant == utc.ascendant
+    assert [p.longitude for p in offset.positions] == [p.longitude for p in utc.positions]
@@ -0,0 +1,29 @@
+import chart_calculator
+from chart_model import Chart
+from constants import NAKSHATRAS, PLANETS, RASHIS, get_nakshatra_index, get_rashi_index
+
+
+def test_codes_index_the_name_tables():
+    assert get_rashi_index(0.0) == 0
+    assert get_rashi_index(359.99) == 11
+    assert RASHIS[get_rashi_index(200.0)] == 'Libra'
+    nakshatra, pada = get_nakshatra_index(200.0)
+    assert (NAKSHATRAS[nakshatra]['name'], pada) == ('Vishakha', 1)
+
+
+def test_chart_round_trips_through_json_shape(charts_dir, birth_data):
+    created = chart_calculator.calculate_chart(birth_data)
+    chart = chart_calculator.chart_cache.get(created['chart_id'])
+    assert isinstance(chart, Chart)
+    assert not hasattr(chart, '__dict__')
+    assert [PLANETS[p.planet] for p in chart.positions] == PLANETS
+
+    moon = chart.positions[PLANETS.index('Moon')]
+    assert RASHIS[moon.rashi] == created['planets']['Moon']['rashi']
+    assert NAKSHATRAS[moon.nakshatra]['name'] == created['planets']['Moon']['nakshatra']
+    assert Chart.from_dict(created).to_dict() == created
+
+    # Loaded back from the store after the memory cache is dropped
+    chart_calculator.chart_cache.clear()
+    assert chart_calculator.read_chart(created['chart_id']) == created
+    assert isinstance(chart_calculator.chart_cache.get(created['chart_id']), Chart)
@@ -0,0 +1,41 @@
+import chart_calculator
+import dasha_calculator
+from chart_store import JsonDirChartStore, SqliteChartStore, migrate_json_dir
+
+
+def _chart(chart_id, name='Amma', julian_day=2434647.65):
+    return {'chart_id': chart_id, 'name': name, 'datetime': '1953-09-27T03:40:00Z',
+            'julian_day': julian_day, 'planets': {}}
+
+
+def test_sqlite_store_round_trip_and_upsert(tmp_path):
+    store = SqliteChartStore(str(tmp_path / 'charts.db'))
+    store.put_many([_chart('a'), _chart('b', name='Other')])
+    store.put(_chart('a', name='Renamed'))
+
+    assert store.get('a')['name'] == 'Renamed'
+    assert store.get('missing') is None
+    assert store.count() == 2
+    assert [c['chart_id'] for c in store.list_page(10)[0]] == ['a', 'b']
+    assert store.connection.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+
+
+def test_migrate_json_dir_streams_in_batches(tmp_path):
+    source = JsonDirChartStore(str(tmp_path / 'json'))
+    source.put_many([_chart(str(i)) for i in range(7)])
+    target = SqliteChartStore(str(tmp_path / 'charts.db'))
+
+    assert migrate_json_dir(source.directory, target, batch_size=3) == 7
+    assert migrate_json_dir(source.directory, target, batch_size=3) == 7
+    assert target.count() == 7
+    assert target.get('4') == source.get('4')
+
+
+def test_calculators_read_charts_from_store(charts_dir, birth_data):
+    chart = chart_calculator.calculate_chart(birth_data)
+    chart_calculator.chart_cache.clear()
+
+    assert chart_calculator.read_chart(chart['chart_id']) == chart
+    assert chart_calculator.list_charts()['charts'] == [
+        {'chart_id': chart['chart_id'], 'name': 'Amma', 'datetime': birth_data['datetime']}]
+    assert dasha_calculator.get_current_dasha('missing') == {'error': 'Chart missing not found'}
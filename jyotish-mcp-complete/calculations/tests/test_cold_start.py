@@ -0,0 +1,58 @@
+import json
+import os
+import subprocess
+import sys
+
+CALCULATIONS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+CALCULATORS = ['chart_calculator', 'dasha_calculator', 'transit_calculator',
+               'varga_calculator', 'yoga_identifier', 'compatibility_calculator']
+
+# Summed self time of this directory's modules when importing every
+# calculator, with bytecode cached (measured at ~15 ms)
+IMPORT_BUDGET_MS = 60
+
+
+def _python(code, *flags, env=None):
+    proc = subprocess.run([sys.executable, *flags, '-c', code], capture_output=True,
+                          text=True, cwd=CALCULATIONS_DIR, env=env, timeout=120)
+    assert proc.returncode == 0, proc.stderr
+    return proc
+
+
+def test_imports_have_no_side_effects():
+    # Record Swiss Ephemeris setup and directory creation during the imports
+    code = f'''
+import json, os, swisseph
+calls = []
+for name in ('set_ephe_path', 'set_sid_mode'):
+    setattr(swisseph, name, lambda *a, name=name: calls.append(name))
+os.makedirs = lambda *a, **k: calls.append('makedirs')
+import {', '.join(CALCULATORS)}
+print(json.dumps(calls))
+'''
+    assert json.loads(_python(code).stdout) == []
+
+
+def test_worker_starts_without_loading_calculators():
+    code = '''
+import sys, engine_worker
+print(sorted(m for m in ('numpy', 'swisseph', 'chart_calculator') if m in sys.modules))
+'''
+    assert _python(code).stdout.strip() == '[]'
+
+
+def test_import_time_budget(tmp_path):
+    env = {**os.environ, 'PYTHONPYCACHEPREFIX': str(tmp_path)}
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    code = f'import {", ".join(CALCULATORS)}'
+    _python(code, env=env)  # compile once, so only import work is measured
+    report = _python(code, '-X', 'importtime', env=env).stderr
+
+    own = {name[:-3] for name in os.listdir(CALCULATIONS_DIR) if name.endswith('.py')}
+    total_us = 0
+    for line in report.splitlines():
+        fields = [field.strip() for field in line.split(':', 1)[-1].split('|')]
+        if len(fields) == 3 and fields[2] in own:
+            total_us += int(fields[0])
+    assert 0 < total_us / 1000 < IMPORT_BUDGET_MS
@@ -0,0 +1,109 @@
+import numpy as np
+
+import compatibility_calculator as compat
+from chart_store import get_store
+from constants import PLANETS
+
+
+def _chart(chart_id, ascendant, **longitudes):
+    planets = {name: {'longitude': longitudes.get(name, 185.0)} for name in PLANETS}
+    return {'chart_id': chart_id, 'name': chart_id, 'datetime': '2000-01-01T00:00:00Z',
+            'julian_day': 2451544.5, 'ascendant': {'longitude': ascendant}, 'planets': planets}
+
+
+def test_tables_cover_every_pada_pair():
+    assert compat.KOOTA_TABLES.shape == (8, 108, 108)
+    maxima = np.array(list(compat.KOOTA_MAX_POINTS.values()))
+    assert (compat.KOOTA_TABLES.max(axis=(1, 2)) <= maxima).all()
+    assert compat.TOTAL_POINTS.max() <= 36
+    # Tara, Yoni, Maitri, Bhakoot and Nadi do not depend on who is the groom
+    for koota in ('Tara', 'Yoni', 'Graha Maitri', 'Bhakoot', 'Nadi'):
+        table = compat.KOOTA_TABLES[compat.KOOTAS.index(koota)]
+        assert (table == table.T).all()
+
+
+def test_known_pair_scores():
+    # Same pada: everything agrees but the Nadi
+    same = compat.score_pair(0, 0)
+    assert same['total'] == 28
+    assert same['doshas'] == {'nadi': True, 'bhakoot': False}
+
+    # Ashwini (Aries) groom, Chitra pada 1 (Virgo) bride
+    pair = compat.score_pair(0, 52)
+    points = {k: v['points'] for k, v in pair['kootas'].items()}
+    assert points == {'Varna': 1, 'Vashya': 1, 'Tara': 1.5, 'Yoni': 1, 'Graha Maitri': 0.5,
+                      'Gana': 1, 'Bhakoot': 0, 'Nadi': 8}
+    assert pair['total'] == 14
+    assert pair['doshas']['bhakoot']
+
+
+def test_analyze_saved_charts(charts_dir):
+    # Mars in the 7th from an Aries lagna; Mars 6th from Cancer lagna and 3rd from the Moon
+    get_store(charts_dir).put_many([
+        _chart('groom', 10.0, Moon=5.0, Mars=190.0),
+        _chart('bride', 100.0, Moon=182.0, Mars=245.0)])
+
+    result = compat.handle_request({'chart_id_1': 'groom', 'chart_id_2': 'bride'})
+    assert result['moon']['groom']['nakshatra'] == 'Ashwini'
+    assert result['moon']['bride'] == {'rashi': 'Libra', 'nakshatra': 'Chitra',
+                                       'nakshatra_pada': 3}
+    assert result['total'] == compat.TOTAL_POINTS[0, 54]
+    assert result['manglik']['groom']['manglik']
+    assert not result['manglik']['bride']['manglik']
+    assert result['manglik']['dosha']
+
+    bare = compat.analyze_compatibility('groom', 'bride', manglik=False)
+    assert 'manglik' not in bare
+    assert 'error' in compat.analyze_compatibility('groom', 'missing')
+
+
+def test_find_matches_ranks_and_filters(charts_dir):
+    rng = np.random.default_rng(3)
+    charts = [_chart(f'c{i:03d}', float(asc), Moon=float(moon), Mars=float(mars))
+              for i, (asc, moon, mars) in enumerate(rng.uniform(0, 360, (300, 3)))]
+    query = _chart('query', 10.0, Moon=5.0, Mars=190.0)
+    get_store(charts_dir).put_many(charts + [query])
+
+    def expected(exclude_nadi=False, min_score=0):
+        rows = []
+        for chart in charts:
+            pair = compat.score_pair(compat.moon_pada(query), compat.moon_pada(chart))
+            if pair['total'] >= min_score and not (exclude_nadi and pair['doshas']['nadi']):
+                rows.append((pair['total'], chart['chart_id']))
+        return rows
+
+    result = compat.find_matches('query', top_k=10, batch_size=64)
+    assert result['charts_scanned'] == 300
+    assert result['charts_matched'] == 300
+    totals = [m['total'] for m in result['matches']]
+    assert totals == sorted((t for t, _ in expected()), reverse=True)[:10]
+    assert 'query' not in {m['chart_id'] for m in result['matches']}
+
+    filtered = compat.handle_request({'action': 'matches', 'chart_id': 'query', 'top_k': 5,
+                                      'min_score': 20, 'exclude_nadi': True})
+    assert filtered['charts_matched'] == len(expected(exclude_nadi=True, min_score=20))
+    assert all(m['total'] >= 20 and not m['doshas']['nadi'] for m in filtered['matches'])
+
+    # As the bride, the query is scored in the table's columns
+    as_bride = compat.find_matches('query', role='bride', top_k=3)
+    top = as_bride['matches'][0]
+    pada = compat.moon_pada(get_store(charts_dir).get(top['chart_id']))
+    assert top['total'] == compat.TOTAL_POINTS[pada, compat.moon_pada(query)]
+
+    manglik = compat.find_matches('query', top_k=300, exclude_manglik=True)
+    for match in manglik['matches']:
+        assert any(compat.manglik_flags(get_store(charts_dir).get(match['chart_id'])).values())
+
+    assert 'error' in compat.find_matches('query', role='partner')
+
+
+def test_find_matches_keeps_earlier_stored_chart_on_ties(charts_dir):
+    store = get_store(charts_dir)
+    store.put(_chart('query', 10.0, Moon=5.0, Mars=190.0))
+    # Same placements, so the same score: stored order decides, not the ID
+    for chart_id in ('z-old', 'm-mid', 'a-new'):
+        store.put(_chart(chart_id, 100.0, Moon=200.0))
+
+    result = compat.find_matches('query', top_k=2, batch_size=2)
+    assert [m['chart_id'] for m in result['matches']] == ['z-old', 'm-mid']
+    assert result['charts_scanned'] == 3
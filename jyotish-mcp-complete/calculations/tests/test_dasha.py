@@ -0,0 +1,143 @@
+import dasha_calculator
+import chart_calculator
+
+
+def test_current_dasha_for_known_chart(charts_dir, birth_data):
+    chart = chart_calculator.calculate_chart(birth_data)
+
+    result = dasha_calculator.get_current_dasha(chart['chart_id'], '2000-01-01T00:00:00Z')
+
+    # Moon in Krittika: the timeline starts in the Sun's Maha Dasha
+    assert result['birth_balance']['planet'] == 'Sun'
+    assert result['maha_dasha']['planet'] == 'Jupiter'
+    assert result['antar_dasha']['planet'] == 'Venus'
+
+
+def test_timeline_is_built_once_per_chart(charts_dir, birth_data, monkeypatch):
+    chart = chart_calculator.calculate_chart(birth_data)
+    dasha_calculator.get_current_dasha(chart['chart_id'], '1990-01-01')
+
+    def fail(*args):
+        raise AssertionError('timeline was rebuilt')
+
+    monkeypatch.setattr(dasha_calculator, 'build_timelines', fail)
+    result = dasha_calculator.get_current_dasha(chart['chart_id'], '2010-06-01')
+    assert result['maha_dasha']['planet'] == 'Saturn'
+
+
+def test_path_at_uses_half_open_periods(charts_dir, birth_data):
+    chart = chart_calculator.calculate_chart(birth_data)
+    timeline = dasha_calculator.get_timeline(chart)
+
+    second_start = timeline.maha_bounds[1]
+    assert timeline.path_at(second_start, 1)[0].lord == 'Moon'
+    assert timeline.path_at(second_start - 1e-6, 1)[0].lord == 'Sun'
+    assert timeline.path_at(timeline.maha_bounds[0] - 1) == []
+    assert timeline.path_at(timeline.maha_bounds[-1]) == []
+
+
+def test_current_dasha_down_to_prana(charts_dir, birth_data):
+    chart = chart_calculator.calculate_chart(birth_data)
+
+    default = dasha_calculator.get_current_dasha(chart['chart_id'], '2000-01-01T00:00:00Z')
+    assert default['pratyantar_dasha']['planet'] == 'Jupiter'
+    assert 'sookshma_dasha' not in default
+
+    deep = dasha_calculator.get_current_dasha(chart['chart_id'], '2000-01-01T00:00:00Z', depth=5)
+    levels = [deep[key] for key in dasha_calculator.DASHA_LEVELS[2:]]
+    assert [level['planet'] for level in levels] == ['Jupiter', 'Sun', 'Moon']
+    for outer, inner in zip(levels, levels[1:]):
+        assert outer['start_date'] <= inner['start_date'] < inner['end_date'] <= outer['end_date']
+
+
+def test_sub_periods_split_parent_in_vimshottari_proportions(charts_dir, birth_data):
+    chart = chart_calculator.calculate_chart(birth_data)
+    antar = dasha_calculator.get_timeline(chart).path_at(2451545.0, 2)[-1]
+
+    pratyantars = list(antar.sub_periods())
+    assert [p.lord for p in pratyantars][:2] == [antar.lord, 'Sun']
+    assert pratyantars[0].start_jd == antar.start_jd
+    assert abs(pratyantars[-1].end_jd - antar.end_jd) < 1e-9
+    span = antar.end_jd - antar.start_jd
+    assert abs((pratyantars[1].end_jd - pratyantars[1].start_jd) - span * 6 / 120) < 1e-9
+
+
+def test_periods_stream_only_the_requested_window(charts_dir, birth_data, monkeypatch):
+    chart = chart_calculator.calculate_chart(birth_data)
+    expanded = []
+    original = dasha_calculator.DashaPeriod.sub_periods
+
+    def counting(self):
+        expanded.append(self.path)
+        return original(self)
+
+    monkeypatch.setattr(dasha_calculator.DashaPeriod, 'sub_periods', counting)
+    result = dasha_calculator.get_dasha_periods(
+        chart['chart_id'], '2000-01-01', '2000-01-08', depth=5)
+
+    periods = result['periods']
+    assert periods and not result['truncated']
+    assert all(len(p['path']) == 5 for p in periods)
+    assert [p['start_date'] for p in periods] == sorted(p['start_date'] for p in periods)
+    # Two levels above Prana are touched per overlapping branch, not the whole tree
+    assert len(expanded) < 20
+
+    capped = dasha_calculator.handle_request({
+        'action': 'periods', 'chart_id': chart['chart_id'],
+        'start_date': '1960-01-01', 'end_date': '2000-01-01', 'depth': 3, 'limit': 10})
+    assert len(capped['periods']) == 10 and capped['truncated']
+
+
+def test_timeline_matches_single_date_queries(charts_dir, birth_data):
+    chart = chart_calculator.calculate_chart(birth_data)
+    dates = ['2010-06-01', '1960-01-01', '1900-01-01', '2000-01-01T00:00:00Z', '1960-01-01']
+
+    result = dasha_calculator.handle_request(
+        {'action': 'timeline', 'chart_id': chart['chart_id'], 'dates': dates})
+
+    rows = result['timeline']
+    assert [row['date'] for row in rows] == dates
+    assert rows[2]['maha_dasha'] is None
+    for row in rows[:2] + rows[3:]:
+        single = dasha_calculator.get_current_dasha(chart['chart_id'], row['date'])
+        assert row['maha_dasha'] == single['maha_dasha']['planet']
+        assert row['antar_dasha'] == single['antar_dasha']['planet']
+        assert row['pratyantar_dasha'] == single['pratyantar_dasha']['planet']
+
+
+def test_timeline_over_a_monthly_range(charts_dir, birth_data):
+    chart = chart_calculator.calculate_chart(birth_data)
+
+    result = dasha_calculator.get_dasha_timeline(
+        chart['chart_id'], start_date='1960-01-31', end_date='1999-12-31', step='month', depth=2)
+
+    rows = result['timeline']
+    assert len(rows) == 40 * 12
+    assert rows[1]['date'].startswith('1960-02-29')
+    assert set(rows[0]) == {'date', 'maha_dasha', 'antar_dasha'}
+
+
+def test_boundaries_are_exact_in_julian_days(charts_dir, birth_data):
+    chart = chart_calculator.calculate_chart(birth_data)
+    timeline = dasha_calculator.get_timeline(chart)
+
+    moon_maha = timeline.mahas[1]
+    assert moon_maha.end_jd - moon_maha.start_jd == 10 * 365.25
+    for maha in timeline.mahas:
+        assert maha.sub_bounds()[0] == maha.start_jd
+        assert maha.sub_bounds()[-1] == maha.end_jd
+
+    savana = dasha_calculator.get_timeline(chart, 360)
+    assert savana.mahas[1].end_jd - savana.mahas[1].start_jd == 3600
+    assert savana.maha_bounds[0] == timeline.maha_bounds[0]
+
+
+def test_timelines_vectorize_across_charts():
+    births = [(2434647.65, 35.99), (2451545.0, 200.5), (2460000.5, 359.9)]
+
+    together = dasha_calculator.build_timelines(births)
+    for birth, timeline in zip(births, together):
+        alone = dasha_calculator.build_timelines([birth])[0]
+        assert timeline.maha_bounds == alone.maha_bounds
+        assert timeline.birth_balance == alone.birth_balance
+        assert timeline.maha_bounds[0] == birth[0]
@@ -0,0 +1,115 @@
+import io
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime
+
+import numpy as np
+
+import engine_worker
+
+
+CALCULATIONS_DIR = os.path.join(os.path.dirname(__file__), '..')
+
+
+def _serve(*requests):
+    """Run the worker loop over the given request lines and decode the replies."""
+    stdin = io.StringIO(''.join(json.dumps(r) + '\n' for r in requests))
+    stdout = io.StringIO()
+    engine_worker.serve(stdin, stdout)
+    return [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+
+def test_ping_reports_pid_memory_and_load():
+    before, = _serve({'id': 7, 'op': 'ping'})
+    _serve({'id': 8, 'script': 'nope'})
+    after, = _serve({'id': 9, 'op': 'ping'})
+
+    assert before['id'] == 7
+    assert before['result']['pid'] == os.getpid()
+    assert before['result']['memory_mb'] > 0
+    assert after['result']['requests_served'] == before['result']['requests_served'] + 1
+
+
+def test_create_then_read_in_one_process(charts_dir, birth_data):
+    created, = _serve({'id': 1, 'script': 'chart_calculator',
+                       'args': {'action': 'create', **birth_data}})
+    chart_id = created['result']['chart_id']
+
+    read, listed = _serve(
+        {'id': 2, 'script': 'chart_calculator', 'args': {'action': 'read', 'chart_id': chart_id}},
+        {'id': 3, 'script': 'chart_calculator', 'args': {'action': 'list'}},
+    )
+    assert read['id'] == 2
+    assert read['result']['planets'] == created['result']['planets']
+    assert [c['chart_id'] for c in listed['result']['charts']] == [chart_id]
+
+
+def test_unknown_script_and_bad_line_do_not_stop_the_loop():
+    stdin = io.StringIO('not json\n{"id": 5, "script": "nope"}\n{"id": 6, "op": "ping"}\n')
+    stdout = io.StringIO()
+    engine_worker.serve(stdin, stdout)
+    replies = [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+    assert replies[0]['id'] is None and 'error' in replies[0]
+    assert replies[1] == {'id': 5, 'error': 'Unknown script: nope'}
+    assert replies[2]['id'] == 6
+
+
+def test_handler_exception_is_reported_with_request_id():
+    # chart_id is required by the read action
+    (reply,) = _serve({'id': 9, 'script': 'chart_calculator', 'args': {'action': 'read'}})
+    assert reply['id'] == 9
+    assert 'traceback' in reply
+
+
+def test_unencodable_replies_and_non_object_lines_do_not_stop_the_loop(monkeypatch):
+    def handler(args):
+        return {'value': np.float32(1.5)}
+
+    def stream_handler(args):
+        yield 1
+        yield datetime(2000, 1, 1)
+        yield 3
+
+    monkeypatch.setattr(engine_worker, 'get_handler',
+                        lambda script, handlers=None: stream_handler if handlers else handler)
+    replies = _serve([1], {'id': 1, 'script': 'x'}, {'id': 2, 'script': 'x', 'stream': True},
+                     {'id': 3, 'op': 'ping'})
+
+    assert replies[0] == {'id': None, 'error': 'Invalid request: not a JSON object'}
+    assert replies[1]['id'] == 1 and 'Unserializable' in replies[1]['error']
+    # The stream ends at its error line
+    assert replies[2] == {'id': 2, 'item': 1}
+    assert replies[3]['id'] == 2 and 'Unserializable' in replies[3]['error']
+    assert replies[4]['id'] == 3 and 'pid' in replies[4]['result']
+
+
+def test_worker_process_speaks_ndjson():
+    proc = subprocess.run(
+        [sys.executable, 'engine_worker.py'],
+        input='{"id": 1, "op": "ping"}\n{"id": 2, "op": "ping"}\n',
+        capture_output=True, text=True, cwd=CALCULATIONS_DIR, timeout=60,
+    )
+    replies = [json.loads(line) for line in proc.stdout.splitlines()]
+    assert proc.returncode == 0
+    assert [r['id'] for r in replies] == [1, 2]
+
+
+def test_stream_request_sends_items_then_count(charts_dir, birth_data):
+    created, = _serve({'id': 1, 'script': 'chart_calculator',
+                       'args': {'action': 'create', **birth_data}})
+    args = {'action': 'range', 'chart_id': created['result']['chart_id'],
+            'start_date': '2024-01-01T00:00:00Z', 'end_date': '2024-01-03T00:00:00Z'}
+
+    replies = _serve(
+        {'id': 2, 'stream': True, 'script': 'transit_calculator', 'args': args},
+        {'id': 3, 'stream': True, 'script': 'chart_calculator', 'args': {}},
+        {'id': 4, 'op': 'ping'},
+    )
+    assert [r['id'] for r in replies] == [2, 2, 2, 2, 3, 4]
+    assert [r['item']['date'] for r in replies[:3]] == [
+        '2024-01-01T00:00:00+00:00', '2024-01-02T00:00:00+00:00', '2024-01-03T00:00:00+00:00']
+    assert replies[3]['result'] == {'items': 3}
+    assert 'error' in replies[4]
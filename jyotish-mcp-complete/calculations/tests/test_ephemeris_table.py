@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+import ephemeris
+import ephemeris_table
+from constants import PLANETS
+
+
+@pytest.fixture(scope="module")
+def table(tmp_path_factory):
+    path = tmp_path_factory.mktemp('ephe') / 'table.bin'
+    # 2024-01-01 .. 2024-04-01, daily samples
+    return ephemeris_table.build_table(str(path), 2460310.5, 2460401.5, step=1.0)
+
+
+def test_header_round_trip(table):
+    assert table.planets == ephemeris_table.TABLE_PLANETS
+    assert table.n_samples == 92
+    assert table.end_jd == pytest.approx(2460401.5)
+    # Daily Hermite interpolation stays well under an arcsecond
+    assert 0 < table.max_error < 1 / 3600
+
+
+def test_interpolation_within_recorded_bound(table):
+    jds = np.linspace(table.start_jd, table.end_jd, 301, endpoint=False)
+    expected = ephemeris.planet_positions(jds)
+    actual = table.positions(jds)
+
+    error = np.abs((actual['longitude'] - expected['longitude'] + 180) % 360 - 180)
+    assert error.max() <= table.max_error * 1.5
+    np.testing.assert_allclose(actual['speed'], expected['speed'], atol=1e-3)
+    assert actual.shape == (301, len(PLANETS))
+
+
+def test_outside_range_falls_back_to_swiss_ephemeris(table):
+    jds = [table.start_jd - 100.25, table.end_jd + 3.5]
+    np.testing.assert_array_equal(table.positions(jds), ephemeris.planet_positions(jds))
+
+
+def test_planet_subset_and_ketu(table):
+    jd = table.start_jd + 10.4
+    rows = table.positions(jd, planets=['Ketu', 'Rahu'])[0]
+    assert rows['longitude'][0] == pytest.approx((rows['longitude'][1] + 180) % 360)
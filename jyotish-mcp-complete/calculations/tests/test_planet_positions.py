@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+import swisseph as swe
+
+import ephemeris
+from constants import PLANETS, SWISSEPH_PLANETS
+
+
+JDS = np.linspace(2415020.5, 2488069.5, 25)  # 1900-2100
+
+
+def test_shape_and_column_order():
+    result = ephemeris.planet_positions(JDS, planets=['Moon', 'Ketu', 'Sun'])
+    assert result.shape == (len(JDS), 3)
+    assert result.dtype == ephemeris.POSITION_DTYPE
+
+    default = ephemeris.planet_positions(JDS[0])
+    assert default.shape == (1, len(PLANETS))
+
+
+@pytest.mark.parametrize("planet", [p for p in PLANETS if p != 'Ketu'])
+def test_matches_sidereal_calc_ut(planet):
+    result = ephemeris.planet_positions(JDS, planets=[planet])[:, 0]
+    for jd, row in zip(JDS, result):
+        expected = swe.calc_ut(jd, SWISSEPH_PLANETS[planet], swe.FLG_SIDEREAL | swe.FLG_SPEED)[0]
+        assert row['longitude'] == pytest.approx(expected[0], abs=1e-7)
+        assert row['latitude'] == pytest.approx(expected[1], abs=1e-7)
+        assert row['speed'] == pytest.approx(expected[3], abs=1e-4)
+
+
+def test_ketu_mirrors_rahu():
+    result = ephemeris.planet_positions(JDS, planets=['Rahu', 'Ketu'])
+    rahu, ketu = result[:, 0], result[:, 1]
+    np.testing.assert_allclose((rahu['longitude'] + 180) % 360, ketu['longitude'])
+    np.testing.assert_allclose(ketu['speed'], rahu['speed'])
+
+
+def test_unknown_planet_raises():
+    with pytest.raises(ValueError):
+        ephemeris.planet_positions(JDS, planets=['Pluto'])
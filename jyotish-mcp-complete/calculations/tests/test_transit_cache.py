@@ -0,0 +1,78 @@
+import importlib
+
+import pytest
+
+import chart_calculator
+import transit_calculator
+
+
+@pytest.fixture
+def ephemeris_calls(monkeypatch):
+    transit_calculator.snapshot_cache.clear()
+    calls = []
+    original = transit_calculator.sidereal_positions
+    monkeypatch.setattr(transit_calculator, 'sidereal_positions',
+                        lambda jd, *args: calls.append(jd) or original(jd, *args))
+    return calls
+
+
+def test_charts_at_one_instant_share_a_snapshot(charts_dir, birth_data, ephemeris_calls):
+    ids = [chart_calculator.calculate_chart({**birth_data, 'latitude': lat})['chart_id']
+           for lat in (-30.0, 9.1, 51.5)]
+
+    results = [transit_calculator.calculate_transits(chart_id, '2024-03-01T12:00:10Z')
+               for chart_id in ids]
+    assert len(ephemeris_calls) == 1
+    assert {r['transit_date'] for r in results} == {'2024-03-01T12:00:00+00:00'}
+
+    # Shared positions, per-chart houses layered on top
+    assert len({r['transits']['Saturn']['longitude'] for r in results}) == 1
+    assert len({r['transits']['Saturn']['house'] for r in results}) > 1
+    jd = transit_calculator._julian_day(transit_calculator._parse_datetime('2024-03-01T12:00:00Z'))
+    assert 'house' not in transit_calculator.transit_snapshot(jd)[1]['Sun']
+    assert len(ephemeris_calls) == 1
+
+
+def test_instants_are_quantized(charts_dir, birth_data, ephemeris_calls, monkeypatch):
+    chart_id = chart_calculator.calculate_chart(birth_data)['chart_id']
+    transit_calculator.calculate_transits(chart_id, '2024-03-01T12:00:20Z')
+    transit_calculator.calculate_transits(chart_id, '2024-03-01T11:59:45Z')
+    transit_calculator.calculate_transits(chart_id, '2024-03-01T12:01:00Z')
+    assert len(ephemeris_calls) == 2
+
+    monkeypatch.setattr(transit_calculator, 'TRANSIT_QUANTUM_SECONDS', 0)
+    exact = transit_calculator.calculate_transits(chart_id, '2024-03-01T12:00:20Z')
+    assert exact['transit_date'] == '2024-03-01T12:00:20+00:00'
+    assert len(ephemeris_calls) == 3
+
+
+def test_offsets_are_honoured(charts_dir, birth_data):
+    chart_id = chart_calculator.calculate_chart(birth_data)['chart_id']
+    local = transit_calculator.calculate_transits(chart_id, '2024-03-01T17:30:00+05:30')
+    utc = transit_calculator.calculate_transits(chart_id, '2024-03-01T12:00:00Z')
+    assert local == utc
+
+
+@pytest.fixture
+def reload_with_quantum(monkeypatch):
+    """Re-import transit_calculator with JYOTISH_TRANSIT_QUANTUM_SECONDS set"""
+    def reload(value):
+        monkeypatch.setenv('JYOTISH_TRANSIT_QUANTUM_SECONDS', value)
+        return importlib.reload(transit_calculator)
+
+    yield reload
+    monkeypatch.delenv('JYOTISH_TRANSIT_QUANTUM_SECONDS')
+    importlib.reload(transit_calculator)
+
+
+def test_quantum_is_read_from_the_environment(reload_with_quantum):
+    module = reload_with_quantum('30')
+    assert module.TRANSIT_QUANTUM_SECONDS == 30
+    noon = 2460371.0
+    module.transit_snapshot(noon + 10 / 86400)
+    module.transit_snapshot(noon - 10 / 86400)
+    assert len(module.snapshot_cache) == 1
+    assert round(noon / (30 / 86400)) in module.snapshot_cache
+
+    assert reload_with_quantum('0').TRANSIT_QUANTUM_SECONDS == 0
+    assert reload_with_quantum('soon').TRANSIT_QUANTUM_SECONDS == 60
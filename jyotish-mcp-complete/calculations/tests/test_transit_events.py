@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+import ephemeris
+import transit_calculator
+import transit_events
+
+
+def test_retrograde_back_and_forth_crossings():
+    # Saturn entered Aquarius in 2022, slipped back in retrograde and
+    # re-entered in January 2023
+    result = transit_calculator.find_transit_events('Saturn', '2022-01-01', '2023-06-01')
+    events = [(e['from'], e['to'], e['direction']) for e in result['events']]
+    assert events == [
+        ('Capricorn', 'Aquarius', 'direct'),
+        ('Aquarius', 'Capricorn', 'retrograde'),
+        ('Capricorn', 'Aquarius', 'direct'),
+    ]
+    assert {e['longitude'] for e in result['events']} == {300.0}
+    assert result['truncated'] is False
+
+
+def test_crossings_match_dense_sampling():
+    start, end = 2460310.5, 2460320.5
+    crossings = list(transit_events.iter_crossings('Moon', start, end, 'pada'))
+
+    jds = np.arange(start, end, 0.001)
+    longitudes = ephemeris.planet_positions(jds, ['Moon'])['longitude'][:, 0]
+    segments = np.floor(longitudes / (360 / 108)).astype(int)
+    assert len(crossings) == np.count_nonzero(np.diff(segments))
+
+    for jd, boundary, before, after, direct in crossings:
+        around = ephemeris.planet_positions([jd - 1e-4, jd + 1e-4], ['Moon'])['longitude'][:, 0]
+        assert np.floor(around / (360 / 108)).astype(int).tolist() == [before, after]
+        assert boundary == pytest.approx(after * 360 / 108)
+        assert direct
+
+
+def test_events_action_labels_and_limit():
+    result = transit_calculator.handle_request({
+        'action': 'events', 'planet': 'Moon', 'boundary': 'nakshatra',
+        'start_date': '2024-01-01T00:00:00Z', 'end_date': '2024-03-01T00:00:00Z',
+        'limit': 3
+    })
+    assert len(result['events']) == 3
+    assert result['truncated'] is True
+    assert result['events'][0]['from'] == 'Magha'
+    assert result['events'][0]['to'] == 'Purva Phalguni'
+
+    assert transit_events.segment_label('pada', 5) == 'Bharani 2'
+    assert transit_events.segment_label('navamsa', 13) == 'Taurus'
+    assert 'error' in transit_calculator.find_transit_events('Moon', '2024-01-01', '2024-02-01', 'drekkana')
+    assert 'error' in transit_calculator.find_transit_events('Pluto', '2024-01-01', '2024-02-01')
@@ -0,0 +1,88 @@
+import pytest
+
+import chart_calculator
+import transit_calculator
+from chart_store import JsonDirChartStore, SqliteChartStore, natal_positions
+
+
+def _chart(chart_id, moon, ascendant=0.0):
+    return {'chart_id': chart_id, 'name': chart_id, 'datetime': '1990-01-01T00:00:00Z',
+            'julian_day': 2447892.5, 'ascendant': {'longitude': ascendant},
+            'planets': {'Moon': {'longitude': moon}, 'Saturn': {'longitude': 5.0}}}
+
+
+@pytest.fixture(params=['sqlite', 'json'])
+def store(request, tmp_path):
+    if request.param == 'sqlite':
+        store = SqliteChartStore(str(tmp_path / 'charts.db'))
+    else:
+        store = JsonDirChartStore(str(tmp_path / 'json'))
+    # Moon in Aries, Taurus, ... one chart per sign, plus a second Gemini Moon
+    store.put_many([_chart(f'c{sign:02d}', sign * 30 + 15) for sign in range(12)])
+    store.put(_chart('c99', 75.0))
+    return store
+
+
+def test_natal_positions_cover_grahas_and_ascendant():
+    rows = natal_positions(_chart('a', moon=200.0, ascendant=359.9))
+    assert ('Moon', 6, 15, 60) in rows
+    assert ('Ascendant', 11, 26, 107) in rows
+
+
+def test_find_by_position_pages_in_id_order(store):
+    assert store.find_by_position('Moon', 'sign', [1, 2, 3], 10) == ['c01', 'c02', 'c03', 'c99']
+    assert store.find_by_position('Moon', 'sign', [1, 2, 3], 2, after='c02') == ['c03', 'c99']
+    assert store.find_by_position('Ascendant', 'nakshatra', [0], 3) == ['c00', 'c01', 'c02']
+    assert store.find_by_position('Mars', 'sign', [0], 10) == []
+    with pytest.raises(ValueError):
+        store.find_by_position('Moon', 'house', [0], 10)
+
+
+def test_iter_placements_reads_columns_oldest_first(store):
+    batches = list(store.iter_placements([('Moon', 'sign'), ('Saturn', 'nakshatra')], 5))
+    assert [len(batch) for batch in batches] == [5, 5, 3]
+    rows = [row for batch in batches for row in batch]
+    assert [row[0] for row in rows] == [f'c{sign:02d}' for sign in range(12)] + ['c99']
+    assert rows[-1] == ('c99', 2, 0)
+    # Charts without the point are skipped
+    assert list(store.iter_placements([('Mars', 'sign')])) == []
+
+
+def test_reverse_index_follows_updates_and_rebuilds(tmp_path):
+    store = SqliteChartStore(str(tmp_path / 'charts.db'))
+    store.put(_chart('a', moon=10.0))
+    store.put(_chart('a', moon=40.0))
+    assert store.find_by_position('Moon', 'sign', [0], 10) == []
+    assert store.find_by_position('Moon', 'sign', [1], 10) == ['a']
+
+    # A database from before the index is filled in when opened
+    with store.connection:
+        store.connection.execute('DELETE FROM chart_positions')
+    store.connection.execute('PRAGMA user_version = 0')
+    reopened = SqliteChartStore(str(tmp_path / 'charts.db'))
+    assert reopened.find_by_position('Moon', 'sign', [1], 10) == ['a']
+
+
+def test_sade_sati_matches_per_chart_transits(charts_dir, birth_data):
+    ids = [chart_calculator.calculate_chart({**birth_data, 'datetime': f'19{y}-0{m}-15T06:00:00Z'})['chart_id']
+           for y in (50, 60, 70, 80) for m in (1, 4, 7)]
+    date = '2024-06-01T00:00:00Z'
+
+    result = transit_calculator.handle_request(
+        {'action': 'charts', 'pattern': 'sade_sati', 'date': date, 'limit': 5})
+    found, cursor = list(result['chart_ids']), result['next_cursor']
+    while cursor:
+        page = transit_calculator.find_charts_under_transit(
+            'Saturn', 'Moon', date, offsets=(-1, 0, 1), limit=5, cursor=cursor)
+        found += page['chart_ids']
+        cursor = page['next_cursor']
+
+    expected = []
+    for chart_id in ids:
+        transits = transit_calculator.calculate_transits(chart_id, date)
+        saturn = int(transits['transits']['Saturn']['longitude'] // 30)
+        moon = int(chart_calculator.read_chart(chart_id)['planets']['Moon']['longitude'] // 30)
+        if (saturn - moon) % 12 in (11, 0, 1):
+            expected.append(chart_id)
+    assert found == sorted(expected)
+    assert result['natal_sign'] == sorted({(result['transit']['sign'] + d) % 12 for d in (-1, 0, 1)})
@@ -0,0 +1,60 @@
+import pytest
+
+import chart_calculator
+import transit_calculator
+
+
+@pytest.fixture
+def chart_id(charts_dir, birth_data):
+    return chart_calculator.calculate_chart(birth_data)['chart_id']
+
+
+def test_range_snapshots_match_single_date_transits(chart_id, monkeypatch):
+    monkeypatch.setattr(transit_calculator, 'SNAPSHOT_CHUNK', 4)
+    snapshots = list(transit_calculator.transit_range(
+        chart_id, '2024-01-01T00:00:00Z', '2024-01-11T00:00:00Z', 'day'))
+    assert len(snapshots) == 11
+
+    single = transit_calculator.calculate_transits(chart_id, '2024-01-06T00:00:00Z')
+    for name, position in snapshots[5]['transits'].items():
+        expected = single['transits'][name]
+        assert position['longitude'] == pytest.approx(expected['longitude'])
+        assert position['house'] == expected['house']
+        assert position['nakshatra'] == expected['nakshatra']
+
+
+def test_range_is_lazy_and_loads_the_chart_once(chart_id, monkeypatch):
+    loads = []
+    store = transit_calculator.get_store(transit_calculator.CHARTS_DIR)
+    original = store.get
+    monkeypatch.setattr(store, 'get', lambda cid: loads.append(cid) or original(cid))
+
+    snapshots = transit_calculator.transit_range(
+        chart_id, '2000-01-01T00:00:00Z', '2010-01-01T00:00:00Z', 'hour')
+    assert next(snapshots)['date'] == '2000-01-01T00:00:00+00:00'
+    assert next(snapshots)['date'] == '2000-01-01T01:00:00+00:00'
+    assert loads == [chart_id]
+
+
+def test_range_errors(chart_id):
+    with pytest.raises(ValueError):
+        list(transit_calculator.transit_range('missing', '2024-01-01', '2024-01-02'))
+    with pytest.raises(ValueError):
+        list(transit_calculator.transit_range(chart_id, '2024-01-02', '2024-01-01'))
+    result = transit_calculator.handle_request({
+        'action': 'range', 'chart_id': chart_id, 'step': 'hour',
+        'start_date': '1900-01-01', 'end_date': '2100-01-01'})
+    assert 'error' in result
+
+
+def test_collected_ranges_are_capped(chart_id):
+    # Ten years of days stream, but is too long to collect into one response
+    year = {'action': 'range', 'chart_id': chart_id, 'step': 'day',
+            'start_date': '2000-01-01', 'end_date': '2010-01-01'}
+    assert 'error' in transit_calculator.handle_request(year)
+    assert next(transit_calculator.handle_stream(year))['date'] == '2000-01-01T00:00:00+00:00'
+    with pytest.raises(ValueError, match='split the range'):
+        next(transit_calculator.handle_stream({**year, 'max_snapshots': 100}))
+
+    week = {**year, 'end_date': '2000-01-07'}
+    assert len(transit_calculator.handle_request(week)['snapshots']) == 7
@@ -0,0 +1,81 @@
+import importlib.util
+import os
+
+import numpy as np
+import pytest
+
+import chart_calculator
+import varga_calculator
+from constants import SHODASHA_VARGA
+
+
+def test_sign_matrix_rules():
+    # 15.5° Aries and 12° Taurus
+    matrix = varga_calculator.varga_sign_matrix([15.5, 42.0], ['D1', 'D2', 'D3', 'D9', 'D30'])
+    assert matrix.dtype == np.int8
+    assert matrix.tolist() == [
+        [0, 1],    # D1: Aries, Taurus
+        [3, 3],    # D2: Moon hora in an odd sign's second half, even sign's first half
+        [1, 2],    # D3
+        [4, 0],    # D9: Aries 5th part -> Leo, Taurus 4th part -> Aries
+        [8, 8],    # D30: Jupiter portion in both
+    ]
+
+
+def test_read_several_vargas_at_once(charts_dir, birth_data):
+    chart = chart_calculator.calculate_chart(birth_data)
+    vargas = SHODASHA_VARGA
+
+    result = varga_calculator.handle_request(
+        {'action': 'read', 'chart_id': chart['chart_id'], 'vargas': vargas})
+    assert list(result['vargas']) == vargas
+
+    d1 = result['vargas']['D1']
+    assert d1['ascendant']['rashi'] == chart['ascendant']['rashi']
+    for planet, position in chart['planets'].items():
+        assert d1['positions'][planet]['rashi'] == position['rashi']
+        assert d1['positions'][planet]['house'] == position['house']
+
+    single = varga_calculator.read_divisional_chart(chart['chart_id'], 'd9')
+    assert single['varga'] == 'D9'
+    assert single['positions'] == result['vargas']['D9']['positions']
+
+
+def test_unknown_varga_is_an_error(charts_dir, birth_data):
+    chart = chart_calculator.calculate_chart(birth_data)
+    assert 'error' in varga_calculator.read_divisional_chart(chart['chart_id'], 'D99')
+
+
+def test_lookup_tables_cover_high_divisions():
+    # 0.1° Aries, 0.1° Taurus, 15° Taurus, 29.9° Pisces
+    matrix = varga_calculator.varga_sign_matrix([0.1, 30.1, 45.0, 359.9], ['D40', 'D45', 'D60'])
+    assert matrix.tolist() == [
+        [0, 6, 2, 9],     # D40: odd signs from Aries, even from Libra
+        [0, 4, 2, 4],     # D45: movable from Aries, fixed from Leo, dual from Sagittarius
+        [0, 1, 7, 10],    # D60: counted from the sign itself
+    ]
+    assert set(SHODASHA_VARGA) <= set(varga_calculator.VARGA_MAP)
+
+
+def test_sign_specific_starts():
+    # 15.5° Aries (odd), 12° Taurus and 4.5° Taurus (even)
+    matrix = varga_calculator.varga_sign_matrix([15.5, 42.0, 34.5], ['D4', 'D10', 'D12', 'D24'])
+    assert matrix.tolist() == [
+        [6, 4, 1],     # D4: sign, 4th, 7th, 10th
+        [5, 1, 10],    # D10: odd from the sign, even from its 9th (Capricorn)
+        [6, 5, 2],     # D12: counted from the sign itself
+        [4, 0, 6],     # D24: odd from Leo, even from Cancer
+    ]
+
+
+def test_rules_match_the_top_level_engine():
+    path = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'calculations',
+                        'varga_calculator.py')
+    if not os.path.exists(path):
+        pytest.skip('top-level calculations/ tree not present')
+    spec = importlib.util.spec_from_file_location('toplevel_varga_calculator', path)
+    toplevel = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(toplevel)
+
+    assert list(toplevel.VARGA_MAP) == list(varga_calculator.VARGA_MAP)
+    assert np.array_equal(toplevel.VARGA_TABLES, varga_calculator.VARGA_TABLES)
@@ -0,0 +1,80 @@
+import numpy as np
+
+import chart_calculator
+import yoga_identifier
+from chart_store import get_store
+from constants import PLANETS
+
+
+def _chart(chart_id, ascendant, **longitudes):
+    # Unplaced grahas are parked together in Libra, away from the others
+    planets = {name: {'longitude': longitudes.get(name, 185.0)} for name in PLANETS}
+    return {'chart_id': chart_id, 'name': chart_id, 'datetime': '2000-01-01T00:00:00Z',
+            'julian_day': 2451544.5, 'ascendant': {'longitude': ascendant}, 'planets': planets}
+
+
+def _yogas(chart):
+    names, matrix = yoga_identifier.evaluate(yoga_identifier.encode_charts([chart]))
+    return {name for name, present in zip(names, matrix[0]) if present}
+
+
+def test_mahapurusha_and_moon_yogas():
+    # Aries lagna, Mars exalted in Capricorn (10th), Jupiter 4th from the Moon
+    chart = _chart('a', 15.0, Mars=290.0, Moon=35.0, Jupiter=125.0, Venus=65.0,
+                   Mercury=5.0, Saturn=250.0)
+    yogas = _yogas(chart)
+    assert 'Ruchaka Yoga' in yogas
+    assert 'Gaja Kesari Yoga' in yogas
+    assert 'Sunapha Yoga' in yogas          # Venus 2nd from the Moon
+    assert 'Anapha Yoga' in yogas           # Mercury 12th from the Moon
+    assert 'Kemadruma Yoga' not in yogas
+    assert 'Hamsa Yoga' not in yogas
+
+
+def test_kemadruma_and_conjunctions():
+    chart = _chart('b', 100.0, Moon=40.0, Sun=130.0, Mercury=135.0, Rahu=10.0)
+    yogas = _yogas(chart)
+    assert 'Kemadruma Yoga' in yogas        # only Rahu, a node, is next to the Moon
+    assert 'Budha-Aditya Yoga' in yogas
+    assert 'Chandra-Mangala Yoga' not in yogas
+
+
+def test_lord_exchange_counts_as_raja_yoga():
+    # Cancer lagna: Mars lords the 5th and 10th (yogakaraka) - move it out of
+    # the way and exchange the 4th lord Venus with the 9th lord Jupiter
+    chart = _chart('c', 95.0, Venus=340.0, Jupiter=190.0, Mars=100.0,
+                   Moon=250.0, Sun=160.0, Mercury=160.0, Saturn=40.0)
+    enc = yoga_identifier.encode_charts([chart])
+    related = yoga_identifier.compile_condition(('lords_related', 4, 9))(enc)
+    assert related.tolist() == [True]
+    assert 'Raja Yoga' in _yogas(chart)
+
+
+def test_batch_matches_single_chart_evaluation():
+    rng = np.random.default_rng(7)
+    longitudes = rng.uniform(0, 360, (200, len(PLANETS)))
+    ascendants = rng.uniform(0, 360, 200)
+    _, batch = yoga_identifier.evaluate(yoga_identifier.ChartEncoding(longitudes, ascendants))
+    for i in range(0, 200, 37):
+        _, single = yoga_identifier.evaluate(
+            yoga_identifier.ChartEncoding(longitudes[i:i + 1], ascendants[i:i + 1]))
+        assert (single[0] == batch[i]).all()
+
+
+def test_identify_and_scan_store(charts_dir, birth_data):
+    chart = chart_calculator.calculate_chart(birth_data)
+    result = yoga_identifier.handle_request({'chart_id': chart['chart_id']})
+    assert result['count'] == len(result['yogas'])
+    assert {y['name'] for y in result['yogas']} == _yogas(chart)
+
+    get_store(charts_dir).put_many([
+        _chart('k1', 100.0, Moon=40.0), _chart('k2', 200.0, Moon=10.0),
+        _chart('x', 15.0, Moon=35.0, Venus=65.0)])
+    scan = yoga_identifier.scan_store(['Kemadruma Yoga'], limit=1, batch_size=2)
+    assert scan['charts_scanned'] == 4
+    kemadruma = scan['yogas']['Kemadruma Yoga']
+    assert kemadruma['count'] == 2 + ('Kemadruma Yoga' in _yogas(chart))
+    assert len(kemadruma['chart_ids']) == 1
+
+    assert 'error' in yoga_identifier.scan_store(['Imaginary Yoga'])
+    assert 'error' in yoga_identifier.identify_yogas('missing')
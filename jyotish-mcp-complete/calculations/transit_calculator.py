@@ -1,37 +1,164 @@
 #!/usr/bin/env python3
 """
 Transit Calculator - Current planetary positions and transits
+
+The 'events' action finds exact sign, nakshatra, pada or navamsa changes
+of one graha over a date range (see transit_events.py) in a single call.
+
+The 'range' action yields transit snapshots at a fixed step from one loaded
+birth chart. Run as a script it prints them as newline-delimited JSON as
+they are computed, and the engine worker's stream op sends them the same
+way; only those two stay flat in memory however long the range is. A
+non-stream 'range' request collects its snapshots into one response, so
+it is capped at MAX_COLLECTED_SNAPSHOTS (as is the MCP tool, which joins
+the streamed lines into one result).
+
+Planet positions for an instant are shared by every chart: they are kept
+in a process-wide snapshot cache keyed by the instant rounded to
+JYOTISH_TRANSIT_QUANTUM_SECONDS (default one minute), and only the house
+and birth comparisons are worked out per chart. A burst of transit_now
+calls for many charts costs one ephemeris computation.
+
+The 'charts' action runs the other way round: one transit position for a
+date is joined against the chart store's natal placement index, returning
+the charts it hits (e.g. Sade Sati: Saturn in or next to the natal Moon
+sign) without computing transits chart by chart.
 """
 
 import sys
 import json
 import os
-import swisseph as swe
-from datetime import datetime
-
-# Set ephemeris path
-ephe_path = os.path.join(os.path.dirname(__file__), 'ephemeris_data')
-swe.set_ephe_path(ephe_path)
-swe.set_sid_mode(swe.SIDM_LAHIRI)
+from datetime import datetime, timezone
 
 # Import constants
 try:
     from constants import (
+        PLANETS,
         get_nakshatra_from_longitude,
         get_rashi_from_longitude,
         get_house_from_longitude
     )
+    from ephemeris_table import sidereal_positions
+    from chart_store import POSITION_KINDS, get_store, segment_index
+    from transit_events import BOUNDARY_SEGMENTS, iter_crossings, segment_label
+    from lru import LRUCache, cache_size_from_env, int_from_env
 except ImportError:
     sys.path.insert(0, os.path.dirname(__file__))
     from constants import (
+        PLANETS,
         get_nakshatra_from_longitude,
         get_rashi_from_longitude,
         get_house_from_longitude
     )
+    from ephemeris_table import sidereal_positions
+    from chart_store import POSITION_KINDS, get_store, segment_index
+    from transit_events import BOUNDARY_SEGMENTS, iter_crossings, segment_label
+    from lru import LRUCache, cache_size_from_env, int_from_env
 
 # Chart cache
 CHARTS_DIR = os.path.join(os.path.dirname(__file__), '.charts_cache')
 
+# Julian day of 1970-01-01T00:00:00Z
+UNIX_EPOCH_JD = 2440587.5
+
+# Transit instants are rounded to this many seconds, so requests within
+# the same interval share one snapshot (0 keeps exact instants)
+TRANSIT_QUANTUM_SECONDS = int_from_env('JYOTISH_TRANSIT_QUANTUM_SECONDS', 60)
+
+# Planet positions of recently used instants, by quantized instant
+snapshot_cache = LRUCache(cache_size_from_env('JYOTISH_TRANSIT_CACHE_SIZE', 256))
+
+# Upper bound on events returned by one 'events' request
+MAX_EVENTS = 5000
+
+# Named steps of the 'range' action, in days
+TRANSIT_STEPS = {
+    'hour': 1 / 24,
+    'day': 1.0,
+    'week': 7.0,
+}
+
+# Upper bound on snapshots in one streamed 'range' request
+MAX_SNAPSHOTS = 100000
+
+# Upper bound when the snapshots are collected into one response
+MAX_COLLECTED_SNAPSHOTS = 2000
+
+# Instants computed per sidereal_positions call in a range
+SNAPSHOT_CHUNK = 256
+
+# Chart IDs returned per 'charts' page
+DEFAULT_MATCH_LIMIT = 1000
+MAX_MATCH_LIMIT = 10000
+
+# Named reverse lookups: transit graha, natal point, placement kind and
+# the offsets of the transit segment from the natal one that count as a hit
+TRANSIT_PATTERNS = {
+    'sade_sati': ('Saturn', 'Moon', 'sign', (-1, 0, 1)),
+    'ashtama_shani': ('Saturn', 'Moon', 'sign', (7,)),
+    'jupiter_over_ascendant': ('Jupiter', 'Ascendant', 'sign', (0,)),
+    'saturn_over_ascendant': ('Saturn', 'Ascendant', 'sign', (0,)),
+}
+
+
+def _parse_datetime(value):
+    """Parse an ISO datetime; a missing offset is taken as UTC"""
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+def _julian_day(dt):
+    """Julian day (UT) of a timezone-aware datetime"""
+    return UNIX_EPOCH_JD + dt.timestamp() / 86400
+
+
+def _format_jd(jd):
+    """ISO datetime (UTC, whole seconds) of a Julian day"""
+    seconds = round((jd - UNIX_EPOCH_JD) * 86400)
+    return datetime.fromtimestamp(seconds, timezone.utc).isoformat()
+
+
+def transit_snapshot(jd):
+    """
+    Chart-independent transit positions at an instant, cached
+    
+    Args:
+        jd: Julian day (UT); rounded to TRANSIT_QUANTUM_SECONDS
+    
+    Returns:
+        (snapshot Julian day, {planet: position dict}); the dicts are
+        shared, so callers copy them before adding chart-specific fields
+    """
+    if TRANSIT_QUANTUM_SECONDS:
+        quantum = TRANSIT_QUANTUM_SECONDS / 86400
+        key = round(jd / quantum)
+        jd = key * quantum
+    else:
+        key = jd
+    
+    snapshot = snapshot_cache.get(key)
+    if snapshot is None:
+        # Precomputed table when installed, Swiss Ephemeris otherwise
+        positions = {}
+        for name, (longitude, _, speed) in zip(PLANETS, sidereal_positions(jd)[0].tolist()):
+            nakshatra, pada, _ = get_nakshatra_from_longitude(longitude)
+            positions[name] = {
+                'longitude': round(longitude, 6),
+                'rashi': get_rashi_from_longitude(longitude),
+                'degree_in_rashi': round(longitude % 30, 2),
+                'nakshatra': nakshatra,
+                'nakshatra_pada': pada,
+                'is_retrograde': speed < 0,
+                'speed': round(speed, 6)
+            }
+        snapshot = (jd, positions)
+        snapshot_cache.put(key, snapshot)
+    return snapshot
+
 
 def calculate_transits(chart_id, date=None):
     """
@@ -46,94 +173,93 @@ def calculate_transits(chart_id, date=None):
     """
     try:
         # Load birth chart
-        cache_file = os.path.join(CHARTS_DIR, f'{chart_id}.json')
-        if not os.path.exists(cache_file):
+        birth_chart = get_store(CHARTS_DIR).get(chart_id)
+        if birth_chart is None:
             return {'error': f'Chart {chart_id} not found'}
         
-        with open(cache_file, 'r') as f:
-            birth_chart = json.load(f)
-        
         # Get birth ascendant for house calculations
         birth_ascendant = birth_chart['ascendant']['longitude']
         
         # Determine transit date
-        if date:
-            if date.endswith('Z'):
-                date = date[:-1] + '+00:00'
-            transit_dt = datetime.fromisoformat(date)
-        else:
-            transit_dt = datetime.now()
-        
-        # Convert to Julian day
-        jd = swe.julday(
-            transit_dt.year, transit_dt.month, transit_dt.day,
-            transit_dt.hour + transit_dt.minute/60.0 + transit_dt.second/3600.0
-        )
-        
-        # Calculate current planetary positions
-        planets = {
-            'Sun': swe.SUN,
-            'Moon': swe.MOON,
-            'Mars': swe.MARS,
-            'Mercury': swe.MERCURY,
-            'Jupiter': swe.JUPITER,
-            'Venus': swe.VENUS,
-            'Saturn': swe.SATURN,
-            'Rahu': swe.TRUE_NODE,
-        }
+        transit_dt = _parse_datetime(date) if date else datetime.now(timezone.utc)
+        jd, positions = transit_snapshot(_julian_day(transit_dt))
         
         transits = {}
         
-        for name, planet_id in planets.items():
-            result = swe.calc_ut(jd, planet_id, swe.FLG_SIDEREAL)
-            longitude = result[0][0]
-            speed = result[0][3]
-            
-            rashi = get_rashi_from_longitude(longitude)
-            nakshatra, pada, nak_lord = get_nakshatra_from_longitude(longitude)
-            house = get_house_from_longitude(longitude, birth_ascendant)
+        for name, position in positions.items():
+            house = get_house_from_longitude(position['longitude'], birth_ascendant)
             
             # Get birth position for comparison
             birth_pos = birth_chart['planets'][name]
-            birth_house = birth_pos['house']
-            birth_rashi = birth_pos['rashi']
             
             transits[name] = {
-                'longitude': round(longitude, 6),
-                'rashi': rashi,
-                'degree_in_rashi': round(longitude % 30, 2),
-                'nakshatra': nakshatra,
-                'nakshatra_pada': pada,
+                **position,
                 'house': house,
-                'is_retrograde': speed < 0,
-                'birth_house': birth_house,
-                'birth_rashi': birth_rashi,
-                'house_from_birth': house,
-                'speed': round(speed, 6)
+                'birth_house': birth_pos['house'],
+                'birth_rashi': birth_pos['rashi'],
+                'house_from_birth': house
             }
         
-        # Calculate Ketu
-        rahu_long = transits['Rahu']['longitude']
-        ketu_long = (rahu_long + 180) % 360
+        return {
+            'transit_date': _format_jd(jd),
+            'transits': transits,
+            'birth_chart_id': chart_id
+        }
         
-        transits['Ketu'] = {
-            'longitude': round(ketu_long, 6),
-            'rashi': get_rashi_from_longitude(ketu_long),
-            'degree_in_rashi': round(ketu_long % 30, 2),
-            'nakshatra': get_nakshatra_from_longitude(ketu_long)[0],
-            'nakshatra_pada': get_nakshatra_from_longitude(ketu_long)[1],
-            'house': get_house_from_longitude(ketu_long, birth_ascendant),
-            'is_retrograde': False,
-            'birth_house': birth_chart['planets']['Ketu']['house'],
-            'birth_rashi': birth_chart['planets']['Ketu']['rashi'],
-            'house_from_birth': get_house_from_longitude(ketu_long, birth_ascendant),
-            'speed': 0
+    except Exception as e:
+        import traceback
+        return {
+            'error': str(e),
+            'traceback': traceback.format_exc()
         }
+
+
+def find_transit_events(planet, start_date, end_date, boundary='sign', limit=MAX_EVENTS):
+    """
+    Find when a graha changes sign, nakshatra, pada or navamsa
+    
+    Args:
+        planet: graha name (Sun .. Ketu)
+        start_date: start of the range (ISO format)
+        end_date: end of the range (ISO format)
+        boundary: 'sign', 'nakshatra', 'pada' or 'navamsa'
+        limit: maximum number of events returned
+    
+    Returns:
+        dict with the crossings in time order (a retrograde graha can cross
+        the same boundary several times) and a truncated flag
+    """
+    try:
+        if boundary not in BOUNDARY_SEGMENTS:
+            return {'error': f'Unknown boundary: {boundary}'}
+        start_jd = _julian_day(_parse_datetime(start_date))
+        end_jd = _julian_day(_parse_datetime(end_date))
+        if end_jd <= start_jd:
+            return {'error': 'end_date must be after start_date'}
+        
+        events = []
+        truncated = False
+        for jd, longitude, before, after, direct in iter_crossings(
+                planet, start_jd, end_jd, boundary):
+            if len(events) >= limit:
+                truncated = True
+                break
+            events.append({
+                'datetime': _format_jd(jd),
+                'julian_day': round(jd, 6),
+                'longitude': round(longitude, 6),
+                'from': segment_label(boundary, before),
+                'to': segment_label(boundary, after),
+                'direction': 'direct' if direct else 'retrograde'
+            })
         
         return {
-            'transit_date': transit_dt.isoformat(),
-            'transits': transits,
-            'birth_chart_id': chart_id
+            'planet': planet,
+            'boundary': boundary,
+            'start_date': start_date,
+            'end_date': end_date,
+            'events': events,
+            'truncated': truncated
         }
         
     except Exception as e:
@@ -144,20 +270,212 @@ def calculate_transits(chart_id, date=None):
         }
 
 
+def iter_transit_snapshots(birth_chart, start_jd, end_jd, step_days):
+    """
+    Transit snapshots of one birth chart from start_jd to end_jd inclusive
+    
+    Positions are computed SNAPSHOT_CHUNK instants at a time, so only one
+    chunk is held in memory.
+    
+    Args:
+        birth_chart: chart dict as stored by chart_calculator
+        start_jd: Julian day (UT) of the first snapshot
+        end_jd: Julian day (UT) of the last possible snapshot
+        step_days: spacing of the snapshots in days
+    
+    Yields:
+        dict with the snapshot date and, per graha, its longitude, rashi,
+        nakshatra, pada and house from the natal ascendant
+    """
+    birth_ascendant = birth_chart['ascendant']['longitude']
+    count = int((end_jd - start_jd) / step_days + 1e-9) + 1
+    
+    for first in range(0, count, SNAPSHOT_CHUNK):
+        jds = [start_jd + step_days * i
+               for i in range(first, min(first + SNAPSHOT_CHUNK, count))]
+        for jd, row in zip(jds, sidereal_positions(jds).tolist()):
+            transits = {}
+            for name, (longitude, _, speed) in zip(PLANETS, row):
+                nakshatra, pada, _ = get_nakshatra_from_longitude(longitude)
+                transits[name] = {
+                    'longitude': round(longitude, 6),
+                    'rashi': get_rashi_from_longitude(longitude),
+                    'nakshatra': nakshatra,
+                    'nakshatra_pada': pada,
+                    'house': get_house_from_longitude(longitude, birth_ascendant),
+                    'is_retrograde': speed < 0
+                }
+            yield {'date': _format_jd(jd), 'transits': transits}
+
+
+def transit_range(chart_id, start_date, end_date, step='day', max_snapshots=MAX_SNAPSHOTS):
+    """
+    Transit snapshots over a date range, as a generator
+    
+    Args:
+        chart_id: Birth chart UUID
+        start_date: first snapshot (ISO format)
+        end_date: end of the range, inclusive (ISO format)
+        step: 'hour', 'day', 'week' or a number of days
+        max_snapshots: largest number of snapshots allowed
+    
+    Yields:
+        one snapshot dict per step (see iter_transit_snapshots)
+    
+    Raises:
+        ValueError: unknown chart, bad step or range too large
+    """
+    birth_chart = get_store(CHARTS_DIR).get(chart_id)
+    if birth_chart is None:
+        raise ValueError(f'Chart {chart_id} not found')
+    
+    step_days = TRANSIT_STEPS[step] if step in TRANSIT_STEPS else float(step)
+    if step_days <= 0:
+        raise ValueError('step must be positive')
+    start_jd = _julian_day(_parse_datetime(start_date))
+    end_jd = _julian_day(_parse_datetime(end_date))
+    if end_jd < start_jd:
+        raise ValueError('end_date must not be before start_date')
+    if (end_jd - start_jd) / step_days >= max_snapshots:
+        raise ValueError(f'Range exceeds {max_snapshots} snapshots; '
+                         'use a larger step or split the range')
+    
+    yield from iter_transit_snapshots(birth_chart, start_jd, end_jd, step_days)
+
+
+def find_charts_under_transit(transit_planet, natal_point, date=None, kind='sign',
+                              offsets=(0,), limit=DEFAULT_MATCH_LIMIT, cursor=None):
+    """
+    Stored charts whose natal placement a transit is hitting
+    
+    The transit graha's segment (sign, nakshatra or pada) on the date is
+    computed once and joined against the chart store's natal placement
+    index, so the cost follows the number of matches, not of charts.
+    
+    Args:
+        transit_planet: transiting graha (Sun .. Ketu)
+        natal_point: natal graha or 'Ascendant'
+        date: Optional date (ISO format), defaults to now
+        kind: 'sign', 'nakshatra' or 'pada'
+        offsets: how far the transit segment may be from the natal one,
+            e.g. (-1, 0, 1) for Sade Sati, (7,) for the 8th from it
+        limit: maximum chart IDs per page
+        cursor: next_cursor of the previous page
+    
+    Returns:
+        dict with the transit position, the natal segments matched, the
+        matching chart IDs (ascending) and next_cursor (None on the last
+        page)
+    """
+    try:
+        if kind not in POSITION_KINDS:
+            return {'error': f'kind must be one of {list(POSITION_KINDS)}'}
+        if transit_planet not in PLANETS:
+            return {'error': f'Unknown planet: {transit_planet}'}
+        
+        transit_dt = _parse_datetime(date) if date else datetime.now(timezone.utc)
+        jd, positions = transit_snapshot(_julian_day(transit_dt))
+        longitude = positions[transit_planet]['longitude']
+        n_segments = POSITION_KINDS[kind]
+        segment = segment_index(longitude, n_segments)
+        natal = sorted({(segment - offset) % n_segments for offset in offsets})
+        
+        chart_ids = get_store(CHARTS_DIR).find_by_position(
+            natal_point, kind, natal, limit + 1, after=cursor)
+        page = chart_ids[:limit]
+        
+        return {
+            'transit_date': _format_jd(jd),
+            'transit': {
+                'planet': transit_planet,
+                'longitude': round(longitude, 6),
+                kind: segment
+            },
+            'natal_point': natal_point,
+            'natal_' + kind: natal,
+            'chart_ids': page,
+            'next_cursor': page[-1] if len(chart_ids) > limit else None
+        }
+        
+    except Exception as e:
+        import traceback
+        return {
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        }
+
+
+def handle_stream(input_data, max_snapshots=MAX_SNAPSHOTS):
+    """
+    Streaming requests: an iterator of result items for the 'range' action
+    
+    A 'max_snapshots' field lowers the cap (e.g. for callers that collect
+    the stream); it cannot raise it above max_snapshots.
+    """
+    action = input_data.get('action', 'range')
+    if action != 'range':
+        raise ValueError(f'Action {action} does not stream')
+    return transit_range(
+        input_data['chart_id'],
+        input_data['start_date'],
+        input_data['end_date'],
+        input_data.get('step', 'day'),
+        min(int(input_data.get('max_snapshots', max_snapshots)), max_snapshots)
+    )
+
+
+def handle_request(input_data):
+    """Dispatch a CLI/worker request to the matching transit operation"""
+    action = input_data.get('action', 'current')
+    
+    if action == 'current':
+        return calculate_transits(
+            input_data['chart_id'],
+            input_data.get('date')
+        )
+    elif action == 'events':
+        return find_transit_events(
+            input_data['planet'],
+            input_data['start_date'],
+            input_data['end_date'],
+            input_data.get('boundary', 'sign'),
+            min(int(input_data.get('limit', MAX_EVENTS)), MAX_EVENTS)
+        )
+    elif action == 'charts':
+        if 'pattern' in input_data:
+            if input_data['pattern'] not in TRANSIT_PATTERNS:
+                return {'error': f"Unknown pattern: {input_data['pattern']}"}
+            transit_planet, natal_point, kind, offsets = TRANSIT_PATTERNS[input_data['pattern']]
+        else:
+            transit_planet = input_data['transit_planet']
+            natal_point = input_data['natal_point']
+            kind = input_data.get('kind', 'sign')
+            offsets = input_data.get('offsets', [0])
+        return find_charts_under_transit(
+            transit_planet, natal_point, input_data.get('date'), kind, offsets,
+            min(int(input_data.get('limit', DEFAULT_MATCH_LIMIT)), MAX_MATCH_LIMIT),
+            input_data.get('cursor')
+        )
+    elif action == 'range':
+        # Collected in one response, so capped; stream it for long ranges
+        try:
+            return {'snapshots': list(handle_stream(input_data, MAX_COLLECTED_SNAPSHOTS))}
+        except ValueError as e:
+            return {'error': str(e)}
+    else:
+        return {'error': f'Unknown action: {action}'}
+
+
 if __name__ == '__main__':
     try:
         input_data = json.loads(sys.argv[1])
-        action = input_data.get('action', 'current')
-        
-        if action == 'current':
-            result = calculate_transits(
-                input_data['chart_id'],
-                input_data.get('date')
-            )
+        if input_data.get('action') == 'range':
+            # Newline-delimited JSON, one snapshot per line as computed
+            for snapshot in handle_stream(input_data):
+                sys.stdout.write(json.dumps(snapshot) + '\n')
         else:
-            result = {'error': f'Unknown action: {action}'}
-        
-        print(json.dumps(result))
+            result = handle_request(input_data)
+            print(json.dumps(result))
         
     except Exception as e:
         import traceback
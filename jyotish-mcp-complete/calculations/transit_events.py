@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Transit Events - Exact times a graha crosses sign or nakshatra boundaries
+
+Instead of polling positions date by date, the search samples one graha at
+a coarse step, splits every step at its stations (where the speed changes
+sign) so each piece moves in one direction, and solves each boundary the
+piece passes over with a bracketed secant iteration on swe.calc_ut. A
+retrograde graha that goes back and forth over a boundary therefore yields
+one event per crossing, each with its direction.
+
+Boundaries (degrees of sidereal longitude):
+    sign       12 x 30°
+    nakshatra  27 x 13°20'
+    pada       108 x 3°20'
+    navamsa    108 x 3°20' (same points as padas, labelled by navamsa sign)
+"""
+
+import math
+import os
+import sys
+
+import swisseph as swe
+
+# Import ephemeris engine and constants
+try:
+    from constants import NAKSHATRAS, RASHIS, SWISSEPH_PLANETS
+    from ephemeris import init_ephemeris, planet_positions
+except ImportError:
+    sys.path.insert(0, os.path.dirname(__file__))
+    from constants import NAKSHATRAS, RASHIS, SWISSEPH_PLANETS
+    from ephemeris import init_ephemeris, planet_positions
+
+# Boundary kind -> number of equal segments of the zodiac
+BOUNDARY_SEGMENTS = {
+    'sign': 12,
+    'nakshatra': 27,
+    'pada': 108,
+    'navamsa': 108,
+}
+
+# Sampling step (days) per graha. It must be shorter than the time between
+# two stations, so every speed sign change is seen between two samples.
+# The true node wobbles within hours; only its net crossing per step is
+# resolved.
+SCAN_STEPS = {
+    'Sun': 5.0,
+    'Moon': 1.0,
+    'Mercury': 1.0,
+    'Venus': 2.0,
+    'Mars': 2.0,
+    'Jupiter': 4.0,
+    'Saturn': 4.0,
+    'Rahu': 1.0,
+    'Ketu': 1.0,
+}
+
+# Samples computed per planet_positions call
+SCAN_CHUNK = 256
+
+# Crossing times are solved to about 0.1 second
+TIME_TOLERANCE = 1e-6
+
+MAX_ITERATIONS = 100
+
+SIDEREAL_FLAGS = swe.FLG_SWIEPH | swe.FLG_SPEED | swe.FLG_SIDEREAL
+
+
+def _wrap180(angle):
+    """Angle folded into [-180, 180)"""
+    return (angle + 180) % 360 - 180
+
+
+def segment_label(boundary, index):
+    """Name of segment `index` for a boundary kind"""
+    if boundary == 'sign':
+        return RASHIS[index]
+    if boundary == 'nakshatra':
+        return NAKSHATRAS[index]['name']
+    if boundary == 'pada':
+        return f"{NAKSHATRAS[index // 4]['name']} {index % 4 + 1}"
+    # Navamsa k of the zodiac falls in sign k mod 12 (Parashari D9)
+    return RASHIS[index % 12]
+
+
+class _Ephemeris:
+    """Sidereal longitude and speed of one graha straight from swe.calc_ut"""
+
+    def __init__(self, planet):
+        init_ephemeris()
+        self.planet_id = SWISSEPH_PLANETS['Rahu' if planet == 'Ketu' else planet]
+        self.offset = 180.0 if planet == 'Ketu' else 0.0
+
+    def __call__(self, jd):
+        xx = swe.calc_ut(jd, self.planet_id, SIDEREAL_FLAGS)[0]
+        return (xx[0] + self.offset) % 360, xx[3]
+
+
+def _find_station(ephemeris, a, b, speed_a):
+    """Time in (a, b) where the speed changes sign, by bisection"""
+    while b - a > TIME_TOLERANCE:
+        mid = (a + b) / 2
+        if (ephemeris(mid)[1] < 0) == (speed_a < 0):
+            a = mid
+        else:
+            b = mid
+    return (a + b) / 2
+
+
+def _solve_crossing(ephemeris, a, b, fa, fb, target):
+    """
+    Time in [a, b] where the longitude reaches `target`
+
+    f(t) = wrap180(longitude(t) - target) changes sign over the bracket.
+    Secant steps are used while they shrink the bracket (Illinois variant
+    of regula falsi), so the bracket always converges.
+    """
+    side = 0
+    for _ in range(MAX_ITERATIONS):
+        if b - a <= TIME_TOLERANCE:
+            break
+        t = (a * fb - b * fa) / (fb - fa)
+        if not a < t < b:
+            t = (a + b) / 2
+        ft = _wrap180(ephemeris(t)[0] - target)
+        if ft == 0:
+            return t
+        if (ft < 0) == (fa < 0):
+            a, fa = t, ft
+            if side == -1:
+                fb /= 2
+            side = -1
+        else:
+            b, fb = t, ft
+            if side == 1:
+                fa /= 2
+            side = 1
+    return (a + b) / 2
+
+
+def _piece_crossings(ephemeris, a, b, lon_a, lon_b, width, n_segments):
+    """Crossings of a piece along which the graha moves one way only"""
+    # Continuous longitudes, so boundaries between them can be counted
+    end = lon_a + _wrap180(lon_b - lon_a)
+    first, last = math.floor(lon_a / width), math.floor(end / width)
+    if end >= lon_a:
+        steps = [(k, k - 1, k) for k in range(first + 1, last + 1)]
+    else:
+        steps = [(k, k, k - 1) for k in range(first, last, -1)]
+
+    for boundary, before, after in steps:
+        target = (boundary * width) % 360
+        fa = _wrap180(ephemeris(a)[0] - target)
+        fb = _wrap180(ephemeris(b)[0] - target)
+        if fa == 0:
+            jd = a
+        else:
+            jd = _solve_crossing(ephemeris, a, b, fa, fb, target)
+        yield jd, target, before % n_segments, after % n_segments, end >= lon_a
+        # Later boundaries of the same piece are crossed after this one
+        a = jd
+
+
+def iter_crossings(planet, start_jd, end_jd, boundary='sign'):
+    """
+    Boundary crossings of one graha in [start_jd, end_jd), in time order
+
+    Args:
+        planet: graha name (Sun .. Ketu)
+        start_jd: Julian day (UT) where the search starts
+        end_jd: Julian day (UT) where it ends
+        boundary: 'sign', 'nakshatra', 'pada' or 'navamsa'
+
+    Yields:
+        (jd, boundary longitude, segment before, segment after, direct)
+        tuples; segments are indices into the boundary kind's division
+    """
+    if planet not in SCAN_STEPS:
+        raise ValueError(f'Unknown planet: {planet}')
+    if boundary not in BOUNDARY_SEGMENTS:
+        raise ValueError(f'Unknown boundary: {boundary}')
+
+    n_segments = BOUNDARY_SEGMENTS[boundary]
+    width = 360 / n_segments
+    step = SCAN_STEPS[planet]
+    ephemeris = _Ephemeris(planet)
+
+    n_steps = max(1, math.ceil((end_jd - start_jd) / step))
+    previous = None
+    for first in range(0, n_steps + 1, SCAN_CHUNK):
+        count = min(SCAN_CHUNK, n_steps + 1 - first)
+        jds = [min(start_jd + step * i, end_jd) for i in range(first, first + count)]
+        samples = planet_positions(jds, [planet])[:, 0]
+
+        for jd, sample in zip(jds, samples.tolist()):
+            current = (jd, sample[0], sample[2])
+            if previous is not None and current[0] > previous[0]:
+                yield from _step_crossings(ephemeris, previous, current, width, n_segments)
+            previous = current
+
+
+def _step_crossings(ephemeris, previous, current, width, n_segments):
+    """Crossings between two samples, split at a station if there is one"""
+    a, lon_a, speed_a = previous
+    b, lon_b, speed_b = current
+    if (speed_a < 0) != (speed_b < 0):
+        station = _find_station(ephemeris, a, b, speed_a)
+        lon_station = ephemeris(station)[0]
+        yield from _piece_crossings(ephemeris, a, station, lon_a, lon_station, width, n_segments)
+        a, lon_a = station, lon_station
+    yield from _piece_crossings(ephemeris, a, b, lon_a, lon_b, width, n_segments)
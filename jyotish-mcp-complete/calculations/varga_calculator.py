@@ -1,49 +1,248 @@
 #!/usr/bin/env python3
 """
 Varga Calculator - Divisional charts (D1-D60)
+
+All requested vargas are computed together from the D1 longitudes as a
+(n_vargas, n_positions) integer sign matrix. Every varga rule, including
+the irregular D2/D3/D30 ones, is precomputed into a (sign, part) lookup
+table, so the matrix is a single array index operation. The response
+dicts are only built when the result is returned.
 """
 
 import sys
 import json
 import os
 
+import numpy as np
+
+try:
+    from constants import RASHIS
+    from chart_store import get_store
+except ImportError:
+    sys.path.insert(0, os.path.dirname(__file__))
+    from constants import RASHIS
+    from chart_store import get_store
+
 # Chart cache
 CHARTS_DIR = os.path.join(os.path.dirname(__file__), '.charts_cache')
 
 
-def read_divisional_chart(chart_id, varga):
+# Varga rules: (D1 sign index, part index within the sign) -> varga sign.
+# They only run at import time, to fill the lookup tables below.
+
+def _parashari(n):
+    """Continuous division: n parts per sign counted on from Aries (D7, D9, D16, D20, D27)"""
+    return lambda sign, part: (sign * n + part) % 12
+
+
+def _hora(sign, part):
+    """Hora: odd signs Leo then Cancer, even signs Cancer then Leo"""
+    odd_sign = sign % 2 == 0  # 0 = Aries
+    return 4 if odd_sign == (part == 0) else 3
+
+
+def _drekkana(sign, part):
+    """Drekkana: counted forward in odd signs, backward in even signs"""
+    if sign % 2 == 0:
+        return (sign + part) % 12
+    return (sign + 2 - part) % 12
+
+
+def _chaturthamsa(sign, part):
+    """Chaturthamsa: the sign itself, then its 4th, 7th and 10th"""
+    return (sign + 3 * part) % 12
+
+
+def _dasamsa(sign, part):
+    """Dasamsa: from the sign in odd signs, from its 9th in even signs"""
+    return (sign + (0 if sign % 2 == 0 else 8) + part) % 12
+
+
+def _dwadasamsa(sign, part):
+    """Dwadasamsa: counted from the sign itself"""
+    return (sign + part) % 12
+
+
+def _chaturvimsamsa(sign, part):
+    """Chaturvimsamsa: from Leo in odd signs, from Cancer in even signs"""
+    return ((4 if sign % 2 == 0 else 3) + part) % 12
+
+
+# Trimsamsa boundaries (degrees) and the sign ruling each portion
+_D30_BOUNDS = [5, 10, 18, 25]
+_D30_ODD = [0, 10, 8, 2, 1]   # Mars, Saturn, Jupiter, Mercury, Venus
+_D30_EVEN = [1, 2, 8, 10, 0]
+
+
+def _trimsamsa(sign, degree):
+    """Trimsamsa: unequal portions, order depends on odd/even sign"""
+    portion = sum(degree >= bound for bound in _D30_BOUNDS)
+    return (_D30_ODD if sign % 2 == 0 else _D30_EVEN)[portion]
+
+
+def _khavedamsa(sign, part):
+    """Khavedamsa: from Aries in odd signs, from Libra in even signs"""
+    return ((0 if sign % 2 == 0 else 6) + part) % 12
+
+
+def _akshavedamsa(sign, part):
+    """Akshavedamsa: from Aries, Leo, Sagittarius for movable, fixed, dual signs"""
+    return ((0, 4, 8)[sign % 3] + part) % 12
+
+
+def _shashtiamsa(sign, part):
+    """Shashtiamsa: half-degree parts counted from the sign itself"""
+    return (sign + part) % 12
+
+
+# varga -> (parts per sign, rule). D30 uses 1° parts so its unequal
+# portions fit the same table layout. The rules mirror the top-level
+# calculations/varga_calculator.py, which this script directory cannot
+# import; tests/test_vargas.py checks both build the same tables.
+VARGA_MAP = {
+    'D1': (1, lambda sign, part: sign),
+    'D2': (2, _hora),
+    'D3': (3, _drekkana),
+    'D4': (4, _chaturthamsa),
+    'D7': (7, _parashari(7)),
+    'D9': (9, _parashari(9)),
+    'D10': (10, _dasamsa),
+    'D12': (12, _dwadasamsa),
+    'D16': (16, _parashari(16)),
+    'D20': (20, _parashari(20)),
+    'D24': (24, _chaturvimsamsa),
+    'D27': (27, _parashari(27)),
+    'D30': (30, _trimsamsa),
+    'D40': (40, _khavedamsa),
+    'D45': (45, _akshavedamsa),
+    'D60': (60, _shashtiamsa),
+}
+
+
+def _build_tables():
+    """(n_vargas, 12 signs, max parts) array of varga signs"""
+    width = max(parts for parts, _ in VARGA_MAP.values())
+    tables = np.zeros((len(VARGA_MAP), 12, width), dtype=np.int8)
+    for row, (parts, rule) in enumerate(VARGA_MAP.values()):
+        for sign in range(12):
+            for part in range(parts):
+                tables[row, sign, part] = rule(sign, part)
+    return tables
+
+
+VARGA_INDEX = {label: row for row, label in enumerate(VARGA_MAP)}
+VARGA_PARTS = np.array([parts for parts, _ in VARGA_MAP.values()])
+VARGA_TABLES = _build_tables()
+
+
+def _normalize_vargas(vargas):
+    """Upper-cased varga labels, validated against VARGA_MAP"""
+    labels = [v.upper() for v in vargas]
+    unknown = [v for v in labels if v not in VARGA_MAP]
+    if unknown:
+        raise ValueError(f"Unsupported varga type: {', '.join(unknown)}")
+    return labels
+
+
+def varga_sign_matrix(longitudes, vargas):
+    """
+    Varga sign indices for many positions and vargas in one pass
+
+    Args:
+        longitudes: sidereal D1 longitudes in degrees
+        vargas: varga labels, e.g. ['D9', 'D10']
+
+    Returns:
+        int8 array of shape (len(vargas), len(longitudes))
+    """
+    labels = _normalize_vargas(vargas)
+    rows = np.array([VARGA_INDEX[label] for label in labels], dtype=np.int64)
+    longitudes = np.asarray(longitudes, dtype=float) % 360
+    sign = (longitudes // 30).astype(np.int64)
+    within = longitudes % 30
+
+    parts = VARGA_PARTS[rows][:, None]
+    part = np.minimum((within * parts / 30).astype(np.int64), parts - 1)
+    return VARGA_TABLES[rows[:, None], sign, part]
+
+
+def divisional_positions(chart, vargas):
     """
-    Read divisional chart (currently returns D1 only, D9+ to be implemented)
-    
+    Divisional charts of a saved chart
+
+    Args:
+        chart: chart dict as stored by chart_calculator
+        vargas: varga labels
+
+    Returns:
+        dict of varga label -> {ascendant, positions}; houses are counted
+        from the varga ascendant (whole sign)
+    """
+    labels = _normalize_vargas(vargas)
+    planets = list(chart['planets'])
+    longitudes = [chart['ascendant']['longitude']]
+    longitudes += [chart['planets'][p]['longitude'] for p in planets]
+    matrix = varga_sign_matrix(longitudes, labels)
+
+    result = {}
+    for label, (asc_sign, *signs) in zip(labels, matrix.tolist()):
+        result[label] = {
+            'ascendant': {'rashi': RASHIS[asc_sign], 'sign_index': asc_sign},
+            'positions': {
+                planet: {
+                    'rashi': RASHIS[sign],
+                    'sign_index': sign,
+                    'house': (sign - asc_sign) % 12 + 1
+                }
+                for planet, sign in zip(planets, signs)
+            }
+        }
+    return result
+
+
+def read_divisional_chart(chart_id, varga=None, vargas=None):
+    """
+    Read one or several divisional charts
+
     Args:
         chart_id: Birth chart UUID
         varga: Divisional chart type (D1, D9, D10, etc.)
-    
+        vargas: list of divisional chart types, computed together
+
     Returns:
-        dict with divisional chart positions
+        dict with the divisional chart positions ('varga' and 'positions'
+        for a single varga, a 'vargas' mapping for a list)
     """
     try:
         # Load birth chart
-        cache_file = os.path.join(CHARTS_DIR, f'{chart_id}.json')
-        if not os.path.exists(cache_file):
+        chart = get_store(CHARTS_DIR).get(chart_id)
+        if chart is None:
             return {'error': f'Chart {chart_id} not found'}
-        
-        with open(cache_file, 'r') as f:
-            chart = json.load(f)
-        
-        # For now, only D1 is available
-        if varga == 'D1':
+
+        if vargas:
             return {
                 'chart_id': chart_id,
-                'varga': 'D1',
-                'positions': chart['planets']
+                'vargas': divisional_positions(chart, vargas)
             }
-        else:
+
+        if not varga:
+            return {'error': 'Either varga or vargas is required'}
+
+        # D1 keeps the full per-planet detail of the birth chart
+        if varga.upper() == 'D1':
             return {
-                'error': f'Divisional chart {varga} not yet implemented',
-                'message': f'{varga} calculation coming soon. Currently only D1 is available.'
+                'chart_id': chart_id,
+                'varga': 'D1',
+                'positions': chart['planets']
             }
-        
+
+        label = varga.upper()
+        return {
+            'chart_id': chart_id,
+            'varga': label,
+            **divisional_positions(chart, [label])[label]
+        }
+
     except Exception as e:
         import traceback
         return {
@@ -52,21 +251,26 @@ def read_divisional_chart(chart_id, varga):
         }
 
 
+def handle_request(input_data):
+    """Dispatch a CLI/worker request to the matching varga operation"""
+    action = input_data.get('action', 'read')
+
+    if action == 'read':
+        return read_divisional_chart(
+            input_data['chart_id'],
+            input_data.get('varga'),
+            input_data.get('vargas')
+        )
+    else:
+        return {'error': f'Unknown action: {action}'}
+
+
 if __name__ == '__main__':
     try:
         input_data = json.loads(sys.argv[1])
-        action = input_data.get('action', 'read')
-        
-        if action == 'read':
-            result = read_divisional_chart(
-                input_data['chart_id'],
-                input_data['varga']
-            )
-        else:
-            result = {'error': f'Unknown action: {action}'}
-        
+        result = handle_request(input_data)
         print(json.dumps(result))
-        
+
     except Exception as e:
         import traceback
         error_result = {
@@ -1,22 +1,364 @@
 #!/usr/bin/env python3
 """
-Yoga Identifier - Classical planetary combinations (STUB)
+Yoga Identifier - Classical planetary combinations
+
+Yogas are declared as data: each rule is a condition tree such as
+('all', ('in_house', 'Mars', KENDRAS), ('dignified', 'Mars')). The rule set
+is compiled once into NumPy predicates over a compact chart encoding
+(planet house bits, planet sign bits, house lords and aspect masks as
+small integer bitmasks), so the whole catalogue is evaluated for a batch
+of charts with a handful of array operations per rule. The same compiled
+rules serve one chart or the entire chart store.
+
+Condition operators (houses are 1-based, counted from the lagna unless
+stated otherwise):
+    ('all', cond, ...) / ('any', cond, ...) / ('not', cond)
+    ('in_house', planet, houses)       planet occupies one of the houses
+    ('from', planet, ref, houses)      planet in those houses counted from ref
+    ('dignified', planet)              planet in its own or exaltation sign
+    ('conjunct', planet, other)        both in the same sign
+    ('lord_in_house', house, houses)   lord of `house` occupies one of them
+    ('lords_related', house, other)    their lords are conjunct, in mutual
+                                       aspect or exchange signs
 """
 
 import sys
 import json
+import os
+
+import numpy as np
+
+try:
+    from constants import (
+        PLANETS, RASHIS, RASHI_LORDS, EXALTATION, SPECIAL_ASPECTS,
+        KENDRAS, TRIKONAS, DUSTHANAS
+    )
+    from chart_store import get_store
+except ImportError:
+    sys.path.insert(0, os.path.dirname(__file__))
+    from constants import (
+        PLANETS, RASHIS, RASHI_LORDS, EXALTATION, SPECIAL_ASPECTS,
+        KENDRAS, TRIKONAS, DUSTHANAS
+    )
+    from chart_store import get_store
+
+# Chart cache
+CHARTS_DIR = os.path.join(os.path.dirname(__file__), '.charts_cache')
+
+# Charts encoded and evaluated together when scanning the store
+SCAN_BATCH = 2048
+
+# Chart IDs listed per yoga by a store scan (default and upper bound)
+DEFAULT_SCAN_LIMIT = 1000
+MAX_SCAN_LIMIT = 100000
+
+PLANET_INDEX = {name: i for i, name in enumerate(PLANETS)}
+
+# Sign index -> index of its lord in PLANETS
+SIGN_LORDS = np.array([PLANET_INDEX[RASHI_LORDS[rashi]] for rashi in RASHIS], dtype=np.int64)
+
+# Planet -> bitmask of its own and exaltation signs
+DIGNITY_SIGNS = np.zeros(len(PLANETS), dtype=np.int64)
+for _rashi, _lord in RASHI_LORDS.items():
+    DIGNITY_SIGNS[PLANET_INDEX[_lord]] |= 1 << RASHIS.index(_rashi)
+for _planet, _exaltation in EXALTATION.items():
+    DIGNITY_SIGNS[PLANET_INDEX[_planet]] |= 1 << RASHIS.index(_exaltation['sign'])
+
+# (planet, house it occupies) -> bitmask of the houses it aspects: the 7th
+# for every graha plus the special aspects of Mars, Jupiter and Saturn
+ASPECT_MASKS = np.zeros((len(PLANETS), 12), dtype=np.int64)
+for _i, _planet in enumerate(PLANETS):
+    for _house in range(12):
+        for _aspect in [7] + SPECIAL_ASPECTS.get(_planet, []):
+            ASPECT_MASKS[_i, _house] |= 1 << (_house + _aspect - 1) % 12
+
+BENEFICS = ['Mercury', 'Jupiter', 'Venus']
+
+# Grahas counted around the Moon (the Sun and the nodes are excluded)
+TARA_GRAHAS = ['Mars', 'Mercury', 'Jupiter', 'Venus', 'Saturn']
+
+
+def _any_from_moon(houses):
+    return ('any', *[('from', planet, 'Moon', houses) for planet in TARA_GRAHAS])
+
+
+def _mahapurusha(name, planet):
+    return (name, 'Pancha Mahapurusha',
+            f'{planet} in a kendra in its own or exaltation sign',
+            ('all', ('in_house', planet, KENDRAS), ('dignified', planet)))
+
+
+# Rule catalogue: (name, category, description, condition)
+YOGA_RULES = [
+    _mahapurusha('Ruchaka Yoga', 'Mars'),
+    _mahapurusha('Bhadra Yoga', 'Mercury'),
+    _mahapurusha('Hamsa Yoga', 'Jupiter'),
+    _mahapurusha('Malavya Yoga', 'Venus'),
+    _mahapurusha('Sasa Yoga', 'Saturn'),
+    ('Raja Yoga', 'Raja',
+     'Lord of a kendra conjunct, in mutual aspect or exchange with the lord of a trikona',
+     ('any', *[('lords_related', k, t) for k in KENDRAS for t in TRIKONAS if k != t])),
+    ('Dhana Yoga', 'Dhana',
+     'Lords of the 2nd and 11th related to each other or to the lords of the 1st, 5th or 9th',
+     ('any', ('lords_related', 2, 11),
+      *[('lords_related', w, t) for w in (2, 11) for t in TRIKONAS])),
+    ('Viparita Raja Yoga', 'Raja',
+     'Lord of the 6th, 8th or 12th placed in the 6th, 8th or 12th',
+     ('any', *[('lord_in_house', d, [o for o in DUSTHANAS if o != d]) for d in DUSTHANAS])),
+    ('Gaja Kesari Yoga', 'Chandra',
+     'Jupiter in a kendra from the Moon',
+     ('from', 'Jupiter', 'Moon', KENDRAS)),
+    ('Sunapha Yoga', 'Chandra',
+     'A graha other than the Sun or nodes in the 2nd from the Moon',
+     _any_from_moon([2])),
+    ('Anapha Yoga', 'Chandra',
+     'A graha other than the Sun or nodes in the 12th from the Moon',
+     _any_from_moon([12])),
+    ('Durudhara Yoga', 'Chandra',
+     'Grahas other than the Sun or nodes in both the 2nd and 12th from the Moon',
+     ('all', _any_from_moon([2]), _any_from_moon([12]))),
+    ('Kemadruma Yoga', 'Chandra',
+     'No graha other than the Sun or nodes in the 2nd or 12th from the Moon',
+     ('not', _any_from_moon([2, 12]))),
+    ('Adhi Yoga', 'Chandra',
+     'Mercury, Jupiter and Venus all in the 6th, 7th or 8th from the Moon',
+     ('all', *[('from', planet, 'Moon', [6, 7, 8]) for planet in BENEFICS])),
+    ('Amala Yoga', 'Auspicious',
+     'A natural benefic in the 10th from the lagna',
+     ('any', *[('in_house', planet, [10]) for planet in BENEFICS])),
+    ('Budha-Aditya Yoga', 'Auspicious',
+     'Sun and Mercury in the same sign',
+     ('conjunct', 'Sun', 'Mercury')),
+    ('Chandra-Mangala Yoga', 'Dhana',
+     'Moon and Mars in the same sign',
+     ('conjunct', 'Moon', 'Mars')),
+]
+
+
+class ChartEncoding:
+    """
+    Compact encoding of a batch of charts
+
+    Attributes (n = number of charts, 0-based houses and signs):
+        sign, house: (n, 9) sign and house of each graha
+        sign_bit, house_bit: (n, 9) the same as one-bit masks
+        aspects: (n, 9) bitmask of houses each graha aspects
+        lord_house: (n, 12) house occupied by the lord of each house
+        lord_aspects: (n, 12) aspect mask of the lord of each house
+    """
+
+    def __init__(self, planet_longitudes, ascendant_longitudes):
+        self.sign = (np.asarray(planet_longitudes, dtype=float) % 360 // 30).astype(np.int64)
+        ascendant = (np.asarray(ascendant_longitudes, dtype=float) % 360 // 30).astype(np.int64)
+        self.house = (self.sign - ascendant[:, None]) % 12
+        self.sign_bit = 1 << self.sign
+        self.house_bit = 1 << self.house
+        self.aspects = ASPECT_MASKS[np.arange(len(PLANETS)), self.house]
+
+        lords = SIGN_LORDS[(ascendant[:, None] + np.arange(12)) % 12]
+        self.lord_house = np.take_along_axis(self.house, lords, axis=1)
+        self.lord_aspects = np.take_along_axis(self.aspects, lords, axis=1)
+
+    def __len__(self):
+        return len(self.sign)
+
+
+def encode_charts(charts):
+    """ChartEncoding of stored chart dicts"""
+    longitudes = [[chart['planets'][name]['longitude'] for name in PLANETS] for chart in charts]
+    ascendants = [chart['ascendant']['longitude'] for chart in charts]
+    return ChartEncoding(np.reshape(longitudes, (-1, len(PLANETS))), ascendants)
+
+
+def _house_mask(houses):
+    """Bitmask of 1-based houses"""
+    mask = 0
+    for house in houses:
+        mask |= 1 << (house - 1)
+    return mask
+
+
+def compile_condition(condition):
+    """Compile a condition tree into a function of a ChartEncoding -> bool array"""
+    op, *args = condition
+
+    if op == 'all':
+        parts = [compile_condition(c) for c in args]
+        return lambda enc: np.logical_and.reduce([part(enc) for part in parts])
+    if op == 'any':
+        parts = [compile_condition(c) for c in args]
+        return lambda enc: np.logical_or.reduce([part(enc) for part in parts])
+    if op == 'not':
+        part = compile_condition(args[0])
+        return lambda enc: ~part(enc)
+    if op == 'in_house':
+        p, mask = PLANET_INDEX[args[0]], _house_mask(args[1])
+        return lambda enc: (enc.house_bit[:, p] & mask) != 0
+    if op == 'from':
+        p, ref, mask = PLANET_INDEX[args[0]], PLANET_INDEX[args[1]], _house_mask(args[2])
+        return lambda enc: ((1 << (enc.house[:, p] - enc.house[:, ref]) % 12) & mask) != 0
+    if op == 'dignified':
+        p = PLANET_INDEX[args[0]]
+        mask = int(DIGNITY_SIGNS[p])
+        return lambda enc: (enc.sign_bit[:, p] & mask) != 0
+    if op == 'conjunct':
+        p, q = PLANET_INDEX[args[0]], PLANET_INDEX[args[1]]
+        return lambda enc: enc.sign[:, p] == enc.sign[:, q]
+    if op == 'lord_in_house':
+        h, mask = args[0] - 1, _house_mask(args[1])
+        return lambda enc: ((1 << enc.lord_house[:, h]) & mask) != 0
+    if op == 'lords_related':
+        a, b = args[0] - 1, args[1] - 1
+
+        def lords_related(enc):
+            house_a, house_b = enc.lord_house[:, a], enc.lord_house[:, b]
+            conjunct = house_a == house_b
+            mutual_aspect = (((enc.lord_aspects[:, a] >> house_b)
+                              & (enc.lord_aspects[:, b] >> house_a)) & 1) != 0
+            exchange = (house_a == b) & (house_b == a)
+            return conjunct | mutual_aspect | exchange
+        return lords_related
+    raise ValueError(f'Unknown yoga condition: {op}')
+
+
+def compile_rules(rules):
+    """Compile a rule catalogue into (names, metadata, predicates)"""
+    names = [name for name, _, _, _ in rules]
+    metadata = {name: {'name': name, 'category': category, 'description': description}
+                for name, category, description, _ in rules}
+    predicates = [compile_condition(condition) for _, _, _, condition in rules]
+    return names, metadata, predicates
+
+
+YOGA_NAMES, YOGA_METADATA, YOGA_PREDICATES = compile_rules(YOGA_RULES)
+
+
+def _check_names(names):
+    unknown = [name for name in names if name not in YOGA_METADATA]
+    if unknown:
+        raise ValueError(f"Unknown yogas: {', '.join(unknown)}")
+
+
+def evaluate(encoding, names=None):
+    """
+    Evaluate the compiled catalogue over a batch of charts
+
+    Args:
+        encoding: ChartEncoding of n charts
+        names: yoga names to evaluate (defaults to the whole catalogue)
+
+    Returns:
+        (names, bool array of shape (n, len(names)))
+    """
+    names = list(names) if names is not None else YOGA_NAMES
+    _check_names(names)
+    columns = [YOGA_PREDICATES[YOGA_NAMES.index(name)](encoding) for name in names]
+    return names, np.stack(columns, axis=1).reshape(len(encoding), len(names))
+
 
 def identify_yogas(chart_id):
-    """Identify classical yogas - TO BE IMPLEMENTED"""
-    return {
-        'error': 'Yoga identification not yet implemented',
-        'message': 'Classical yoga identification coming soon'
-    }
+    """
+    Identify classical yogas in a saved chart
+
+    Args:
+        chart_id: Birth chart UUID
+
+    Returns:
+        dict with the yogas present (name, category, description)
+    """
+    try:
+        chart = get_store(CHARTS_DIR).get(chart_id)
+        if chart is None:
+            return {'error': f'Chart {chart_id} not found'}
+
+        names, matrix = evaluate(encode_charts([chart]))
+        yogas = [YOGA_METADATA[name] for name, present in zip(names, matrix[0]) if present]
+        return {
+            'chart_id': chart_id,
+            'yogas': yogas,
+            'count': len(yogas)
+        }
+
+    except Exception as e:
+        import traceback
+        return {
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        }
+
+
+def scan_store(yogas=None, limit=DEFAULT_SCAN_LIMIT, batch_size=SCAN_BATCH):
+    """
+    Evaluate yogas across every stored chart
+
+    Args:
+        yogas: yoga names to look for (defaults to the whole catalogue)
+        limit: maximum chart IDs listed per yoga (counts are always exact)
+        batch_size: charts encoded and evaluated together
+
+    Returns:
+        dict with the number of charts scanned and, per yoga, its count
+        and matching chart IDs
+    """
+    try:
+        names = list(yogas) if yogas else YOGA_NAMES
+        _check_names(names)
+
+        matches = {name: {'count': 0, 'chart_ids': []} for name in names}
+        scanned = 0
+
+        def flush(batch):
+            _, matrix = evaluate(encode_charts(batch), names)
+            for column, name in enumerate(names):
+                hits = np.flatnonzero(matrix[:, column])
+                entry = matches[name]
+                entry['count'] += len(hits)
+                room = limit - len(entry['chart_ids'])
+                entry['chart_ids'] += [batch[i]['chart_id'] for i in hits[:max(room, 0)]]
+
+        batch = []
+        for chart in get_store(CHARTS_DIR).iter_charts():
+            batch.append(chart)
+            if len(batch) >= batch_size:
+                flush(batch)
+                scanned += len(batch)
+                batch = []
+        if batch:
+            flush(batch)
+            scanned += len(batch)
+
+        return {
+            'charts_scanned': scanned,
+            'yogas': matches
+        }
+
+    except Exception as e:
+        import traceback
+        return {
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        }
+
+
+def handle_request(input_data):
+    """Dispatch a CLI/worker request to the matching yoga operation"""
+    action = input_data.get('action', 'identify')
+
+    if action == 'identify':
+        return identify_yogas(input_data['chart_id'])
+    elif action == 'scan':
+        return scan_store(
+            input_data.get('yogas'),
+            min(int(input_data.get('limit', DEFAULT_SCAN_LIMIT)), MAX_SCAN_LIMIT)
+        )
+    else:
+        return {'error': f'Unknown action: {action}'}
+
 
 if __name__ == '__main__':
     try:
         input_data = json.loads(sys.argv[1])
-        result = identify_yogas(input_data['chart_id'])
+        result = handle_request(input_data)
         print(json.dumps(result))
     except Exception as e:
         print(json.dumps({'error': str(e)}), file=sys.stderr)
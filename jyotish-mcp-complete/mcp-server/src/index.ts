@@ -7,7 +7,10 @@ import {
   ListToolsRequestSchema,
   Tool,
 } from "@modelcontextprotocol/sdk/types.js";
-import { spawn } from "child_process";
+import { spawn, ChildProcessWithoutNullStreams } from "child_process";
+import { existsSync } from "fs";
+import { createInterface } from "readline";
+import { cpus } from "os";
 import { z } from "zod";
 import { fileURLToPath } from "url";
 import { dirname, join } from "path";
@@ -25,6 +28,20 @@ const BirthDataSchema = z.object({
   longitude: z.number().min(-180).max(180),
 });
 
+const BatchBirthDataSchema = z.object({
+  records: z.array(BirthDataSchema).min(1),
+});
+
+const ChartListSchema = z.object({
+  limit: z.number().int().min(1).max(500).optional(),
+  cursor: z.string().optional(),
+  name_prefix: z.string().optional(),
+  born_after: z.string().optional(), // ISO 8601
+  born_before: z.string().optional(), // ISO 8601
+  order_by: z.enum(["created", "name", "datetime"]).optional(),
+  direction: z.enum(["asc", "desc"]).optional(),
+});
+
 const ChartIdSchema = z.object({
   chart_id: z.string().uuid(),
 });
@@ -33,14 +50,31 @@ const DateSchema = z.object({
   date: z.string().optional(), // ISO 8601, defaults to now
 });
 
-const VargaSchema = z.object({
-  chart_id: z.string().uuid(),
-  varga: z.enum(["D1", "D2", "D3", "D7", "D9", "D10", "D12", "D30"]),
-});
+const GRAHAS = [
+  "Sun", "Moon", "Mars", "Mercury", "Jupiter", "Venus", "Saturn", "Rahu", "Ketu",
+] as const;
+
+const NATAL_POINTS = [...GRAHAS, "Ascendant"] as const;
+
+const VARGAS = [
+  "D1", "D2", "D3", "D4", "D7", "D9", "D10", "D12",
+  "D16", "D20", "D24", "D27", "D30", "D40", "D45", "D60",
+] as const;
+
+const VargaSchema = z
+  .object({
+    chart_id: z.string().uuid(),
+    varga: z.enum(VARGAS).optional(),
+    vargas: z.array(z.enum(VARGAS)).min(1).optional(),
+  })
+  .refine((value) => value.varga !== undefined || value.vargas !== undefined, {
+    message: "Either varga or vargas is required",
+  });
 
 const CompatibilitySchema = z.object({
   chart_id_1: z.string().uuid(),
   chart_id_2: z.string().uuid(),
+  manglik: z.boolean().optional(),
 });
 
 // Tool definitions
@@ -48,7 +82,7 @@ const TOOLS: Tool[] = [
   {
     name: "chart_create",
     description:
-      "Calculate a complete Vedic birth chart from birth data. Returns a chart_id for future reference. Includes D1 (birth chart), D9 (navamsa), planetary positions, houses, nakshatras, and Vimshottari Dasha periods.",
+      "Calculate a complete Vedic birth chart from birth data. Returns a chart_id for future reference; submitting identical birth data again returns the same chart_id. Includes D1 (birth chart), D9 (navamsa), planetary positions, houses, nakshatras, and Vimshottari Dasha periods.",
     inputSchema: {
       type: "object",
       properties: {
@@ -76,6 +110,32 @@ const TOOLS: Tool[] = [
       required: ["datetime", "timezone", "latitude", "longitude"],
     },
   },
+  {
+    name: "chart_create_batch",
+    description:
+      "Calculate and store many Vedic birth charts in one call (bulk onboarding). Returns the chart_id, name and datetime of each created chart in input order, plus the index and reason of any record that could not be calculated.",
+    inputSchema: {
+      type: "object",
+      properties: {
+        records: {
+          type: "array",
+          description: "Birth records, each with the same fields as chart_create",
+          items: {
+            type: "object",
+            properties: {
+              name: { type: "string" },
+              datetime: { type: "string" },
+              timezone: { type: "string" },
+              latitude: { type: "number" },
+              longitude: { type: "number" },
+            },
+            required: ["datetime", "timezone", "latitude", "longitude"],
+          },
+        },
+      },
+      required: ["records"],
+    },
+  },
   {
     name: "chart_read",
     description:
@@ -94,16 +154,47 @@ const TOOLS: Tool[] = [
   {
     name: "chart_list",
     description:
-      "List all stored charts with basic information (name, date, location). Useful for selecting which chart to analyze.",
+      "List stored charts with basic information (chart_id, name, birth datetime), one page at a time. Useful for selecting which chart to analyze. Pass the returned next_cursor to get the following page (with the same filters and order); it is null on the last page.",
     inputSchema: {
       type: "object",
-      properties: {},
+      properties: {
+        limit: {
+          type: "number",
+          description: "Charts per page, 1-500 (default 50)",
+        },
+        cursor: {
+          type: "string",
+          description: "next_cursor from the previous page",
+        },
+        name_prefix: {
+          type: "string",
+          description: "Only charts whose name starts with this (case-sensitive)",
+        },
+        born_after: {
+          type: "string",
+          description: "Only births at or after this ISO 8601 datetime",
+        },
+        born_before: {
+          type: "string",
+          description: "Only births before this ISO 8601 datetime",
+        },
+        order_by: {
+          type: "string",
+          enum: ["created", "name", "datetime"],
+          description: "Sort key (default: created)",
+        },
+        direction: {
+          type: "string",
+          enum: ["asc", "desc"],
+          description: "Sort direction (default: asc)",
+        },
+      },
     },
   },
   {
     name: "dasha_current",
     description:
-      "Get the current running Vimshottari Dasha periods (Maha Dasha, Antar Dasha, Pratyantar Dasha) for a chart. Can specify a date or defaults to current time. Includes ruling planets, start/end dates, and remaining balance.",
+      "Get the current running Vimshottari Dasha periods (Maha Dasha, Antar Dasha, Pratyantar Dasha, and optionally Sookshma and Prana) for a chart. Can specify a date or defaults to current time. Includes ruling planets, start/end dates, and remaining balance.",
     inputSchema: {
       type: "object",
       properties: {
@@ -115,6 +206,91 @@ const TOOLS: Tool[] = [
           type: "string",
           description: "Optional date in ISO 8601 format (defaults to now)",
         },
+        depth: {
+          type: "number",
+          description:
+            "Levels to include: 1 Maha, 2 Antar, 3 Pratyantar (default), 4 Sookshma, 5 Prana",
+        },
+        year_days: {
+          type: "number",
+          description: "Days per dasha year: 365.25 (default) or 360 (savana)",
+        },
+      },
+      required: ["chart_id"],
+    },
+  },
+  {
+    name: "dasha_periods",
+    description:
+      "List the Vimshottari Dasha periods of one level (Maha down to Prana) that fall within a date range, in time order. Each period includes its lord path (e.g. Jupiter > Venus > Moon). Only the branches inside the range are calculated.",
+    inputSchema: {
+      type: "object",
+      properties: {
+        chart_id: {
+          type: "string",
+          description: "UUID of the chart",
+        },
+        start_date: {
+          type: "string",
+          description: "Start of the range (ISO 8601)",
+        },
+        end_date: {
+          type: "string",
+          description: "End of the range (ISO 8601)",
+        },
+        depth: {
+          type: "number",
+          description: "Level to list: 1 Maha, 2 Antar (default), 3 Pratyantar, 4 Sookshma, 5 Prana",
+        },
+        limit: {
+          type: "number",
+          description: "Maximum periods to return (default and maximum 5000)",
+        },
+        year_days: {
+          type: "number",
+          description: "Days per dasha year: 365.25 (default) or 360 (savana)",
+        },
+      },
+      required: ["chart_id", "start_date", "end_date"],
+    },
+  },
+  {
+    name: "dasha_timeline",
+    description:
+      "Get the running Vimshottari Dasha lords (Maha, Antar, Pratyantar by default) for many dates of one chart in a single call, e.g. monthly over 40 years for a timeline view. Pass either a list of dates or a start/end date with a step.",
+    inputSchema: {
+      type: "object",
+      properties: {
+        chart_id: {
+          type: "string",
+          description: "UUID of the chart",
+        },
+        dates: {
+          type: "array",
+          items: { type: "string" },
+          description: "ISO 8601 dates (any order; results follow the input order)",
+        },
+        start_date: {
+          type: "string",
+          description: "Start of a regular range (ISO 8601), used when dates is omitted",
+        },
+        end_date: {
+          type: "string",
+          description: "End of the range, inclusive (ISO 8601)",
+        },
+        step: {
+          type: "string",
+          enum: ["day", "week", "month", "year"],
+          description: "Spacing of the range (default: month)",
+        },
+        depth: {
+          type: "number",
+          description: "Levels to include: 1 Maha to 5 Prana (default 3)",
+        },
+        year_days: {
+          type: "number",
+          description: "Days per dasha year: 365.25 (default) or 360 (savana)",
+        },
       },
       required: ["chart_id"],
     },
@@ -138,10 +314,119 @@ const TOOLS: Tool[] = [
       required: ["chart_id"],
     },
   },
+  {
+    name: "transit_range",
+    description:
+      "Get transit snapshots (planet positions, rashi, nakshatra and house from the natal ascendant) across a date range at a fixed step, e.g. daily for a year. Returned as newline-delimited JSON, one snapshot per line; progress is reported while the range is computed. At most 2000 snapshots per call: use a larger step or split longer ranges.",
+    inputSchema: {
+      type: "object",
+      properties: {
+        chart_id: {
+          type: "string",
+          description: "UUID of the chart",
+        },
+        start_date: {
+          type: "string",
+          description: "First snapshot (ISO 8601)",
+        },
+        end_date: {
+          type: "string",
+          description: "End of the range, inclusive (ISO 8601)",
+        },
+        step: {
+          type: "string",
+          enum: ["hour", "day", "week"],
+          description: "Spacing of the snapshots (default: day)",
+        },
+      },
+      required: ["chart_id", "start_date", "end_date"],
+    },
+  },
+  {
+    name: "transit_charts",
+    description:
+      "Find every stored chart a transit is hitting on a date, without checking charts one by one. Either use a named pattern (sade_sati: Saturn in the 12th, 1st or 2nd sign from the natal Moon; ashtama_shani; jupiter_over_ascendant; saturn_over_ascendant) or give the transit planet, natal point, placement kind and offsets. Returns chart IDs page by page.",
+    inputSchema: {
+      type: "object",
+      properties: {
+        pattern: {
+          type: "string",
+          enum: ["sade_sati", "ashtama_shani", "jupiter_over_ascendant", "saturn_over_ascendant"],
+          description: "Named transit pattern (overrides the fields below)",
+        },
+        transit_planet: {
+          type: "string",
+          enum: [...GRAHAS],
+          description: "Transiting planet",
+        },
+        natal_point: {
+          type: "string",
+          enum: [...NATAL_POINTS],
+          description: "Natal planet or Ascendant being transited",
+        },
+        kind: {
+          type: "string",
+          enum: ["sign", "nakshatra", "pada"],
+          description: "Placement compared (default: sign)",
+        },
+        offsets: {
+          type: "array",
+          items: { type: "number" },
+          description:
+            "Distances of the transit from the natal placement that count, in signs/nakshatras/padas (default [0], same placement)",
+        },
+        date: {
+          type: "string",
+          description: "Optional date in ISO 8601 format (defaults to now)",
+        },
+        limit: {
+          type: "number",
+          description: "Chart IDs per page (default 1000, maximum 10000)",
+        },
+        cursor: {
+          type: "string",
+          description: "next_cursor from the previous page",
+        },
+      },
+    },
+  },
+  {
+    name: "transit_events",
+    description:
+      "Find the exact times a planet changes sign, nakshatra, pada or navamsa within a date range, e.g. when Saturn enters Aquarius or every Moon nakshatra change this month. Retrograde back-and-forth crossings are listed separately with their direction.",
+    inputSchema: {
+      type: "object",
+      properties: {
+        planet: {
+          type: "string",
+          enum: [...GRAHAS],
+          description: "Planet to follow",
+        },
+        start_date: {
+          type: "string",
+          description: "Start of the range (ISO 8601)",
+        },
+        end_date: {
+          type: "string",
+          description: "End of the range (ISO 8601)",
+        },
+        boundary: {
+          type: "string",
+          enum: ["sign", "nakshatra", "pada", "navamsa"],
+          description: "Which boundaries to report (default: sign)",
+        },
+        limit: {
+          type: "number",
+          description: "Maximum events to return (default and maximum 5000)",
+        },
+      },
+      required: ["planet", "start_date", "end_date"],
+    },
+  },
   {
     name: "divisional_read",
     description:
-      "Retrieve a specific divisional chart (varga). D9 (Navamsa) is most important for relationships and dharma. Other divisions analyze specific life domains: D2 (wealth), D3 (siblings), D7 (children), D10 (career), D12 (parents), D30 (misfortunes).",
+      "Retrieve divisional charts (vargas). D9 (Navamsa) is most important for relationships and dharma. Other divisions analyze specific life domains: D2 (wealth), D3 (siblings), D7 (children), D10 (career), D12 (parents), D30 (misfortunes), D60 (past karma). Pass 'vargas' to get several (e.g. the whole Shodasha set) in one call.",
     inputSchema: {
       type: "object",
       properties: {
@@ -151,11 +436,16 @@ const TOOLS: Tool[] = [
         },
         varga: {
           type: "string",
-          enum: ["D1", "D2", "D3", "D7", "D9", "D10", "D12", "D30"],
+          enum: [...VARGAS],
           description: "Divisional chart type (D1=birth, D9=navamsa, etc.)",
         },
+        vargas: {
+          type: "array",
+          items: { type: "string", enum: [...VARGAS] },
+          description: "Several divisional chart types, computed together (use instead of varga)",
+        },
       },
-      required: ["chart_id", "varga"],
+      required: ["chart_id"],
     },
   },
   {
@@ -173,71 +463,505 @@ const TOOLS: Tool[] = [
       required: ["chart_id"],
     },
   },
+  {
+    name: "yogas_scan",
+    description:
+      "Find which stored charts have given yogas, evaluating the yoga rules over every chart in one batch pass. Returns a count per yoga and the matching chart IDs (up to the limit). Yoga names are those reported by yogas_identify, e.g. 'Gaja Kesari Yoga'.",
+    inputSchema: {
+      type: "object",
+      properties: {
+        yogas: {
+          type: "array",
+          items: { type: "string" },
+          description: "Yoga names to look for (defaults to all)",
+        },
+        limit: {
+          type: "number",
+          description: "Maximum chart IDs listed per yoga (default 1000)",
+        },
+      },
+    },
+  },
   {
     name: "compatibility_analyze",
     description:
-      "Analyze compatibility between two charts for relationships. Uses traditional Kuta system, cross-aspects between charts, and comparative analysis of key factors (Moon, Venus, 7th house).",
+      "Analyze compatibility between two charts with Ashtakoota (Guna Milan) matching. Scores the eight kootas of the two Moon nakshatra padas out of 36 points, flags Nadi and Bhakoot dosha, and checks Manglik dosha of both charts.",
     inputSchema: {
       type: "object",
       properties: {
         chart_id_1: {
           type: "string",
-          description: "UUID of first chart",
+          description: "UUID of the groom's chart",
         },
         chart_id_2: {
           type: "string",
-          description: "UUID of second chart",
+          description: "UUID of the bride's chart",
+        },
+        manglik: {
+          type: "boolean",
+          description: "Also check Manglik dosha (default: true)",
         },
       },
       required: ["chart_id_1", "chart_id_2"],
     },
   },
+  {
+    name: "compatibility_matches",
+    description:
+      "Rank the best Ashtakoota matches for one chart among all stored charts. Every stored chart is scored against the given chart in one batch pass; filters drop low totals and Nadi, Bhakoot or Manglik dosha before the top matches are selected.",
+    inputSchema: {
+      type: "object",
+      properties: {
+        chart_id: {
+          type: "string",
+          description: "UUID of the chart to find matches for",
+        },
+        role: {
+          type: "string",
+          enum: ["groom", "bride"],
+          description: "Role of that chart; stored charts take the other role (default: groom)",
+        },
+        top_k: {
+          type: "number",
+          description: "Number of matches returned (default 50, max 1000)",
+        },
+        min_score: {
+          type: "number",
+          description: "Minimum total points out of 36",
+        },
+        exclude_nadi: {
+          type: "boolean",
+          description: "Drop matches with Nadi dosha",
+        },
+        exclude_bhakoot: {
+          type: "boolean",
+          description: "Drop matches with Bhakoot dosha",
+        },
+        exclude_manglik: {
+          type: "boolean",
+          description: "Drop matches whose Manglik status differs from the chart's",
+        },
+      },
+      required: ["chart_id"],
+    },
+  },
 ];
 
-// Helper function to call Python calculation engine
-async function callPythonCalculator(
-  scriptName: string,
-  args: Record<string, any>
-): Promise<any> {
-  return new Promise((resolve, reject) => {
-    // Use path relative to this file: mcp-server/dist/index.js -> ../../calculations/
-    const calculationsPath = join(__dirname, "..", "..", "calculations");
-    const scriptPath = join(calculationsPath, `${scriptName}.py`);
-    const pythonPath = join(calculationsPath, "venv", "bin", "python");
-    
-    // Use venv Python if available, otherwise fall back to python3
-    const python = spawn(pythonPath, [scriptPath, JSON.stringify(args)], {
-      cwd: calculationsPath
+// Python calculation engine paths, relative to this file:
+// mcp-server/dist/index.js -> ../../calculations/
+const calculationsPath = join(__dirname, "..", "..", "calculations");
+const venvPython = join(calculationsPath, "venv", "bin", "python");
+
+// Use venv Python if available, otherwise fall back to python3
+function resolvePythonPath(): string {
+  return existsSync(venvPython) ? venvPython : "python3";
+}
+
+// Engine pool settings, overridable through the environment
+function envInt(name: string, fallback: number): number {
+  const value = Number.parseInt(process.env[name] ?? "", 10);
+  return Number.isFinite(value) && value > 0 ? value : fallback;
+}
+
+const POOL_SIZE = envInt("JYOTISH_ENGINE_WORKERS", cpus().length || 1);
+const MAX_IN_FLIGHT = envInt("JYOTISH_ENGINE_MAX_IN_FLIGHT", 1);
+const MAX_REQUESTS_PER_WORKER = envInt("JYOTISH_ENGINE_MAX_REQUESTS", 1000);
+const MAX_WORKER_MEMORY_MB = envInt("JYOTISH_ENGINE_MAX_MEMORY_MB", 512);
+const HEALTH_INTERVAL_MS = envInt("JYOTISH_ENGINE_HEALTH_INTERVAL_MS", 30000);
+const HEALTH_TIMEOUT_MS = envInt("JYOTISH_ENGINE_HEALTH_TIMEOUT_MS", 10000);
+const QUEUE_TIMEOUT_MS = envInt("JYOTISH_ENGINE_QUEUE_TIMEOUT_MS", 60000);
+const REQUEST_TIMEOUT_MS = envInt("JYOTISH_ENGINE_REQUEST_TIMEOUT_MS", 300000);
+
+// Delay before replacing a crashed worker; doubles while workers keep
+// crashing, up to the maximum, and resets after a successful reply
+const INITIAL_RESTART_DELAY_MS = 250;
+const MAX_RESTART_DELAY_MS = 30000;
+
+// Tool results are pretty-printed for reading; JYOTISH_COMPACT_JSON=1 sends
+// them as single-line JSON instead, for clients that parse them
+const COMPACT_JSON = process.env.JYOTISH_COMPACT_JSON === "1";
+
+// transit_range joins every snapshot into one tool result, so it is capped
+// like the engine's non-stream 'range' action (MAX_COLLECTED_SNAPSHOTS)
+const MAX_RANGE_SNAPSHOTS = 2000;
+
+function formatResult(result: unknown): string {
+  return COMPACT_JSON ? JSON.stringify(result) : JSON.stringify(result, null, 2);
+}
+
+interface PendingRequest {
+  resolve: (value: any) => void;
+  reject: (reason: Error) => void;
+  // Set for stream requests: called with each item as the engine sends it
+  onItem?: (item: any) => void;
+}
+
+interface QueuedCall extends PendingRequest {
+  scriptName: string;
+  args: Record<string, any>;
+  // Rejects the call if no worker takes it within QUEUE_TIMEOUT_MS
+  deadline?: NodeJS.Timeout;
+}
+
+// One long-lived Python engine process (calculations/engine_worker.py).
+// Requests and responses are newline-delimited JSON matched by id, so the
+// interpreter, swisseph and ephemeris setup are paid once per process.
+class EngineWorker {
+  readonly child: ChildProcessWithoutNullStreams;
+  private pending = new Map<number, PendingRequest>();
+  private nextId = 1;
+  private stderrTail = "";
+  inFlight = 0;
+  served = 0;
+  memoryMb = 0;
+  draining = false;
+  exited = false;
+
+  constructor(onExit: (worker: EngineWorker, error: Error) => void) {
+    const workerPath = join(calculationsPath, "engine_worker.py");
+    this.child = spawn(resolvePythonPath(), [workerPath], {
+      cwd: calculationsPath,
+      env: { ...process.env },
+    });
+
+    createInterface({ input: this.child.stdout }).on("line", (line) => {
+      this.handleLine(line);
     });
 
-    let stdout = "";
-    let stderr = "";
+    this.child.stderr.on("data", (data) => {
+      // Keep only the tail for error reports; forward everything to our stderr
+      const text = data.toString();
+      process.stderr.write(`[engine ${this.child.pid}] ${text}`);
+      this.stderrTail = (this.stderrTail + text).slice(-4000);
+    });
+
+    const exit = (error: Error) => {
+      if (this.exited) {
+        return;
+      }
+      this.exited = true;
+      for (const request of this.pending.values()) {
+        request.reject(error);
+      }
+      this.pending.clear();
+      onExit(this, error);
+    };
 
-    python.stdout.on("data", (data) => {
-      stdout += data.toString();
+    this.child.on("error", (err) => {
+      exit(new Error(`Failed to spawn Python process: ${err.message}`));
     });
 
-    python.stderr.on("data", (data) => {
-      stderr += data.toString();
+    this.child.on("exit", (code, signal) => {
+      exit(
+        new Error(
+          `Python engine exited (code ${code}, signal ${signal}):\n${this.stderrTail}`
+        )
+      );
     });
+  }
 
-    python.on("close", (code) => {
-      if (code !== 0) {
-        reject(new Error(`Python script failed: ${stderr}`));
-      } else {
-        try {
-          const result = JSON.parse(stdout);
-          resolve(result);
-        } catch (e) {
-          reject(new Error(`Failed to parse Python output: ${stdout}`));
-        }
+  // Accepts new work: alive, not being recycled, and under its in-flight limit
+  get available(): boolean {
+    return !this.exited && !this.draining && this.inFlight < MAX_IN_FLIGHT;
+  }
+
+  async request(
+    scriptName: string,
+    args: Record<string, any>,
+    onItem?: (item: any) => void
+  ): Promise<any> {
+    this.inFlight++;
+    // Busy workers are not health-checked, so a call that gets no reply (or,
+    // for a stream, no item) within the deadline kills its worker; the pool
+    // then replaces it and the worker's other calls fail with the exit
+    let timer: NodeJS.Timeout | undefined;
+    let rearm = () => {};
+    const deadline = new Promise<never>((_, reject) => {
+      rearm = () => {
+        clearTimeout(timer);
+        timer = setTimeout(() => {
+          reject(new Error(`No reply from Python engine in ${REQUEST_TIMEOUT_MS}ms`));
+          this.child.kill();
+        }, REQUEST_TIMEOUT_MS);
+      };
+      rearm();
+    });
+    try {
+      const message = onItem
+        ? { script: scriptName, args, stream: true }
+        : { script: scriptName, args };
+      const itemHandler = onItem
+        ? (item: any) => {
+            rearm();
+            onItem(item);
+          }
+        : undefined;
+      return await Promise.race([this.send(message, itemHandler), deadline]);
+    } finally {
+      clearTimeout(timer);
+      this.inFlight--;
+      this.served++;
+      if (this.draining && this.inFlight === 0) {
+        this.shutdown();
       }
+    }
+  }
+
+  // Health check: the worker answers with its pid and resident memory
+  async ping(): Promise<void> {
+    let timer: NodeJS.Timeout | undefined;
+    const timeout = new Promise<never>((_, reject) => {
+      timer = setTimeout(
+        () => reject(new Error(`no ping reply in ${HEALTH_TIMEOUT_MS}ms`)),
+        HEALTH_TIMEOUT_MS
+      );
     });
-    
-    python.on("error", (err) => {
-      reject(new Error(`Failed to spawn Python process: ${err.message}`));
+    try {
+      const reply = await Promise.race([this.send({ op: "ping" }), timeout]);
+      this.memoryMb = reply.memory_mb ?? 0;
+    } finally {
+      clearTimeout(timer);
+    }
+  }
+
+  // Stop taking work and exit once in-flight requests have finished
+  drain(): void {
+    this.draining = true;
+    if (this.inFlight === 0) {
+      this.shutdown();
+    }
+  }
+
+  // The engine imports calculators on first use; ask it to load them all now,
+  // in the background, so the first tool call does not pay for the imports
+  warm(): void {
+    this.send({ op: "warm" }).catch(() => {
+      // An import error resurfaces, with its traceback, on the first request
     });
-  });
+  }
+
+  shutdown(): void {
+    // Closing stdin ends the worker's read loop; kill is the fallback
+    this.child.stdin.end();
+    setTimeout(() => this.child.kill(), HEALTH_TIMEOUT_MS).unref();
+  }
+
+  private send(
+    message: Record<string, any>,
+    onItem?: (item: any) => void
+  ): Promise<any> {
+    if (this.exited) {
+      return Promise.reject(new Error("Python engine is not running"));
+    }
+    const id = this.nextId++;
+    return new Promise((resolve, reject) => {
+      this.pending.set(id, { resolve, reject, onItem });
+      this.child.stdin.write(JSON.stringify({ id, ...message }) + "\n");
+    });
+  }
+
+  private handleLine(line: string): void {
+    let message: any;
+    try {
+      message = JSON.parse(line);
+    } catch (e) {
+      console.error(`[Jyotish MCP] Unparseable engine output: ${line}`);
+      return;
+    }
+
+    const request = this.pending.get(message.id);
+    if (!request) {
+      console.error(`[Jyotish MCP] Engine reply for unknown id: ${line}`);
+      return;
+    }
+
+    // Stream items arrive before the final result or error line
+    if ("item" in message) {
+      request.onItem?.(message.item);
+      return;
+    }
+    this.pending.delete(message.id);
+
+    if ("error" in message) {
+      request.reject(new Error(`Python engine failed: ${message.error}`));
+    } else {
+      request.resolve(message.result);
+    }
+  }
+}
+
+// Pool of engine workers. Calls are routed to the least loaded worker with
+// spare capacity and queue otherwise; workers are recycled after a number of
+// requests or when they grow past the memory limit, and replaced if they die.
+class EnginePool {
+  private workers: EngineWorker[] = [];
+  private queue: QueuedCall[] = [];
+  private restartDelayMs = INITIAL_RESTART_DELAY_MS;
+  private healthTimer: NodeJS.Timeout | null = null;
+  private stopped = false;
+
+  start(): void {
+    while (this.workers.length < POOL_SIZE) {
+      this.spawnWorker();
+    }
+    if (!this.healthTimer) {
+      this.healthTimer = setInterval(() => this.checkHealth(), HEALTH_INTERVAL_MS);
+      this.healthTimer.unref();
+    }
+    console.error(
+      `[Jyotish MCP] Engine pool started: ${POOL_SIZE} workers, ` +
+        `${MAX_IN_FLIGHT} in flight each`
+    );
+  }
+
+  request(
+    scriptName: string,
+    args: Record<string, any>,
+    onItem?: (item: any) => void
+  ): Promise<any> {
+    if (this.stopped) {
+      return Promise.reject(new Error("Python engine pool is stopped"));
+    }
+    return new Promise((resolve, reject) => {
+      const call: QueuedCall = { scriptName, args, resolve, reject, onItem };
+      // Without a deadline, calls would wait out every restart backoff of a
+      // crash-looping engine
+      call.deadline = setTimeout(() => {
+        this.queue = this.queue.filter((c) => c !== call);
+        reject(new Error(`No Python engine took the call within ${QUEUE_TIMEOUT_MS}ms`));
+      }, QUEUE_TIMEOUT_MS);
+      this.queue.push(call);
+      this.dispatch();
+    });
+  }
+
+  stop(): void {
+    this.stopped = true;
+    if (this.healthTimer) {
+      clearInterval(this.healthTimer);
+    }
+    for (const worker of this.workers) {
+      worker.child.kill();
+    }
+    for (const call of this.queue) {
+      clearTimeout(call.deadline);
+      call.reject(new Error("Python engine pool is stopped"));
+    }
+    this.queue = [];
+  }
+
+  private dispatch(): void {
+    while (this.queue.length > 0) {
+      const worker = this.leastLoaded();
+      if (!worker) {
+        return;
+      }
+      const call = this.queue.shift()!;
+      clearTimeout(call.deadline);
+      worker
+        .request(call.scriptName, call.args, call.onItem)
+        .then((result) => {
+          // A worker that replies is healthy: stop backing off restarts.
+          // Failed calls (including crashes) leave the backoff growing.
+          this.restartDelayMs = INITIAL_RESTART_DELAY_MS;
+          call.resolve(result);
+        }, call.reject)
+        .finally(() => {
+          if (worker.served >= MAX_REQUESTS_PER_WORKER) {
+            this.recycle(worker, `served ${worker.served} requests`);
+          }
+          this.dispatch();
+        });
+    }
+  }
+
+  private leastLoaded(): EngineWorker | undefined {
+    let best: EngineWorker | undefined;
+    for (const worker of this.workers) {
+      if (worker.available && (!best || worker.inFlight < best.inFlight)) {
+        best = worker;
+      }
+    }
+    return best;
+  }
+
+  private spawnWorker(): void {
+    const worker = new EngineWorker((w, error) => this.handleExit(w, error));
+    this.workers.push(worker);
+    worker.warm();
+  }
+
+  // Replace a worker with a fresh one and let the old one finish its work
+  private recycle(worker: EngineWorker, reason: string): void {
+    if (worker.draining || worker.exited) {
+      return;
+    }
+    console.error(`[Jyotish MCP] Recycling engine ${worker.child.pid}: ${reason}`);
+    this.workers = this.workers.filter((w) => w !== worker);
+    worker.drain();
+    this.spawnWorker();
+  }
+
+  private handleExit(worker: EngineWorker, error: Error): void {
+    const wasActive = this.workers.includes(worker);
+    this.workers = this.workers.filter((w) => w !== worker);
+    if (this.stopped || !wasActive) {
+      return;
+    }
+
+    // Unexpected exit: replace it, backing off if workers keep crashing
+    console.error(`[Jyotish MCP] ${error.message}`);
+    console.error(`[Jyotish MCP] Replacing engine in ${this.restartDelayMs}ms`);
+    setTimeout(() => {
+      if (!this.stopped && this.workers.length < POOL_SIZE) {
+        this.spawnWorker();
+        this.dispatch();
+      }
+    }, this.restartDelayMs);
+    this.restartDelayMs = Math.min(this.restartDelayMs * 2, MAX_RESTART_DELAY_MS);
+  }
+
+  private checkHealth(): void {
+    for (const worker of this.workers) {
+      // Busy workers prove liveness by answering; only probe idle ones
+      if (worker.inFlight > 0 || worker.draining) {
+        continue;
+      }
+      worker
+        .ping()
+        .then(() => {
+          if (worker.memoryMb > MAX_WORKER_MEMORY_MB) {
+            this.recycle(worker, `using ${worker.memoryMb}MB`);
+          }
+        })
+        .catch((err) => {
+          console.error(
+            `[Jyotish MCP] Engine ${worker.child.pid} failed health check: ${err.message}`
+          );
+          worker.child.kill();
+        });
+    }
+  }
+}
+
+const engine = new EnginePool();
+
+// Helper function to call Python calculation engine
+async function callPythonCalculator(
+  scriptName: string,
+  args: Record<string, any>
+): Promise<any> {
+  return engine.request(scriptName, args);
+}
+
+// Stream request: onItem sees each result item as the engine computes it;
+// resolves with the engine's summary once the stream ends
+async function streamPythonCalculator(
+  scriptName: string,
+  args: Record<string, any>,
+  onItem: (item: any) => void
+): Promise<any> {
+  return engine.request(scriptName, args, onItem);
 }
 
 // Tool handlers
@@ -251,7 +975,23 @@ async function handleChartCreate(args: any) {
     content: [
       {
         type: "text",
-        text: JSON.stringify(result, null, 2),
+        text: formatResult(result),
+      },
+    ],
+  };
+}
+
+async function handleChartCreateBatch(args: any) {
+  const validated = BatchBirthDataSchema.parse(args);
+  const result = await callPythonCalculator("chart_calculator", {
+    action: "create_batch",
+    ...validated,
+  });
+  return {
+    content: [
+      {
+        type: "text",
+        text: formatResult(result),
       },
     ],
   };
@@ -267,21 +1007,23 @@ async function handleChartRead(args: any) {
     content: [
       {
         type: "text",
-        text: JSON.stringify(result, null, 2),
+        text: formatResult(result),
       },
     ],
   };
 }
 
 async function handleChartList(args: any) {
+  const validated = ChartListSchema.parse(args ?? {});
   const result = await callPythonCalculator("chart_calculator", {
     action: "list",
+    ...validated,
   });
   return {
     content: [
       {
         type: "text",
-        text: JSON.stringify(result, null, 2),
+        text: formatResult(result),
       },
     ],
   };
@@ -292,6 +1034,8 @@ async function handleDashaCurrent(args: any) {
     .object({
       chart_id: z.string().uuid(),
       date: z.string().optional(),
+      depth: z.number().int().min(1).max(5).optional(),
+      year_days: z.number().positive().optional(),
     })
     .parse(args);
   const result = await callPythonCalculator("dasha_calculator", {
@@ -302,7 +1046,64 @@ async function handleDashaCurrent(args: any) {
     content: [
       {
         type: "text",
-        text: JSON.stringify(result, null, 2),
+        text: formatResult(result),
+      },
+    ],
+  };
+}
+
+async function handleDashaPeriods(args: any) {
+  const validated = z
+    .object({
+      chart_id: z.string().uuid(),
+      start_date: z.string(),
+      end_date: z.string(),
+      depth: z.number().int().min(1).max(5).optional(),
+      year_days: z.number().positive().optional(),
+      limit: z.number().int().min(1).max(5000).optional(),
+    })
+    .parse(args);
+  const result = await callPythonCalculator("dasha_calculator", {
+    action: "periods",
+    ...validated,
+  });
+  return {
+    content: [
+      {
+        type: "text",
+        text: formatResult(result),
+      },
+    ],
+  };
+}
+
+async function handleDashaTimeline(args: any) {
+  const validated = z
+    .object({
+      chart_id: z.string().uuid(),
+      dates: z.array(z.string()).min(1).max(20000).optional(),
+      start_date: z.string().optional(),
+      end_date: z.string().optional(),
+      step: z.enum(["day", "week", "month", "year"]).optional(),
+      depth: z.number().int().min(1).max(5).optional(),
+      year_days: z.number().positive().optional(),
+    })
+    .refine(
+      (value) =>
+        value.dates !== undefined ||
+        (value.start_date !== undefined && value.end_date !== undefined),
+      { message: "Either dates or start_date and end_date are required" }
+    )
+    .parse(args);
+  const result = await callPythonCalculator("dasha_calculator", {
+    action: "timeline",
+    ...validated,
+  });
+  return {
+    content: [
+      {
+        type: "text",
+        text: formatResult(result),
       },
     ],
   };
@@ -323,7 +1124,97 @@ async function handleTransitNow(args: any) {
     content: [
       {
         type: "text",
-        text: JSON.stringify(result, null, 2),
+        text: formatResult(result),
+      },
+    ],
+  };
+}
+
+async function handleTransitRange(
+  args: any,
+  onProgress: (snapshots: number) => void
+) {
+  const validated = z
+    .object({
+      chart_id: z.string().uuid(),
+      start_date: z.string(),
+      end_date: z.string(),
+      step: z.enum(["hour", "day", "week"]).optional(),
+    })
+    .parse(args);
+  const lines: string[] = [];
+  await streamPythonCalculator(
+    "transit_calculator",
+    { action: "range", ...validated, max_snapshots: MAX_RANGE_SNAPSHOTS },
+    (snapshot) => {
+      lines.push(JSON.stringify(snapshot));
+      onProgress(lines.length);
+    }
+  );
+  return {
+    content: [
+      {
+        type: "text",
+        text: lines.join("\n"),
+      },
+    ],
+  };
+}
+
+async function handleTransitCharts(args: any) {
+  const validated = z
+    .object({
+      pattern: z
+        .enum(["sade_sati", "ashtama_shani", "jupiter_over_ascendant", "saturn_over_ascendant"])
+        .optional(),
+      transit_planet: z.enum(GRAHAS).optional(),
+      natal_point: z.enum(NATAL_POINTS).optional(),
+      kind: z.enum(["sign", "nakshatra", "pada"]).optional(),
+      offsets: z.array(z.number().int()).min(1).optional(),
+      date: z.string().optional(),
+      limit: z.number().int().min(1).max(10000).optional(),
+      cursor: z.string().optional(),
+    })
+    .refine(
+      (value) =>
+        value.pattern !== undefined ||
+        (value.transit_planet !== undefined && value.natal_point !== undefined),
+      { message: "Either pattern or transit_planet and natal_point are required" }
+    )
+    .parse(args);
+  const result = await callPythonCalculator("transit_calculator", {
+    action: "charts",
+    ...validated,
+  });
+  return {
+    content: [
+      {
+        type: "text",
+        text: formatResult(result),
+      },
+    ],
+  };
+}
+
+async function handleTransitEvents(args: any) {
+  const validated = z
+    .object({
+      planet: z.enum(GRAHAS),
+      start_date: z.string(),
+      end_date: z.string(),
+      boundary: z.enum(["sign", "nakshatra", "pada", "navamsa"]).optional(),
+      limit: z.number().int().min(1).max(5000).optional(),
+    })
+    .parse(args);
+  const result = await callPythonCalculator("transit_calculator", {
+    action: "events",
+    ...validated,
+  });
+  return {
+    content: [
+      {
+        type: "text",
+        text: formatResult(result),
       },
     ],
   };
@@ -339,7 +1230,7 @@ async function handleDivisionalRead(args: any) {
     content: [
       {
         type: "text",
-        text: JSON.stringify(result, null, 2),
+        text: formatResult(result),
       },
     ],
   };
@@ -355,12 +1246,33 @@ async function handleYogasIdentify(args: any) {
     content: [
       {
         type: "text",
-        text: JSON.stringify(result, null, 2),
+        text: formatResult(result),
+      },
+    ],
+  };
+}
+async function handleYogasScan(args: any) {
+  const validated = z
+    .object({
+      yogas: z.array(z.string()).min(1).optional(),
+      limit: z.number().int().min(1).max(100000).optional(),
+    })
+    .parse(args ?? {});
+  const result = await callPythonCalculator("yoga_identifier", {
+    action: "scan",
+    ...validated,
+  });
+  return {
+    content: [
+      {
+        type: "text",
+        text: formatResult(result),
       },
     ],
   };
 }
 
+
 async function handleCompatibilityAnalyze(args: any) {
   const validated = CompatibilitySchema.parse(args);
   const result = await callPythonCalculator("compatibility_calculator", {
@@ -371,7 +1283,33 @@ async function handleCompatibilityAnalyze(args: any) {
     content: [
       {
         type: "text",
-        text: JSON.stringify(result, null, 2),
+        text: formatResult(result),
+      },
+    ],
+  };
+}
+
+async function handleCompatibilityMatches(args: any) {
+  const validated = z
+    .object({
+      chart_id: z.string().uuid(),
+      role: z.enum(["groom", "bride"]).optional(),
+      top_k: z.number().int().min(1).max(1000).optional(),
+      min_score: z.number().min(0).max(36).optional(),
+      exclude_nadi: z.boolean().optional(),
+      exclude_bhakoot: z.boolean().optional(),
+      exclude_manglik: z.boolean().optional(),
+    })
+    .parse(args);
+  const result = await callPythonCalculator("compatibility_calculator", {
+    action: "matches",
+    ...validated,
+  });
+  return {
+    content: [
+      {
+        type: "text",
+        text: formatResult(result),
       },
     ],
   };
@@ -402,20 +1340,50 @@ async function main() {
       switch (request.params.name) {
         case "chart_create":
           return await handleChartCreate(request.params.arguments);
+        case "chart_create_batch":
+          return await handleChartCreateBatch(request.params.arguments);
         case "chart_read":
           return await handleChartRead(request.params.arguments);
         case "chart_list":
           return await handleChartList(request.params.arguments);
         case "dasha_current":
           return await handleDashaCurrent(request.params.arguments);
+        case "dasha_periods":
+          return await handleDashaPeriods(request.params.arguments);
+        case "dasha_timeline":
+          return await handleDashaTimeline(request.params.arguments);
         case "transit_now":
           return await handleTransitNow(request.params.arguments);
+        case "transit_range":
+          return await handleTransitRange(request.params.arguments, (snapshots) => {
+            const progressToken = request.params._meta?.progressToken;
+            if (progressToken !== undefined) {
+              // A failed notification (client gone) must not become an
+              // unhandled rejection, which would end the server process
+              server
+                .notification({
+                  method: "notifications/progress",
+                  params: { progressToken, progress: snapshots },
+                })
+                .catch((err) => {
+                  console.error(`[Jyotish MCP] Progress notification failed: ${err.message}`);
+                });
+            }
+          });
+        case "transit_charts":
+          return await handleTransitCharts(request.params.arguments);
+        case "transit_events":
+          return await handleTransitEvents(request.params.arguments);
         case "divisional_read":
           return await handleDivisionalRead(request.params.arguments);
         case "yogas_identify":
           return await handleYogasIdentify(request.params.arguments);
+        case "yogas_scan":
+          return await handleYogasScan(request.params.arguments);
         case "compatibility_analyze":
           return await handleCompatibilityAnalyze(request.params.arguments);
+        case "compatibility_matches":
+          return await handleCompatibilityMatches(request.params.arguments);
         default:
           throw new Error(`Unknown tool: ${request.params.name}`);
       }
@@ -434,6 +1402,10 @@ async function main() {
     }
   });
 
+  // Warm up the calculation engine before the first tool call
+  engine.start();
+  process.on("exit", () => engine.stop());
+
   // Start server
   const transport = new StdioServerTransport();
   await server.connect(transport);